@@ -0,0 +1,322 @@
+""" Batch runner of the read, statistics, classification and export pipeline over many layers """
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Union
+
+import pandas
+
+from src.utils.file_utils.export_results import ResultOutput, export_results, write_outputs_atomically
+import src.utils.languages.languages as languages
+
+DEFAULT_SUMMARY_FILE_NAME = 'summary.xlsx'
+DEFAULT_MAX_TASKS_PER_CHILD = 1
+SUMMARY_STATISTICS = ('count', 'sum', 'mean', 'median', 'std', 'minimum', 'maximum', 'jenks')
+
+
+def read_manifest(manifest_file_name: str) -> dict[str, Any]:
+    """ The validated manifest, its keys are described in the readme """
+    with open(manifest_file_name, encoding='utf-8') as manifest_file:
+        manifest = json.load(manifest_file)
+    validate_manifest(manifest)
+    return manifest
+
+
+def validate_manifest(manifest: dict[str, Any]) -> None:
+    entries = manifest.get('entries')
+    if not entries:
+        raise ValueError('Manifest must have at least one entry')
+    names = [entry.get('name') for entry in entries]
+    if None in names or len(set(names)) != len(names):
+        raise ValueError(f'Every manifest entry must have a unique name, your names are {names}')
+    for entry in entries:
+        if 'layer_file_name' not in entry:
+            raise ValueError(f'Manifest entry {entry["name"]} has no layer_file_name')
+
+
+def create_entry_config(entry: dict[str, Any], config: dict[str, Any]) -> dict[str, Any]:
+    """ The configuration of an entry: the base configuration updated by the entry, one language by default """
+    entry_config = {**config, **entry}
+    entry_config.setdefault('languages', [entry_config['language']])
+    return entry_config
+
+
+def read_entry_data(entry_config: dict[str, Any]):
+    """ The features of the entry, filtered to the sub-area and normalized when the configuration asks for it """
+    import geopandas
+
+    data = geopandas.read_file(entry_config['layer_file_name'], layer=entry_config.get('layer'))
+    if entry_config.get('sub_area_query') is not None:
+        data = data.query(entry_config['sub_area_query'])
+    if entry_config['normalize_geometries']:
+        from src.utils.geometry_utils.geometry_validation import normalize_geometries
+        data, _ = normalize_geometries(data, explode=entry_config['explode_multipolygons'], max_workers=1,
+                                       language=entry_config['language'])
+    return data
+
+
+def read_entry_sample_areas(entry_config: dict[str, Any]):
+    import geopandas
+
+    sample_areas = entry_config.get('sample_areas')
+    if sample_areas is None:
+        return None
+    return geopandas.read_file(sample_areas['file_name'], layer=sample_areas.get('layer'))
+
+
+def create_entry_area_statistics(data, sample_areas, entry_config: dict[str, Any], language: str):
+    from src.calculate_statistics.area_statistics import AreaStatistics, AreaStatisticsComparisonWithSampleArea
+
+    parameters = {
+        'number_of_natural_breaks': entry_config['number_of_natural_breaks'],
+        'number_of_equal_intervals': entry_config['number_of_equal_intervals'],
+        'language': language,
+        'jenks_method': entry_config['jenks_method'],
+    }
+    if sample_areas is not None:
+        return AreaStatisticsComparisonWithSampleArea(
+            data,
+            sample_areas=sample_areas,
+            sample_area_column=entry_config['sample_areas'].get('column'),
+            **parameters
+        )
+    if entry_config['sample_area_size'] is not None:
+        return AreaStatisticsComparisonWithSampleArea(data, entry_config['sample_area_size'], **parameters)
+    return AreaStatistics(data, **parameters)
+
+
+def create_entry_outputs(area_statistics, entry_config: dict[str, Any]) -> list[ResultOutput]:
+    """ The statistics, the classification tables, the classified layer and the charts of the entry """
+    language = area_statistics.language
+    area_statistics.add_area_classifications_to_data(additional_classifications={
+        column_name: (classification['breaks'], classification['labels'])
+        for column_name, classification in entry_config['additional_classifications'].items()
+    })
+    area_statistics.calculate_area()
+    classifications = entry_config['classifications']
+    if classifications is None:
+        classifications = [language['jenks'], language['equal_interval_breaks'], language['quartiles']] \
+            + list(entry_config['additional_classifications'])
+    sample_area_size = getattr(area_statistics, 'sample_area_size', None)
+    statistics = area_statistics.get_area_statistics()
+    outputs = [
+        ResultOutput('csv', 'area_statistics.csv', statistics),
+        ResultOutput('excel_sheet', 'area_statistics.xlsx', statistics, name=language['statistics']),
+    ]
+    if getattr(area_statistics, 'sample_area_table', None) is not None:
+        outputs.append(ResultOutput(
+            'excel_sheet',
+            'area_statistics.xlsx',
+            area_statistics.get_sample_area_statistics(max_workers=1),
+            name=language['sub_areas']
+        ))
+    for classification in classifications:
+        outputs.append(ResultOutput(
+            'excel_sheet',
+            'area_statistics.xlsx',
+            area_statistics.get_classification_area_statistics(classification, sample_area=sample_area_size),
+            name=classification[:31]
+        ))
+        for chart_type in entry_config['chart_types']:
+            file_name = f'{classification}_{chart_type}.png'
+            outputs.append(ResultOutput(
+                'chart',
+                file_name,
+                area_statistics.create_chart(
+                    chart_type,
+                    classification,
+                    file_name,
+                    sample_area=sample_area_size,
+                    dpi=entry_config['dpi']
+                ),
+                folder='figures'
+            ))
+    outputs.append(ResultOutput(
+        'gpkg_layer',
+        'classification.gpkg',
+        area_statistics.get_data_for_export(),
+        folder='gis_data',
+        name='classification'
+    ))
+    return outputs
+
+
+def run_batch_entry(entry_config: dict[str, Any], results_folder: str) -> list[dict[str, Any]]:
+    """ Runs the entry in every language, an error is reported in the summary rows instead of raised """
+    rows = []
+    start = time.perf_counter()
+    try:
+        data = read_entry_data(entry_config)
+        sample_areas = read_entry_sample_areas(entry_config)
+        for language in entry_config['languages']:
+            language_start = time.perf_counter()
+            area_statistics = create_entry_area_statistics(data.copy(), sample_areas, entry_config, language)
+            export_results(
+                create_entry_outputs(area_statistics, entry_config),
+                results_folder,
+                f'{entry_config["name"]}_{language}',
+                remove_previous=True,
+                max_workers=1
+            )
+            statistics = area_statistics.get_area_statistics()
+            language_dictionary = area_statistics.language
+            rows.append({
+                'name': entry_config['name'],
+                'language': language,
+                'status': 'succeeded',
+                **{name: statistics[language_dictionary[name]] for name in SUMMARY_STATISTICS},
+                'elapsed_time': time.perf_counter() - language_start,
+                'error': None,
+            })
+    except Exception as error:
+        finished_languages = {row['language'] for row in rows}
+        rows.extend(create_failed_rows(
+            entry_config,
+            [language for language in entry_config['languages'] if language not in finished_languages],
+            error,
+            time.perf_counter() - start
+        ))
+    return rows
+
+
+def create_failed_rows(
+        entry_config: dict[str, Any],
+        entry_languages: list[str],
+        error: BaseException,
+        elapsed_time: float = None
+) \
+        -> list[dict[str, Any]]:
+    error_text = ''.join(traceback.format_exception_only(type(error), error)).strip()
+    return [{
+        'name': entry_config['name'],
+        'language': language,
+        'status': 'failed',
+        'elapsed_time': elapsed_time,
+        'error': error_text,
+    } for language in entry_languages]
+
+
+def limit_worker_memory(memory_limit_megabytes: Union[float, None]) -> None:
+    """ Process pool initializer capping the address space of the worker, only on Unix """
+    if memory_limit_megabytes is None:
+        return
+    import resource
+
+    limit = int(memory_limit_megabytes * 1024 ** 2)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def run_entries_in_pool(
+        entry_configs: list[dict[str, Any]],
+        results_folder: str,
+        max_workers: int = None,
+        memory_limit_megabytes: float = None,
+        max_tasks_per_child: Union[int, None] = DEFAULT_MAX_TASKS_PER_CHILD
+) \
+        -> dict[str, Union[list[dict[str, Any]], BaseException]]:
+    """ Rows of every entry by name, or the exception of the entries whose worker died """
+    pool_arguments = {}
+    if max_tasks_per_child is not None and sys.version_info >= (3, 11):
+        pool_arguments['max_tasks_per_child'] = max_tasks_per_child
+    with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=limit_worker_memory,
+            initargs=(memory_limit_megabytes,),
+            **pool_arguments
+    ) as executor:
+        futures: dict[str, Future] = {
+            entry_config['name']: executor.submit(run_batch_entry, entry_config, results_folder)
+            for entry_config in entry_configs
+        }
+    return {name: future.exception() or future.result() for name, future in futures.items()}
+
+
+def run_batch(
+        entries: list[dict[str, Any]],
+        config: dict[str, Any],
+        results_folder: str,
+        max_workers: int = None,
+        memory_limit_megabytes: float = None,
+        max_tasks_per_child: Union[int, None] = DEFAULT_MAX_TASKS_PER_CHILD
+) \
+        -> list[dict[str, Any]]:
+    """ Runs the entries in a process pool, the entries of a dead worker are run again one by one """
+    entry_configs = [create_entry_config(entry, config) for entry in entries]
+    if max_workers == 1 or len(entry_configs) < 2:
+        return [row for entry_config in entry_configs for row in run_batch_entry(entry_config, results_folder)]
+    results = run_entries_in_pool(entry_configs, results_folder, max_workers, memory_limit_megabytes,
+                                  max_tasks_per_child)
+    for entry_config in entry_configs:
+        if isinstance(results[entry_config['name']], BrokenProcessPool):
+            results.update(run_entries_in_pool([entry_config], results_folder, 1, memory_limit_megabytes, 1))
+    rows = []
+    for entry_config in entry_configs:
+        result = results[entry_config['name']]
+        if isinstance(result, BaseException):
+            rows.extend(create_failed_rows(entry_config, entry_config['languages'], result))
+        else:
+            rows.extend(result)
+    return rows
+
+
+def create_summary_table(rows: list[dict[str, Any]], language: str = 'en') -> pandas.DataFrame:
+    """ One row per entry and language, the breaks as text, the column names and the statuses in the language """
+    language = languages.get_language(language)
+    column_names = {
+        'name': language['batch_entry'],
+        'language': language['language'],
+        'status': language['status'],
+        **{name: language[name] for name in SUMMARY_STATISTICS},
+        'elapsed_time': language['elapsed_time'],
+        'error': language['error'],
+    }
+    summary_table = pandas.DataFrame(rows, columns=list(column_names))
+    summary_table['jenks'] = summary_table['jenks'].map(
+        lambda breaks: ', '.join(f'{value:g}' for value in breaks) if isinstance(breaks, list) else None
+    )
+    summary_table['status'] = summary_table['status'].map(language)
+    return summary_table.rename(columns=column_names).set_index(language['batch_entry'])
+
+
+def write_summary_workbook(
+        rows: list[dict[str, Any]],
+        file_name: str,
+        language: str = 'en'
+) \
+        -> str:
+    return write_outputs_atomically(file_name, [ResultOutput(
+        'excel_sheet',
+        file_name,
+        create_summary_table(rows, language),
+        name=languages.get_language(language)['statistics']
+    )])
+
+
+def run_manifest(
+        manifest: dict[str, Any],
+        config: dict[str, Any],
+        max_workers: int = None,
+        memory_limit_megabytes: float = None
+) \
+        -> tuple[str, list[dict[str, Any]]]:
+    """ Runs the entries of the manifest and writes the summary workbook, returns its file name and rows """
+    validate_manifest(manifest)
+    results_folder = manifest.get('results_folder', 'results')
+    os.makedirs(results_folder, exist_ok=True)
+    rows = run_batch(
+        manifest['entries'],
+        {**config, **manifest.get('defaults', {})},
+        results_folder,
+        max_workers,
+        memory_limit_megabytes
+    )
+    summary_file_name = write_summary_workbook(
+        rows,
+        os.path.join(results_folder, manifest.get('summary_file_name', DEFAULT_SUMMARY_FILE_NAME)),
+        manifest.get('language', 'en')
+    )
+    return summary_file_name, rows
@@ -0,0 +1,49 @@
+import argparse
+import os
+import tempfile
+import time
+
+import pandas
+
+from src.benchmarks.synthetic_polygons import create_synthetic_polygons
+from src.calculate_statistics.area_statistics import AreaStatistics
+from src.utils.file_utils.write_parquet import write_geoparquet_from_geodataframe, write_parquet_from_dataframe
+
+
+def measure_write(write, file_name: str) -> dict[str, float]:
+    start = time.perf_counter()
+    write(file_name)
+    return {'seconds': time.perf_counter() - start, 'megabytes': os.path.getsize(file_name) / 1024 ** 2}
+
+
+def benchmark_export_formats(number_of_polygons: int) -> pandas.DataFrame:
+    """ Write time and file size of a classified layer and its Jenks classification table per output format """
+    area_statistics = AreaStatistics(create_synthetic_polygons(number_of_polygons))
+    area_statistics.add_area_classifications_to_data()
+    data = area_statistics.data
+    classification_statistics = area_statistics.get_classification_area_statistics(area_statistics.language['jenks'])
+    with tempfile.TemporaryDirectory() as folder:
+        results = {
+            'GPKG layer': measure_write(
+                lambda file_name: area_statistics.get_data_for_export().to_file(file_name, driver='GPKG'),
+                os.path.join(folder, 'layer.gpkg')),
+            'CSV layer': measure_write(
+                lambda file_name: data.to_csv(file_name, index=False),
+                os.path.join(folder, 'layer.csv')),
+            'GeoParquet layer': measure_write(
+                lambda file_name: write_geoparquet_from_geodataframe(data, file_name),
+                os.path.join(folder, 'layer.parquet')),
+            'CSV classification table': measure_write(
+                lambda file_name: classification_statistics.to_csv(file_name, index=False),
+                os.path.join(folder, 'classification.csv')),
+            'Parquet classification table': measure_write(
+                lambda file_name: write_parquet_from_dataframe(classification_statistics, file_name),
+                os.path.join(folder, 'classification.parquet')),
+        }
+    return pandas.DataFrame(results).T
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='Compare the GPKG, CSV and Parquet exports')
+    argument_parser.add_argument('--number-of-polygons', type=int, default=100000)
+    print(benchmark_export_formats(argument_parser.parse_args().number_of_polygons))
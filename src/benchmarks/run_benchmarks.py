@@ -0,0 +1,242 @@
+"""Timing and peak memory benchmarks of the statistics, classification, export and chart steps.
+
+Usage: python -m src.benchmarks.run_benchmarks [--sizes 1000 10000 100000] [--output results.json]
+                                               [--baseline baseline.json] [--tolerance 0.25]
+                                               [--minimum-seconds 0.01]
+
+Every benchmark runs on the same seeded synthetic layer (see synthetic_polygons.py). The fastest of the repeated
+runs is reported, the peak memory is measured in one extra run under tracemalloc, which sees the numpy and Python
+allocations but not the ones made inside GEOS. With a baseline the ratios are printed, and the exit code is 1 when a
+benchmark got slower or used more memory than the tolerance allows.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from importlib.metadata import PackageNotFoundError, version
+from typing import Callable
+
+import geopandas
+import numpy
+import pandas
+
+from src.benchmarks.synthetic_polygons import create_synthetic_polygons
+from src.calculate_statistics.area_statistics import AreaStatistics, calculate_jenks_breaks
+from src.utils.collection_utils.list_creator import string_list_generator
+from src.utils.file_utils.write_csv import write_csv_from_dict
+from src.utils.file_utils.write_excel import write_excel_sheet_from_dataframe, write_excel_sheet_from_dict
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+MAXIMUM_EXCEL_ROWS = 100000
+PACKAGES = ('numpy', 'pandas', 'geopandas', 'shapely', 'pyproj', 'jenkspy', 'matplotlib', 'openpyxl')
+
+
+def create_classified_area_statistics(data: geopandas.GeoDataFrame) -> AreaStatistics:
+    area_statistics = AreaStatistics(data.copy())
+    area_statistics.add_area_classifications_to_data()
+    return area_statistics
+
+
+def prepare_area_statistics(data: geopandas.GeoDataFrame, folder: str) -> Callable[[], object]:
+    return AreaStatistics(data.copy()).get_area_statistics
+
+
+def prepare_jenks_breaks(data: geopandas.GeoDataFrame, folder: str) -> Callable[[], object]:
+    areas = data.area
+    return lambda: calculate_jenks_breaks(areas, 4)
+
+
+def prepare_classify_areas(data: geopandas.GeoDataFrame, folder: str) -> Callable[[], object]:
+    area_statistics = AreaStatistics(data.copy())
+    area_statistics.calculate_area()
+    breaks = area_statistics.get_jenks_breaks()
+    labels = string_list_generator('class ', len(breaks) + 1)
+    return lambda: area_statistics.classify_areas(breaks, labels)
+
+
+def prepare_classification_area_statistics(data: geopandas.GeoDataFrame, folder: str) -> Callable[[], object]:
+    area_statistics = create_classified_area_statistics(data)
+    return lambda: area_statistics.get_classification_area_statistics(area_statistics.language['jenks'])
+
+
+def prepare_excel_statistics(data: geopandas.GeoDataFrame, folder: str) -> Callable[[], object]:
+    area_statistics = AreaStatistics(data.copy()).get_area_statistics()
+    file_name = os.path.join(folder, 'statistics.xlsx')
+    if os.path.exists(file_name):
+        os.remove(file_name)
+    return lambda: write_excel_sheet_from_dict(area_statistics, file_name, 'statistics')
+
+
+def prepare_excel_layer_table(data: geopandas.GeoDataFrame, folder: str) -> Callable[[], object]:
+    table = pandas.DataFrame(create_classified_area_statistics(data).get_data_for_export().drop(columns='geometry'))
+    file_name = os.path.join(folder, 'layer.xlsx')
+    if os.path.exists(file_name):
+        os.remove(file_name)
+    return lambda: write_excel_sheet_from_dataframe(table, file_name, 'layer')
+
+
+def prepare_csv_statistics(data: geopandas.GeoDataFrame, folder: str) -> Callable[[], object]:
+    area_statistics = AreaStatistics(data.copy()).get_area_statistics()
+    return lambda: write_csv_from_dict(area_statistics, os.path.join(folder, 'statistics.csv'))
+
+
+def prepare_csv_layer_table(data: geopandas.GeoDataFrame, folder: str) -> Callable[[], object]:
+    table = pandas.DataFrame(create_classified_area_statistics(data).data.drop(columns='geometry'))
+    return lambda: table.to_csv(os.path.join(folder, 'layer.csv'), index=False)
+
+
+def prepare_classification_diagram(data: geopandas.GeoDataFrame, folder: str) -> Callable[[], object]:
+    area_statistics = create_classified_area_statistics(data)
+    return lambda: area_statistics.create_classification_diagram(
+        area_statistics.language['jenks'],
+        os.path.join(folder, 'diagram.png'),
+        dpi=100,
+        area_field_name=area_statistics.language['area'],
+        show=False,
+        headless=True
+    )
+
+
+def prepare_pie_chart(data: geopandas.GeoDataFrame, folder: str) -> Callable[[], object]:
+    area_statistics = create_classified_area_statistics(data)
+    return lambda: area_statistics.create_classification_area_ratio_pie_chart(
+        area_statistics.language['jenks'],
+        path=os.path.join(folder, 'pie_chart.png'),
+        dpi=100,
+        show=False,
+        headless=True
+    )
+
+
+BENCHMARKS = {
+    'get_area_statistics': (prepare_area_statistics, None),
+    'calculate_jenks_breaks': (prepare_jenks_breaks, None),
+    'classify_areas': (prepare_classify_areas, None),
+    'get_classification_area_statistics': (prepare_classification_area_statistics, None),
+    'write_excel_statistics': (prepare_excel_statistics, None),
+    'write_excel_layer_table': (prepare_excel_layer_table, MAXIMUM_EXCEL_ROWS),
+    'write_csv_statistics': (prepare_csv_statistics, None),
+    'write_csv_layer_table': (prepare_csv_layer_table, None),
+    'create_classification_diagram': (prepare_classification_diagram, None),
+    'create_classification_area_ratio_pie_chart': (prepare_pie_chart, None),
+}
+
+
+def measure(prepare: Callable, data: geopandas.GeoDataFrame, folder: str, repeats: int) -> dict[str, float]:
+    """ The preparation is not measured and is repeated before every run, so cached results do not leak between
+    the runs """
+    timings = []
+    for _ in range(repeats):
+        run = prepare(data, folder)
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    run = prepare(data, folder)
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': min(timings), 'peak_megabytes': peak / 1024 ** 2}
+
+
+def get_environment() -> dict[str, str]:
+    environment = {'python': platform.python_version(), 'platform': platform.platform()}
+    for package in PACKAGES:
+        try:
+            environment[package] = version(package)
+        except PackageNotFoundError:
+            environment[package] = None
+    return environment
+
+
+def run_benchmarks(
+        sizes: list[int] = DEFAULT_SIZES,
+        benchmarks: list[str] = None,
+        repeats: int = 3,
+        seed: int = 0
+) \
+        -> dict:
+    if repeats < 1:
+        raise ValueError(f'Repeats must be at least 1, your repeats is {repeats}')
+    if benchmarks is None:
+        benchmarks = list(BENCHMARKS)
+    unknown_benchmarks = set(benchmarks) - set(BENCHMARKS)
+    if unknown_benchmarks:
+        raise ValueError(f'Benchmarks must be some of {list(BENCHMARKS)}, your unknown benchmarks are '
+                         f'{sorted(unknown_benchmarks)}')
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for number_of_polygons in sizes:
+            data = create_synthetic_polygons(number_of_polygons, seed)
+            for name in benchmarks:
+                prepare, maximum_number_of_polygons = BENCHMARKS[name]
+                if maximum_number_of_polygons is not None and number_of_polygons > maximum_number_of_polygons:
+                    continue
+                results.append({
+                    'benchmark': name,
+                    'number_of_polygons': number_of_polygons,
+                    **measure(prepare, data, folder, repeats)
+                })
+    return {'environment': get_environment(), 'seed': seed, 'repeats': repeats, 'results': results}
+
+
+def compare_with_baseline(
+        results: dict,
+        baseline: dict,
+        tolerance: float = 0.25,
+        minimum_seconds: float = 0.01
+) \
+        -> pandas.DataFrame:
+    """ Ratios of the current and the baseline measurements of the benchmarks present in both, a ratio above
+    1 + tolerance is a regression. Slowdowns under minimum_seconds are timer noise and are not reported. """
+    keys = ['benchmark', 'number_of_polygons']
+    comparison = pandas.DataFrame(results['results']).merge(
+        pandas.DataFrame(baseline['results']),
+        on=keys,
+        suffixes=('', '_baseline')
+    )
+    for measurement in ('seconds', 'peak_megabytes'):
+        comparison[f'{measurement}_ratio'] = comparison[measurement] / comparison[f'{measurement}_baseline']
+    is_slower = (comparison['seconds_ratio'] > 1 + tolerance) \
+        & (comparison['seconds'] - comparison['seconds_baseline'] > minimum_seconds)
+    comparison['regression'] = is_slower | (comparison['peak_megabytes_ratio'] > 1 + tolerance)
+    return comparison
+
+
+def main(argv: list[str] = None) -> int:
+    argument_parser = argparse.ArgumentParser(description='Benchmarks of AreaStatistics and the result writers')
+    argument_parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                                 help='numbers of polygons, from 1000 up to 10000000')
+    argument_parser.add_argument('--benchmarks', nargs='+', default=None, choices=list(BENCHMARKS))
+    argument_parser.add_argument('--repeats', type=int, default=3)
+    argument_parser.add_argument('--seed', type=int, default=0)
+    argument_parser.add_argument('--output', default='benchmark_results.json')
+    argument_parser.add_argument('--baseline', default=None, help='earlier results JSON to compare with')
+    argument_parser.add_argument('--tolerance', type=float, default=0.25)
+    argument_parser.add_argument('--minimum-seconds', type=float, default=0.01)
+    arguments = argument_parser.parse_args(argv)
+    results = run_benchmarks(arguments.sizes, arguments.benchmarks, arguments.repeats, arguments.seed)
+    with open(arguments.output, 'w', encoding='utf-8') as output_file:
+        json.dump(results, output_file, indent=2)
+    if arguments.baseline is None:
+        print(pandas.DataFrame(results['results']).to_string(index=False))
+        return 0
+    with open(arguments.baseline, encoding='utf-8') as baseline_file:
+        comparison = compare_with_baseline(
+            results,
+            json.load(baseline_file),
+            arguments.tolerance,
+            arguments.minimum_seconds
+        )
+    print(comparison.to_string(index=False, float_format=lambda value: f'{value:.4g}'))
+    return int(bool(numpy.any(comparison['regression'])))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
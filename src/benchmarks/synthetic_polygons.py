@@ -0,0 +1,51 @@
+import geopandas
+import numpy
+import shapely
+
+
+def create_synthetic_areas(
+        number_of_polygons: int,
+        seed: int = 0,
+        tail_ratio: float = 0.02
+) \
+        -> numpy.ndarray:
+    """ Areas in square metres drawn from a lognormal body (median about 55 m2, like the digitized oleaster
+    patches) with a Pareto tail of large patches, so the distribution is as skewed as the real layers """
+    random_generator = numpy.random.default_rng(seed)
+    areas = random_generator.lognormal(4, 1.3, number_of_polygons)
+    is_tail = random_generator.random(number_of_polygons) < tail_ratio
+    areas[is_tail] = 1000 * (1 + random_generator.pareto(1.5, int(is_tail.sum())))
+    return areas
+
+
+def create_synthetic_polygons(
+        number_of_polygons: int,
+        seed: int = 0,
+        crs: int = 23700,
+        extent: float = 100000
+) \
+        -> geopandas.GeoDataFrame:
+    """ Rotated rectangles with skewed areas, random elongation and random positions inside the extent, built from
+    one coordinate array without a Python loop, so 10 million polygons take about a minute. The same seed gives the
+    same layer. """
+    random_generator = numpy.random.default_rng(seed)
+    areas = create_synthetic_areas(number_of_polygons, seed)
+    elongations = random_generator.uniform(1, 4, number_of_polygons)
+    widths = numpy.sqrt(areas / elongations)
+    lengths = widths * elongations
+    angles = random_generator.uniform(0, numpy.pi, number_of_polygons)
+    centers = random_generator.uniform(0, extent, (number_of_polygons, 2))
+    corners = numpy.array([[-0.5, -0.5], [0.5, -0.5], [0.5, 0.5], [-0.5, 0.5], [-0.5, -0.5]])
+    local_x = corners[None, :, 0] * lengths[:, None]
+    local_y = corners[None, :, 1] * widths[:, None]
+    cosines = numpy.cos(angles)[:, None]
+    sines = numpy.sin(angles)[:, None]
+    coordinates = numpy.stack((
+        centers[:, 0, None] + local_x * cosines - local_y * sines,
+        centers[:, 1, None] + local_x * sines + local_y * cosines
+    ), axis=-1)
+    return geopandas.GeoDataFrame(
+        {'sub_area_name': random_generator.choice(['tarna', 'pely'], number_of_polygons)},
+        geometry=shapely.polygons(coordinates),
+        crs=crs
+    )
@@ -1,64 +1,238 @@
-from typing import Union
+import ctypes
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Union
 
 import numpy
 import pandas
 import geopandas
-import jenkspy
-from matplotlib import pyplot
-from matplotlib.lines import Line2D
 
+from src.calculate_statistics.bootstrap import (
+    DEFAULT_CONFIDENCE_LEVEL,
+    DEFAULT_NUMBER_OF_RESAMPLES,
+    calculate_bootstrap_replicates,
+    create_confidence_interval_table
+)
+from src.calculate_statistics.classification_schemes import DEFAULT_MAXIMUM_NUMBER_OF_CLASSES, ClassificationEngine
+from src.calculate_statistics.incremental_statistics import (
+    DEFAULT_JENKS_REFIT_THRESHOLD,
+    DEFAULT_JENKS_WINDOW,
+    IncrementalAreaState,
+    WarmStartJenks
+)
+from src.calculate_statistics.jenks import JenksEngine, calculate_jenks_breaks_in_parallel
+from src.calculate_statistics.sample_areas import hash_sample_areas, overlay_sample_areas
+from src.calculate_statistics.summary_statistics import (
+    calculate_summary_statistics,
+    calculate_grouped_summary_statistics
+)
 from src.utils.collection_utils.list_creator import string_list_generator
-from src.utils.math_utils.rounding_utils import round_up, get_scale_of_number
+from src.utils.geometry_utils.area_calculation import calculate_geometry_areas
+from src.utils.geometry_utils.geometry_validation import is_polygonal
+from src.utils.geometry_utils.morphometry import MORPHOMETRY_METRICS, calculate_morphometry
+from src.utils.profiling_utils.run_profiler import profile_stage
 import src.utils.languages.languages as languages
 
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from src.utils.file_utils.statistics_cache import StatisticsCache
+
+PERSISTENT_CACHE_ENTRIES = ('summary_statistics', 'jenks', 'equal_interval_breaks')
+MOVED_TO_CLASSIFICATION_DIAGRAMS = ('create_axis_ticks',)
+
+
+def __getattr__(name: str) -> Any:
+    """ Re-exports the drawing helpers moved to classification_diagrams, importing matplotlib only then """
+    if name in MOVED_TO_CLASSIFICATION_DIAGRAMS:
+        from src.calculate_statistics import classification_diagrams
+        return getattr(classification_diagrams, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
 
 def is_contains_only_polygons(data: geopandas.GeoDataFrame) -> bool:
-    if not (data.geometry.geom_type.unique()[0] == 'Polygon'
-            or data.geometry.geom_type.unique()[0] == 'MultiPolygon'):
+    """ Polygons and multipolygons can be mixed, normalize_geometries repairs or drops the other rows """
+    if not is_polygonal(numpy.asarray(data.geometry.values, dtype=object)).all():
         raise ValueError('Geometry types must be polygons or multipolygons')
-    if data.geometry.geom_type.unique().size > 1:
-        raise ValueError('Only one geometry type is allowed')
     return True
 
 
-def calculate_equal_interval(data: pandas.Series, number_of_breaks: int) -> Union[int, float]:
-    return (data.max() - data.min()) / number_of_breaks
+def calculate_equal_interval(
+        data: pandas.Series,
+        number_of_breaks: int,
+        minimum: Union[int, float] = None,
+        maximum: Union[int, float] = None
+) \
+        -> Union[int, float]:
+    """ Already known minimum and maximum can be passed to spare the passes over the data """
+    if minimum is None:
+        minimum = data.min()
+    if maximum is None:
+        maximum = data.max()
+    return (maximum - minimum) / number_of_breaks
 
 
 def calculate_equal_interval_breaks(
         data: pandas.Series,
         number_of_breaks: int,
-        remove_max_and_min: bool = False
+        remove_max_and_min: bool = False,
+        minimum: Union[int, float] = None,
+        maximum: Union[int, float] = None
 ) \
         -> list[Union[int, float]]:
-    interval = calculate_equal_interval(data, number_of_breaks)
-    equal_interval_breaks = [data.min() + i * interval for i in range(number_of_breaks + 1)]
+    if minimum is None:
+        minimum = data.min()
+    interval = calculate_equal_interval(data, number_of_breaks, minimum, maximum)
+    equal_interval_breaks = [minimum + i * interval for i in range(number_of_breaks + 1)]
     if remove_max_and_min:
         equal_interval_breaks.pop(0)
         equal_interval_breaks.pop(-1)
     return equal_interval_breaks
 
 
+def calculate_classification_codes(values: numpy.ndarray, breaks: list[Union[int, float]]) -> numpy.ndarray:
+    """ Class index of every value, a value equal to a break belongs to the lower class, missing values get -1 """
+    breaks = numpy.asarray(breaks, dtype=numpy.float64)
+    if numpy.any(numpy.diff(breaks) < 0):
+        raise ValueError('Breaks must increase monotonically')
+    values = numpy.asarray(values, dtype=numpy.float64)
+    codes = numpy.searchsorted(breaks, values, side='left')
+    codes[numpy.isnan(values)] = -1
+    return codes
+
+
+def get_code_dtype(number_of_categories: int) -> numpy.dtype:
+    """ The smallest signed integer type holding the category codes and -1 for missing values """
+    for dtype in (numpy.int8, numpy.int16, numpy.int32):
+        if number_of_categories <= numpy.iinfo(dtype).max:
+            return numpy.dtype(dtype)
+    return numpy.dtype(numpy.int64)
+
+
+def calculate_label_codes(
+        values: numpy.ndarray,
+        breaks: list[Union[int, float]],
+        labels: list
+) \
+        -> tuple[numpy.ndarray, list[str]]:
+    """ Category code of every value and the categories, the labels without repetition, missing values get -1 """
+    if len(labels) != len(breaks) + 1:
+        raise ValueError('Bin labels must be one more than the number of breaks')
+    label_names = [str(label) for label in labels]
+    categories = list(dict.fromkeys(label_names))
+    label_codes = numpy.array(
+        [categories.index(label_name) for label_name in label_names] + [-1],
+        dtype=get_code_dtype(len(categories))
+    )
+    return label_codes[calculate_classification_codes(values, breaks)], categories
+
+
+def create_classification(
+        values: numpy.ndarray,
+        breaks: list[Union[int, float]],
+        labels: list
+) \
+        -> pandas.Categorical:
+    """ Categorical of the labels as strings, the same label can be used for more classes """
+    return pandas.Categorical.from_codes(*calculate_label_codes(values, breaks, labels))
+
+
 def calculate_jenks_breaks(
         data: pandas.Series,
         number_of_breaks: int,
-        remove_max_and_min: bool = False
+        remove_max_and_min: bool = False,
+        method: str = 'auto'
 ) \
         -> list[Union[int, float]]:
-    sorted_data = data.sort_values()
-    jenks = jenkspy.jenks_breaks(sorted_data, n_classes=number_of_breaks)
+    """ The method is one of 'auto', 'exact', 'histogram' or 'sample', see JenksEngine """
+    jenks = JenksEngine(method).calculate_breaks(data.to_numpy(), number_of_breaks)
     if remove_max_and_min:
         jenks.pop(0)
         jenks.pop(-1)
     return jenks
 
 
-def create_axis_ticks(max_count: int, step_base: int, start: int = 0) -> numpy.ndarray:
-    y_axis_ticks = numpy.arange(
-        start,
-        stop=max_count + round_up(step_base, get_scale_of_number(step_base) * -1) + 1,
-        step=int(round_up(step_base, get_scale_of_number(step_base) * -1)))
-    return y_axis_ticks
+def create_area_statistics_dictionary(
+        language: dict[str, str],
+        summary_statistics: dict[str, int | float],
+        jenks_breaks: list[Union[int, float]],
+        number_of_equal_intervals: int
+) \
+        -> dict[str, int | float | list[int | float]]:
+    """ Lays out the summary statistics and the inner breaks the way get_area_statistics returns them """
+    minimum = summary_statistics['minimum']
+    maximum = summary_statistics['maximum']
+    return {
+        language['sum']: summary_statistics['sum'],
+        language['count']: summary_statistics['count'],
+        language['mean']: summary_statistics['mean'],
+        language['median']: summary_statistics['median'],
+        language['std']: summary_statistics['std'],
+        language['var']: summary_statistics['var'],
+        language['minimum']: minimum,
+        language['first_quartile']: summary_statistics['first_quartile'],
+        language['second_quartile']: summary_statistics['second_quartile'],
+        language['third_quartile']: summary_statistics['third_quartile'],
+        language['jenks']: list(jenks_breaks),
+        language['equal_interval']: calculate_equal_interval(None, number_of_equal_intervals, minimum, maximum),
+        language['equal_interval_breaks']:
+            calculate_equal_interval_breaks(None, number_of_equal_intervals, True, minimum, maximum),
+        language['maximum']: maximum,
+    }
+
+
+def get_object_addresses(objects: numpy.ndarray) -> numpy.ndarray:
+    """ The object pointers a contiguous object array stores, read without a Python loop """
+    if len(objects) == 0:
+        return numpy.empty(0, dtype=numpy.uintp)
+    return numpy.ctypeslib.as_array((ctypes.c_size_t * len(objects)).from_address(objects.ctypes.data))
+
+
+def create_geometry_token(geometry: geopandas.GeoSeries) -> tuple[numpy.ndarray, numpy.ndarray, Any, pandas.Index]:
+    """ The geometry objects with their addresses, the CRS and the index, kept alive so no address is reused """
+    geometries = numpy.ascontiguousarray(numpy.asarray(geometry.values, dtype=object)).copy()
+    return geometries, get_object_addresses(geometries).copy(), geometry.crs, geometry.index
+
+
+def is_geometry_token_current(
+        geometry_token: Union[tuple[numpy.ndarray, numpy.ndarray, Any, pandas.Index], None],
+        geometry: geopandas.GeoSeries
+) \
+        -> bool:
+    if geometry_token is None:
+        return False
+    _, addresses, crs, index = geometry_token
+    if len(addresses) != len(geometry) or not (geometry.index is index or geometry.index.equals(index)):
+        return False
+    if not (geometry.crs is crs or geometry.crs == crs):
+        return False
+    geometries = numpy.ascontiguousarray(numpy.asarray(geometry.values, dtype=object))
+    return bool(numpy.array_equal(get_object_addresses(geometries), addresses))
+
+
+def get_label_positions(index: pandas.Index, labels: numpy.ndarray) -> numpy.ndarray:
+    """ Positions of the rows of the labels that are in the index, every row of a repeated label """
+    positions = index.get_indexer_for(labels)
+    return positions[positions >= 0]
+
+
+def is_persistent_cache_entry(key: Hashable) -> bool:
+    """ Entries of plain numbers and lists that can be stored in a StatisticsCache """
+    return (key if isinstance(key, str) else key[0]) in PERSISTENT_CACHE_ENTRIES
+
+
+def convert_lists_to_tuples(value: Any) -> Any:
+    """ Cache keys are stored as JSON lists, they become hashable tuples again """
+    if isinstance(value, list):
+        return tuple(convert_lists_to_tuples(item) for item in value)
+    return value
+
+
+def add_sample_area_statistics(
+        area_statistics: dict[str, int | float | list[int | float]],
+        language: dict[str, str],
+        sample_area_size: float
+) \
+        -> None:
+    area_statistics[language['sample_area_size']] = sample_area_size
+    area_statistics[language['experimental_area_ratio']] = (area_statistics[language['sum']] / sample_area_size) * 100
 
 
 class AreaStatistics:
@@ -68,64 +242,306 @@ class AreaStatistics:
             data: geopandas.GeoDataFrame,
             number_of_natural_breaks: int = 4,
             number_of_equal_intervals: int = 4,
-            language: str = 'en'
+            language: str = 'en',
+            jenks_method: str = 'auto'
     ):
+        self._cache = {}
+        self._cache_geometry_token = None
+        self.cache_hits = 0
+        self.cache_misses = 0
         if is_contains_only_polygons(data):
             self.data = data
             self.number_of_natural_breaks = number_of_natural_breaks
             self.number_of_equal_intervals = number_of_equal_intervals
             self.language = languages.get_language(language)
+            self.jenks_engine = JenksEngine(jenks_method)
 
-    def get_area_statistics(self) -> dict[str, int | float | list[int | float]]:
-        areas = self.data.area
-
-        area_statistics = {
-            self.language['sum']: areas.sum(),
-            self.language['count']: len(areas),
-            self.language['mean']: areas.mean(),
-            self.language['median']: areas.median(),
-            self.language['std']: areas.std(),
-            self.language['var']: areas.var(),
-            self.language['minimum']: areas.min(),
-            self.language['first_quartile']: areas.quantile(0.25),
-            self.language['second_quartile']: areas.quantile(0.5),
-            self.language['third_quartile']: areas.quantile(0.75),
-            self.language['jenks']: calculate_jenks_breaks(areas, self.number_of_natural_breaks, True),
-            self.language['equal_interval']: calculate_equal_interval(areas, self.number_of_equal_intervals),
-            self.language['equal_interval_breaks']: calculate_equal_interval_breaks(
-                areas,
+    @property
+    def data(self) -> geopandas.GeoDataFrame:
+        self._merge_appended_features()
+        return self._data
+
+    @data.setter
+    def data(self, data: geopandas.GeoDataFrame) -> None:
+        self._data = data
+        self._appended_features = []
+        self._appended_areas = []
+        self._classifications = {}
+        self.clear_cache()
+
+    def _merge_appended_features(self) -> None:
+        """ The features of add_features are kept in chunks until the data is read, then concatenated at once """
+        if not self._appended_features:
+            return
+        is_cache_current = is_geometry_token_current(self._cache_geometry_token, self._data.geometry)
+        self._data = pandas.concat([self._data] + self._appended_features)
+        if is_cache_current and 'areas' in self._cache:
+            self._cache['areas'] = pandas.concat([self._cache['areas']] + self._appended_areas)
+            self._cache_geometry_token = create_geometry_token(self._data.geometry)
+        else:
+            self.clear_cache()
+        self._appended_features = []
+        self._appended_areas = []
+
+    def _get_data_pieces(self) -> list[geopandas.GeoDataFrame]:
+        return [self._data] + self._appended_features
+
+    def clear_cache(self) -> None:
+        """ Drops every memoized value, the hit and miss counters are kept """
+        self._cache = {}
+        self._cache_geometry_token = None
+
+    def get_cache_info(self) -> dict[str, int]:
+        return {'hits': self.cache_hits, 'misses': self.cache_misses, 'size': len(self._cache)}
+
+    def _get_cached(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """ The cache is dropped when the geometries, the CRS or the index changed, in place or not """
+        if not is_geometry_token_current(self._cache_geometry_token, self._data.geometry):
+            self._cache = {}
+            self._cache_geometry_token = create_geometry_token(self._data.geometry)
+        if key in self._cache:
+            self.cache_hits += 1
+            return self._cache[key]
+        self.cache_misses += 1
+        value = compute()
+        self._cache[key] = value
+        return value
+
+    def get_areas(self) -> pandas.Series:
+        """ Planar areas for a projected CRS, ellipsoidal areas in square metres for a geographic CRS """
+        self._merge_appended_features()
+        return self._get_cached('areas', lambda: self._calculate_areas(self.data.geometry))
+
+    def _calculate_areas(self, geometry: geopandas.GeoSeries) -> pandas.Series:
+        return pandas.Series(calculate_geometry_areas(geometry), index=geometry.index)
+
+    def _get_area_values(self, area_field_name: str = None) -> numpy.ndarray:
+        """ An existing area field of the data, a morphometry metric, the computed areas otherwise """
+        if area_field_name is not None and area_field_name in self.data.columns:
+            return self.data[area_field_name].to_numpy(dtype=numpy.float64)
+        if area_field_name in self._get_morphometry_column_names():
+            return self.get_morphometry()[area_field_name].to_numpy()
+        return self.get_areas().to_numpy()
+
+    def _get_morphometry_column_names(self) -> list[str]:
+        return [self.language[metric] for metric in MORPHOMETRY_METRICS]
+
+    def get_morphometry(self) -> pandas.DataFrame:
+        """ The metrics of calculate_morphometry with the language names as columns """
+        def compute() -> pandas.DataFrame:
+            morphometry = calculate_morphometry(self.data.geometry)
+            return pandas.DataFrame(
+                {self.language[metric]: morphometry[metric] for metric in MORPHOMETRY_METRICS},
+                index=self.data.index
+            )
+
+        return self._get_cached('morphometry', compute)
+
+    @profile_stage()
+    def add_morphometry_to_data(self) -> None:
+        """ Adds the morphometry columns, so they can be classified and exported like the area column """
+        morphometry = self.get_morphometry()
+        self.data[list(morphometry.columns)] = morphometry
+
+    def get_morphometry_statistics(self, max_workers: int = None) -> pandas.DataFrame:
+        """ The statistics of get_area_statistics for every morphometry metric, one column each """
+        def compute() -> dict[str, dict[str, int | float | list[int | float]]]:
+            morphometry = self.get_morphometry()
+            values = [morphometry[column_name].to_numpy() for column_name in morphometry.columns]
+            jenks_breaks = calculate_jenks_breaks_in_parallel(
+                [metric_values[~numpy.isnan(metric_values)] for metric_values in values],
+                self.number_of_natural_breaks,
+                self.jenks_engine,
+                max_workers
+            )
+            return {
+                column_name: create_area_statistics_dictionary(
+                    self.language,
+                    calculate_summary_statistics(metric_values),
+                    breaks[1:-1],
+                    self.number_of_equal_intervals
+                )
+                for column_name, metric_values, breaks in zip(morphometry.columns, values, jenks_breaks)
+            }
+
+        return pandas.DataFrame(self._get_cached(
+            ('morphometry_statistics', self.number_of_natural_breaks, self.number_of_equal_intervals,
+             self.jenks_engine.get_parameters()),
+            compute
+        ))
+
+    @profile_stage()
+    def classify_morphometry(
+            self,
+            metric: str,
+            scheme: str = 'jenks',
+            number_of_classes: int = None,
+            target_goodness_of_variance_fit: float = None
+    ) \
+            -> list[Union[int, float]]:
+        """ Classifies a metric of MORPHOMETRY_METRICS into the column '<metric> <scheme>' """
+        if metric not in MORPHOMETRY_METRICS:
+            raise ValueError(f'Metric must be one of {MORPHOMETRY_METRICS}, your metric is {metric}')
+        column_name = self.language[metric]
+        if column_name not in self.data.columns:
+            self.add_morphometry_to_data()
+        if self.language['area'] not in self.data.columns:
+            self.calculate_area()
+        scheme_name = self.language[scheme] if scheme in self.language else scheme
+        return self.classify_areas_by_scheme(
+            scheme,
+            number_of_classes,
+            target_goodness_of_variance_fit,
+            area_field_name=column_name,
+            new_column_name=f'{column_name} {scheme_name}'
+        )
+
+    def _get_summary_statistics(self) -> dict[str, int | float]:
+        return self._get_cached('summary_statistics',
+                                lambda: calculate_summary_statistics(self.get_areas().to_numpy()))
+
+    def _get_jenks_breaks_and_error(self) -> tuple[list[Union[int, float]], float]:
+        def compute() -> tuple[list[Union[int, float]], float]:
+            areas = self.get_areas().to_numpy()
+            jenks_breaks = self.jenks_engine.calculate_breaks(areas[~numpy.isnan(areas)],
+                                                              self.number_of_natural_breaks)
+            return jenks_breaks[1:-1], self.jenks_engine.goodness_of_variance_fit_error
+
+        return self._get_cached(
+            ('jenks', self.number_of_natural_breaks, self.jenks_engine.get_parameters()),
+            compute
+        )
+
+    def get_jenks_breaks(self) -> list[Union[int, float]]:
+        return list(self._get_jenks_breaks_and_error()[0])
+
+    def get_jenks_goodness_of_variance_fit_error(self) -> float:
+        """ Non-zero only for the 'sample' Jenks method """
+        return self._get_jenks_breaks_and_error()[1]
+
+    def get_equal_interval_breaks(self) -> list[Union[int, float]]:
+        summary_statistics = self._get_summary_statistics()
+        equal_interval_breaks = self._get_cached(
+            ('equal_interval_breaks', self.number_of_equal_intervals),
+            lambda: calculate_equal_interval_breaks(
+                self.get_areas(),
                 self.number_of_equal_intervals,
-                True
-            ),
-            self.language['maximum']: areas.max(),
-        }
+                True,
+                summary_statistics['minimum'],
+                summary_statistics['maximum']
+            )
+        )
+        return list(equal_interval_breaks)
 
-        return area_statistics
+    @profile_stage()
+    def get_area_statistics(self) -> dict[str, int | float | list[int | float]]:
+        return create_area_statistics_dictionary(
+            self.language,
+            self._get_summary_statistics(),
+            self.get_jenks_breaks(),
+            self.number_of_equal_intervals
+        )
 
-    def add_area_classifications_to_data(self, area_field_name: str = None) -> None:
-        if area_field_name is None:
-            area_field_name = self.language['area']
-        self.classify_areas(
-            area_field_name=area_field_name,
-            breaks=self.get_area_statistics()[self.language['jenks']],
-            labels=string_list_generator(self.language['jenks'] + ' ', self.number_of_natural_breaks),
-            new_column_name=self.language['jenks']
+    @profile_stage()
+    def get_bootstrap_confidence_intervals(
+            self,
+            number_of_resamples: int = DEFAULT_NUMBER_OF_RESAMPLES,
+            confidence_level: float = DEFAULT_CONFIDENCE_LEVEL,
+            seed: int = None,
+            include_jenks: bool = True,
+            jenks_method: str = 'histogram',
+            max_workers: int = None
+    ) \
+            -> pandas.DataFrame:
+        """ Bootstrap percentile confidence intervals and standard errors of the statistics and breaks """
+        jenks_engine = self.jenks_engine if jenks_method is None else JenksEngine(jenks_method, seed=seed)
+        replicates = calculate_bootstrap_replicates(
+            self.get_areas().to_numpy(),
+            number_of_resamples,
+            self.number_of_natural_breaks if include_jenks else None,
+            jenks_engine,
+            seed,
+            max_workers
         )
-        self.classify_areas(
-            area_field_name=area_field_name,
-            breaks=self.get_area_statistics()[self.language['equal_interval_breaks']],
-            labels=string_list_generator(self.language['equal_interval'] + ' ', self.number_of_equal_intervals),
-            new_column_name=self.language['equal_interval_breaks']
+        return create_confidence_interval_table(
+            self.language,
+            self._get_summary_statistics(),
+            replicates,
+            self.get_jenks_breaks() if include_jenks else None,
+            confidence_level
         )
-        self.classify_areas(
-            area_field_name=area_field_name,
-            breaks=[self.get_area_statistics()[self.language['first_quartile']],
-                    self.get_area_statistics()[self.language['second_quartile']],
-                    self.get_area_statistics()[self.language['third_quartile']]],
-            labels=string_list_generator(self.language['quartile'] + ' ', 4),
-            new_column_name=self.language['quartiles']
+
+    @profile_stage()
+    def get_grouped_area_statistics(
+            self,
+            group_column_name: str,
+            sample_area_sizes: dict[Hashable, float] = None,
+            max_workers: int = None
+    ) \
+            -> pandas.DataFrame:
+        """ Statistics of every group of the group column and of the whole data, one column each """
+        group_codes, groups = pandas.factorize(self.data[group_column_name], sort=True)
+        is_grouped = group_codes >= 0
+        summary_statistics, group_values = calculate_grouped_summary_statistics(
+            self.get_areas().to_numpy()[is_grouped],
+            group_codes[is_grouped],
+            len(groups)
+        )
+        jenks_breaks = calculate_jenks_breaks_in_parallel(
+            group_values,
+            self.number_of_natural_breaks,
+            self.jenks_engine,
+            max_workers
         )
+        grouped_area_statistics = {}
+        for code, group in enumerate(groups):
+            area_statistics = create_area_statistics_dictionary(
+                self.language,
+                {name: values[code] for name, values in summary_statistics.items()},
+                jenks_breaks[code][1:-1],
+                self.number_of_equal_intervals
+            )
+            if sample_area_sizes is not None and group in sample_area_sizes:
+                add_sample_area_statistics(area_statistics, self.language, sample_area_sizes[group])
+            grouped_area_statistics[group] = area_statistics
+        total_area_statistics = self.get_area_statistics()
+        if sample_area_sizes is not None and self.language['sample_area_size'] not in total_area_statistics:
+            add_sample_area_statistics(total_area_statistics, self.language, sum(sample_area_sizes.values()))
+        grouped_area_statistics[self.language['study_area']] = total_area_statistics
+        return pandas.DataFrame(grouped_area_statistics)
 
+    @profile_stage()
+    def add_area_classifications_to_data(
+            self,
+            area_field_name: str = None,
+            additional_classifications: dict[str, tuple[list[Union[int, float]], list]] = None
+    ) \
+            -> None:
+        """ Adds the Jenks, equal interval, quartile and additional classifications in one batch """
+        area_statistics = self.get_area_statistics()
+        classifications = {
+            self.language['jenks']: (
+                area_statistics[self.language['jenks']],
+                string_list_generator(self.language['jenks'] + ' ', self.number_of_natural_breaks)
+            ),
+            self.language['equal_interval_breaks']: (
+                area_statistics[self.language['equal_interval_breaks']],
+                string_list_generator(self.language['equal_interval'] + ' ', self.number_of_equal_intervals)
+            ),
+            self.language['quartiles']: (
+                [area_statistics[self.language['first_quartile']],
+                 area_statistics[self.language['second_quartile']],
+                 area_statistics[self.language['third_quartile']]],
+                string_list_generator(self.language['quartile'] + ' ', 4)
+            ),
+        }
+        if additional_classifications is not None:
+            classifications.update(additional_classifications)
+        self.classify_areas_in_batch(classifications, area_field_name)
+        for source in ('jenks', 'equal_interval_breaks', 'quartiles'):
+            self._classifications[self.language[source]]['source'] = source
+
+    @profile_stage()
     def get_classification_area_statistics(
             self,
             classification_column_name: str,
@@ -136,11 +552,11 @@ class AreaStatistics:
         if area_field_name is None:
             area_field_name = self.language['area']
         data_frame = pandas.DataFrame()
-        classes = pandas.Series(self.data[classification_column_name].value_counts())
-        data_frame[self.language['classes']] = classes.index
+        areas_by_classification = self.data.groupby(classification_column_name, observed=True)[area_field_name]
+        classes = areas_by_classification.size()
+        data_frame[self.language['classes']] = classes.index.to_numpy()
         data_frame[self.language['count']] = classes.values
-        summarized_areas_by_classification = pandas.Series(
-            self.data.groupby(classification_column_name)[area_field_name].sum())
+        summarized_areas_by_classification = areas_by_classification.sum()
         data_frame[self.language['area']] = summarized_areas_by_classification.values
         class_average_area = summarized_areas_by_classification / classes
         data_frame[self.language['class_average_area']] = class_average_area.values
@@ -149,9 +565,9 @@ class AreaStatistics:
         if sample_area is not None:
             sample_area_ratio = (summarized_areas_by_classification / sample_area) * 100
             data_frame[self.language['sample_area_ratio']] = sample_area_ratio.values
-        data_frame.sort_values(by=[self.language['classes']], inplace=True)
         return data_frame
 
+    @profile_stage()
     def create_classification_diagram(
             self,
             classification_column_name: str,
@@ -159,91 +575,23 @@ class AreaStatistics:
             dpi: int = 300,
             area_field_name: str = 'area',
             sample_area: float = None,
-            size: tuple = (10, 5),
-            bar_color: str = '#b6d97e',
-            diagram_title: str = None,
-            x_label: str = None,
-            y_label: str = None,
-            y_label_2: str = None,
-            x_ticks: list = None,
-            sample_area_ratio_plot_color: str = 'red',
-            sample_area_ration_plot_marker: str = 'o',
-            sample_area_ratio_plot_line_style: str = 'solid',
-            sample_area_ratio_plot_label: str = None,
-            area_ratio_plot_color: str = 'blue',
-            area_ratio_plot_marker: str = '^',
-            area_ratio_plot_line_style: str = 'dashed',
-            area_ratio_plot_label: str = None,
-            legend_location: str = 'upper right',
+            show: bool = True,
+            headless: bool = False,
+            **options
     ) \
-            -> None:
-        if diagram_title is None:
-            diagram_title = self.language['area_classification']
-        if sample_area_ratio_plot_label is None:
-            sample_area_ratio_plot_label = self.language['sample_area_ratio'] + ' (%)'
-        if area_ratio_plot_label is None:
-            area_ratio_plot_label = self.language['area_ratio'] + ' (%)'
-        if x_label is None:
-            x_label = self.language['classes']
-        if y_label is None:
-            y_label = self.language['count']
-        if y_label_2 is None:
-            y_label_2 = self.language['area_ratio'] + ' (%)'
+            -> 'Figure':
+        """ The options are passed to plot_classification_diagram, a headless figure is rendered with Agg """
+        from src.calculate_statistics.classification_diagrams import finish_figure, plot_classification_diagram
         classification_statistics = self.get_classification_area_statistics(
             classification_column_name,
             area_field_name,
             sample_area
         )
-        figure, ax = pyplot.subplots(figsize=size)
-        ax.bar(
-            classification_statistics[self.language['classes']],
-            classification_statistics[self.language['count']],
-            color=bar_color
-        )
-        pyplot.title(diagram_title, y=1.08)
-        ax.set_xlabel(x_label)
-        ax.set_ylabel(y_label)
-        if x_ticks is None:
-            x_ticks = numpy.arange(0, len(classification_statistics), 1)
-        ax.set_xticks(x_ticks)
-        ax.set_xticklabels(classification_statistics[self.language['classes']])
-        max_count = int(classification_statistics[self.language['count']].max())
-        step_base = int(max_count / 10)
-        y_axis_ticks = create_axis_ticks(max_count, step_base)
-        ax.set_ylim(0, classification_statistics[self.language['count']].max())
-        ax.set_yticks(y_axis_ticks)
-        ax.set_yticklabels(y_axis_ticks)
-        ax2 = ax.twinx()
-        if sample_area is not None:
-            ax2.plot(
-                classification_statistics[self.language['classes']],
-                classification_statistics[self.language['sample_area_ratio']],
-                color=sample_area_ratio_plot_color,
-                linestyle=sample_area_ratio_plot_line_style,
-                marker=sample_area_ration_plot_marker
-            )
-        ax2.plot(
-            classification_statistics[self.language['classes']],
-            classification_statistics[self.language['area_ratio']],
-            color=area_ratio_plot_color,
-            linestyle=area_ratio_plot_line_style,
-            marker=area_ratio_plot_marker
-        )
-        ax2.set_ylabel(y_label_2)
-        ax2.set_ylim(0, 100)
-        ax2.set_yticks(numpy.arange(0, 101, 10))
-        ax2.set_yticklabels(numpy.arange(0, 101, 10))
-        legend_elements = [
-            Line2D([0], [0], color=sample_area_ratio_plot_color, linestyle=sample_area_ratio_plot_line_style,
-                   marker=sample_area_ration_plot_marker, label=sample_area_ratio_plot_label),
-            Line2D([0], [0], color=area_ratio_plot_color, linestyle=area_ratio_plot_line_style,
-                   marker=area_ratio_plot_marker, label=area_ratio_plot_label)
-        ]
-        ax2.legend(handles=legend_elements, loc=legend_location)
-        if path is not None:
-            pyplot.savefig(path, dpi=dpi, bbox_inches='tight')
-        pyplot.show()
+        figure = plot_classification_diagram(classification_statistics, self.language, headless=headless, **options)
+        finish_figure(figure, path, dpi, show and not headless)
+        return figure
 
+    @profile_stage()
     def create_classification_area_ratio_pie_chart(
             self,
             classification_column_name: str,
@@ -253,44 +601,50 @@ class AreaStatistics:
             path: str = None,
             dpi: int = 300,
             diagram_title: str = None,
+            show: bool = True,
+            headless: bool = False
     ) \
-            -> None:
-        """Partially based on https://matplotlib.org/3.1.1/gallery/pie_and_polar_charts/pie_features.html"""
+            -> 'Figure':
+        from src.calculate_statistics.classification_diagrams import (
+            finish_figure,
+            plot_classification_area_ratio_pie_chart
+        )
         if area_field_name is None:
             area_field_name = self.language['area']
-        if diagram_title is None:
-            diagram_title = self.language['pie_chart_diagram_title']
         classification_statistics = self.get_classification_area_statistics(
             classification_column_name,
             area_field_name,
             sample_area
         )
-        figure, ax = pyplot.subplots(figsize=size)
-        patches, texts = ax.pie(
-            classification_statistics[self.language['area_ratio']],
-            startangle=-40,
+        figure = plot_classification_area_ratio_pie_chart(
+            classification_statistics,
+            self.language,
+            size,
+            diagram_title,
+            headless
         )
-        bbox_props = dict(boxstyle='square,pad=0.3', fc='w', ec='k', lw=0.72)
-        kw = dict(arrowprops=dict(arrowstyle='-'),
-                  bbox=bbox_props, zorder=0, va='center')
-
-        for i, p in enumerate(patches):
-            angle = (p.theta2 - p.theta1) / 2. + p.theta1
-            y = numpy.sin(numpy.deg2rad(angle))
-            x = numpy.cos(numpy.deg2rad(angle))
-            horizontalalignment = {-1: 'right', 1: 'left'}[int(numpy.sign(x))]
-            connectionstyle = f'angle,angleA=0,angleB={angle}'
-            kw['arrowprops'].update({'connectionstyle': connectionstyle})
-            ax.annotate(
-                f'{classification_statistics[self.language["classes"]][i]}: ' +
-                f'{classification_statistics[self.language["area_ratio"]][i]:.2f} %',
-                xy=(x, y),
-                xytext=(1.35 * numpy.sign(x), 1.4 * y),
-                horizontalalignment=horizontalalignment, **kw)
-        pyplot.title(diagram_title, y=1.08)
-        if path is not None:
-            pyplot.savefig(path, dpi=dpi, bbox_inches='tight')
-        pyplot.show()
+        finish_figure(figure, path, dpi, show and not headless)
+        return figure
+
+    def create_chart(
+            self,
+            chart_type: str,
+            classification_column_name: str,
+            path: str,
+            area_field_name: str = None,
+            sample_area: float = None,
+            **options
+    ) \
+            -> tuple[str, pandas.DataFrame, dict[str, str], str, dict]:
+        """ Chart description for render_charts_to_files with the classification statistics computed """
+        if area_field_name is None:
+            area_field_name = self.language['area']
+        classification_statistics = self.get_classification_area_statistics(
+            classification_column_name,
+            area_field_name,
+            sample_area
+        )
+        return chart_type, classification_statistics, self.language, path, options
 
     def classify_areas(
             self,
@@ -301,41 +655,682 @@ class AreaStatistics:
     ) -> None:
         if new_column_name is None:
             new_column_name = self.language['area_class']
+        self.classify_areas_in_batch({new_column_name: (breaks, labels)}, area_field_name)
+
+    def _create_classification_engine(
+            self,
+            scheme: str,
+            number_of_classes: int = None,
+            target_goodness_of_variance_fit: float = None,
+            maximum_number_of_classes: int = DEFAULT_MAXIMUM_NUMBER_OF_CLASSES
+    ) \
+            -> ClassificationEngine:
+        if number_of_classes is None:
+            number_of_classes = self.number_of_natural_breaks if scheme == 'jenks' else self.number_of_equal_intervals
+        return ClassificationEngine(
+            scheme,
+            number_of_classes,
+            target_goodness_of_variance_fit,
+            maximum_number_of_classes,
+            self.jenks_engine
+        )
+
+    def get_goodness_of_variance_fits(
+            self,
+            scheme: str = 'jenks',
+            maximum_number_of_classes: int = DEFAULT_MAXIMUM_NUMBER_OF_CLASSES
+    ) \
+            -> pandas.Series:
+        """ Goodness of variance fit of the scheme for every number of classes from 2 up to the maximum """
+        def compute() -> dict[int, float]:
+            classification_engine = self._create_classification_engine(
+                scheme,
+                maximum_number_of_classes=maximum_number_of_classes
+            )
+            classification_engine.calculate_breaks_for_all_classes(self.get_areas().to_numpy())
+            return classification_engine.goodness_of_variance_fits
+
+        goodness_of_variance_fits = self._get_cached(
+            ('goodness_of_variance_fits', scheme, maximum_number_of_classes, self.jenks_engine.get_parameters()),
+            compute
+        )
+        return pandas.Series(
+            goodness_of_variance_fits,
+            name=self.language['goodness_of_variance_fit']
+        ).rename_axis(self.language['number_of_classes'])
+
+    @profile_stage()
+    def classify_areas_by_scheme(
+            self,
+            scheme: str = 'jenks',
+            number_of_classes: int = None,
+            target_goodness_of_variance_fit: float = None,
+            maximum_number_of_classes: int = DEFAULT_MAXIMUM_NUMBER_OF_CLASSES,
+            area_field_name: str = None,
+            new_column_name: str = None
+    ) \
+            -> list[Union[int, float]]:
+        """ Classifies the areas with a scheme of get_classification_scheme_names, returns the inner breaks """
+        classification_engine = self._create_classification_engine(
+            scheme,
+            number_of_classes,
+            target_goodness_of_variance_fit,
+            maximum_number_of_classes
+        )
+        breaks = classification_engine.calculate_breaks(self._get_area_values(area_field_name))
+        label_name = self.language[scheme] if scheme in self.language else scheme
+        if new_column_name is None:
+            new_column_name = label_name
+        self.classify_areas(
+            breaks,
+            string_list_generator(label_name + ' ', classification_engine.selected_number_of_classes),
+            area_field_name,
+            new_column_name
+        )
+        return breaks
+
+    @profile_stage()
+    def classify_areas_in_batch(
+            self,
+            classifications: dict[str, tuple[list[Union[int, float]], list]],
+            area_field_name: str = None
+    ) \
+            -> None:
+        """ Adds a categorical column for every new column name: (breaks, labels) item in one assignment """
         if area_field_name is None:
             area_field_name = self.language['area']
-        if not self.data.columns.values.tolist().__contains__(area_field_name):
+        classifications = self._get_changed_classifications(classifications, area_field_name)
+        if not classifications:
+            return
+        if area_field_name not in self.data.columns:
             self.calculate_area(area_field_name)
-        bins = [self.data[area_field_name].min()] + breaks + [self.data[area_field_name].max()]
-        classification = pandas.cut(x=self.data[area_field_name],
-                                    bins=bins,
-                                    labels=labels,
-                                    ordered=False,
-                                    include_lowest=True)
-        classification = classification.astype(str)
-        self.data.insert(loc=len(self.data.columns), column=new_column_name, value=classification)
+        areas = self.data[area_field_name].to_numpy(dtype=numpy.float64)
+        classification_columns = {
+            new_column_name: create_classification(areas, breaks, labels)
+            for new_column_name, (breaks, labels) in classifications.items()
+        }
+        self.data[list(classification_columns)] = pandas.DataFrame(classification_columns, index=self.data.index)
+        for new_column_name, (breaks, labels) in classifications.items():
+            self._classifications[new_column_name] = {
+                'breaks': list(breaks),
+                'labels': list(labels),
+                'area_field_name': area_field_name,
+                'source': None,
+            }
+
+    def _is_classification_present(self, column_name: str) -> bool:
+        return column_name in self._data.columns
 
+    def _get_changed_classifications(
+            self,
+            classifications: dict[str, tuple[list[Union[int, float]], list]],
+            area_field_name: str
+    ) \
+            -> dict[str, tuple[list[Union[int, float]], list]]:
+        """ The classifications that differ from the present column of the same name """
+        changed_classifications = {}
+        for new_column_name, (breaks, labels) in classifications.items():
+            classification = self._classifications.get(new_column_name)
+            if classification is None or not self._is_classification_present(new_column_name) \
+                    or classification['area_field_name'] != area_field_name \
+                    or classification['labels'] != list(labels) \
+                    or not numpy.array_equal(classification['breaks'], list(breaks)):
+                changed_classifications[new_column_name] = (breaks, labels)
+        return changed_classifications
+
+    def _get_classification_codes(self, column_name: str) -> tuple[numpy.ndarray, list[str]]:
+        categorical = self.data[column_name].array
+        return categorical.codes, list(categorical.categories)
+
+    def _restore_classification(
+            self,
+            column_name: str,
+            classification: dict[str, Any],
+            codes: numpy.ndarray,
+            categories: list[str]
+    ) \
+            -> None:
+        self.data[column_name] = pandas.Categorical.from_codes(codes, categories)
+        self._classifications[column_name] = classification
+
+    def get_cache_parameters(self) -> dict[str, Any]:
+        """ Everything besides the data the cached statistics depend on """
+        return {
+            'class': type(self).__name__,
+            'number_of_natural_breaks': self.number_of_natural_breaks,
+            'number_of_equal_intervals': self.number_of_equal_intervals,
+            'language': self.language,
+            'jenks_engine': self.jenks_engine.get_parameters(),
+        }
+
+    @profile_stage()
+    def save_to_cache(self, cache: 'StatisticsCache', data_hash: str) -> str:
+        """ Stores the areas, the statistics and the classifications under the data hash, returns the key """
+        arrays = {'areas': self.get_areas().to_numpy()}
+        classifications = {}
+        for number, (column_name, classification) in enumerate(self._classifications.items()):
+            if not self._is_classification_present(column_name):
+                continue
+            arrays[f'codes_{number}'], categories = self._get_classification_codes(column_name)
+            classifications[column_name] = {
+                'breaks': [float(value) for value in classification['breaks']],
+                'labels': [str(label) for label in classification['labels']],
+                'area_field_name': classification['area_field_name'],
+                'source': classification['source'],
+                'categories': categories,
+                'array': f'codes_{number}',
+            }
+        metadata = {
+            'rows': len(self.data),
+            'area_column': self.language['area'] in self.data.columns,
+            'cache_entries': [[key, value] for key, value in self._cache.items() if is_persistent_cache_entry(key)],
+            'classifications': classifications,
+        }
+        key = cache.create_key(data_hash, self.get_cache_parameters())
+        cache.save(key, arrays, metadata)
+        return key
+
+    @profile_stage()
+    def load_from_cache(self, cache: 'StatisticsCache', data_hash: str) -> bool:
+        """ Restores what save_to_cache stored, returns False when nothing is cached """
+        cached = cache.load(cache.create_key(data_hash, self.get_cache_parameters()))
+        if cached is None:
+            return False
+        arrays, metadata = cached
+        if metadata['rows'] != len(self.data):
+            raise ValueError(f'Cached statistics must have the rows of the data, the cache has {metadata["rows"]} '
+                             f'rows, your data has {len(self.data)}')
+        self._cache = {'areas': pandas.Series(arrays['areas'], index=self.data.index)}
+        self._cache_geometry_token = create_geometry_token(self.data.geometry)
+        for key, value in metadata['cache_entries']:
+            self._cache[convert_lists_to_tuples(key)] = value
+        if metadata['area_column'] and self.language['area'] not in self.data.columns:
+            self.calculate_area()
+        for column_name, classification in metadata['classifications'].items():
+            codes = arrays[classification.pop('array')]
+            categories = classification.pop('categories')
+            self._restore_classification(column_name, classification, codes, categories)
+        return True
+
+    def _get_incremental_state(self) -> IncrementalAreaState:
+        return self._get_cached(
+            'incremental_state',
+            lambda: IncrementalAreaState(self.get_areas().to_numpy(), self.data.index.to_numpy())
+        )
+
+    def _get_warm_start_jenks(self, refit_threshold: float, window: int) -> Union[WarmStartJenks, None]:
+        """ None while no Jenks breaks have been computed, they are computed on demand after the update """
+        jenks_key = ('jenks', self.number_of_natural_breaks, self.jenks_engine.get_parameters())
+        if jenks_key not in self._cache or len(self._cache[jenks_key][0]) != self.number_of_natural_breaks - 1:
+            return None
+        warm_start_jenks = self._get_cached(
+            ('warm_start_jenks',) + jenks_key[1:],
+            lambda: WarmStartJenks(self._get_incremental_state(), self._cache[jenks_key][0], self.jenks_engine)
+        )
+        warm_start_jenks.refit_threshold = refit_threshold
+        warm_start_jenks.window = window
+        return warm_start_jenks
+
+    def _update_warm_start_jenks(
+            self,
+            warm_start_jenks: Union[WarmStartJenks, None],
+            state: IncrementalAreaState,
+            added_values: numpy.ndarray = None,
+            removed_values: numpy.ndarray = None
+    ) \
+            -> Union[WarmStartJenks, None]:
+        """ Without earlier breaks a Jenks classification column gets breaks computed on the updated areas """
+        if warm_start_jenks is not None:
+            warm_start_jenks.update(added_values, removed_values)
+            return warm_start_jenks
+        if not any(classification['source'] == 'jenks' and self._is_classification_present(column_name)
+                   for column_name, classification in self._classifications.items()):
+            return None
+        breaks = self.jenks_engine.calculate_breaks(state.sorted_values, self.number_of_natural_breaks)
+        return WarmStartJenks(state, breaks[1:-1], self.jenks_engine)
+
+    def _get_classification_breaks(
+            self,
+            source: str,
+            summary_statistics: dict[str, int | float],
+            jenks_breaks: list[Union[int, float]]
+    ) \
+            -> list[Union[int, float]]:
+        if source == 'jenks':
+            return list(jenks_breaks)
+        if source == 'equal_interval_breaks':
+            return calculate_equal_interval_breaks(
+                None,
+                self.number_of_equal_intervals,
+                True,
+                summary_statistics['minimum'],
+                summary_statistics['maximum']
+            )
+        return [summary_statistics['first_quartile'],
+                summary_statistics['second_quartile'],
+                summary_statistics['third_quartile']]
+
+    def _get_updated_classification_breaks(
+            self,
+            summary_statistics: dict[str, int | float],
+            warm_start_jenks: Union[WarmStartJenks, None]
+    ) \
+            -> dict[str, list[Union[int, float]]]:
+        """ Breaks of the classification columns after the update """
+        updated_breaks = {}
+        for column_name, classification in self._classifications.items():
+            if not self._is_classification_present(column_name):
+                continue
+            if classification['source'] is None:
+                updated_breaks[column_name] = classification['breaks']
+            else:
+                updated_breaks[column_name] = self._get_classification_breaks(
+                    classification['source'],
+                    summary_statistics,
+                    [] if warm_start_jenks is None else warm_start_jenks.inner_breaks
+                )
+        return updated_breaks
+
+    def _set_incrementally_updated_cache(
+            self,
+            state: IncrementalAreaState,
+            warm_start_jenks: Union[WarmStartJenks, None]
+    ) \
+            -> None:
+        """ Keeps the areas and replaces the entries the update changed """
+        jenks_key = ('jenks', self.number_of_natural_breaks, self.jenks_engine.get_parameters())
+        cache = {
+            'areas': self._cache['areas'],
+            'incremental_state': state,
+            'summary_statistics': state.get_summary_statistics(),
+        }
+        if warm_start_jenks is not None:
+            cache[jenks_key] = (list(warm_start_jenks.inner_breaks), self.jenks_engine.goodness_of_variance_fit_error)
+            cache[('warm_start_jenks',) + jenks_key[1:]] = warm_start_jenks
+        self._cache = cache
+
+    def _classify_changed_rows_again(
+            self,
+            state: IncrementalAreaState,
+            updated_breaks: dict[str, list[Union[int, float]]]
+    ) \
+            -> None:
+        """ Only the rows between the old and the new position of a moved break are classified again """
+        for column_name, breaks in updated_breaks.items():
+            classification = self._classifications[column_name]
+            if breaks == classification['breaks']:
+                continue
+            if classification['area_field_name'] == self.language['area']:
+                changed_labels = numpy.concatenate([
+                    state.get_labels_between(min(old_break, new_break), max(old_break, new_break))
+                    for old_break, new_break in zip(classification['breaks'], breaks)
+                ])
+                changed_labels = pandas.unique(changed_labels)
+            else:
+                changed_labels = self.data.index.to_numpy()
+            if len(changed_labels) > 0:
+                self._classify_rows_again(column_name, changed_labels, breaks)
+            classification['breaks'] = list(breaks)
+
+    def _classify_rows_again(self, column_name: str, index_labels: numpy.ndarray, breaks: list[Union[int, float]]) \
+            -> None:
+        classification = self._classifications[column_name]
+        for data in self._get_data_pieces():
+            positions = get_label_positions(data.index, index_labels)
+            if len(positions) == 0 or column_name not in data.columns:
+                continue
+            data.iloc[positions, data.columns.get_loc(column_name)] = create_classification(
+                data[classification['area_field_name']].to_numpy(dtype=numpy.float64)[positions],
+                breaks,
+                classification['labels']
+            )
+
+    def _add_feature_classifications(
+            self,
+            features: geopandas.GeoDataFrame,
+            new_areas: pandas.Series,
+            updated_breaks: dict[str, list[Union[int, float]]]
+    ) \
+            -> geopandas.GeoDataFrame:
+        """ The new features with the area and the classification columns of the data """
+        if self.language['area'] in self._data.columns and self.language['area'] not in features.columns:
+            features[self.language['area']] = new_areas
+        for column_name, breaks in updated_breaks.items():
+            classification = self._classifications[column_name]
+            if classification['area_field_name'] in features.columns:
+                features[column_name] = create_classification(
+                    features[classification['area_field_name']].to_numpy(dtype=numpy.float64),
+                    breaks,
+                    classification['labels']
+                )
+        return features
+
+    def _remove_feature_classifications(self, index_labels: pandas.Index) -> None:
+        """ The classification columns are dropped with the rows """
+
+    @profile_stage(rows_argument=1)
+    def add_features(
+            self,
+            features: geopandas.GeoDataFrame,
+            jenks_refit_threshold: float = DEFAULT_JENKS_REFIT_THRESHOLD,
+            jenks_window: int = DEFAULT_JENKS_WINDOW
+    ) \
+            -> None:
+        """ Appends the features and updates the statistics and classifications from the new areas only """
+        if len(features) == 0:
+            return
+        is_contains_only_polygons(features)
+        if features.crs != self._data.crs:
+            raise ValueError(f'Features must have the CRS of the data, your CRS is {features.crs}')
+        indexes = [data.index for data in self._get_data_pieces()]
+        if features.index.has_duplicates or any((index.get_indexer(features.index) >= 0).any() for index in indexes):
+            if not pandas.api.types.is_integer_dtype(self._data.index):
+                raise ValueError('Features must have index labels that are not in the data')
+            first_label = max((int(index.max()) + 1 for index in indexes if len(index) > 0), default=0)
+            features = features.set_axis(pandas.RangeIndex(first_label, first_label + len(features)))
+        else:
+            features = features.copy()
+        state = self._get_incremental_state()
+        warm_start_jenks = self._get_warm_start_jenks(jenks_refit_threshold, jenks_window)
+        new_areas = self._calculate_areas(features.geometry)
+        state.add(new_areas.to_numpy(), features.index.to_numpy())
+        warm_start_jenks = self._update_warm_start_jenks(warm_start_jenks, state, added_values=new_areas.to_numpy())
+        updated_breaks = self._get_updated_classification_breaks(state.get_summary_statistics(), warm_start_jenks)
+        self._appended_features.append(self._add_feature_classifications(features, new_areas, updated_breaks))
+        self._appended_areas.append(new_areas)
+        self._set_incrementally_updated_cache(state, warm_start_jenks)
+        self._classify_changed_rows_again(state, updated_breaks)
+
+    @profile_stage()
+    def remove_features(
+            self,
+            index_labels: list[Hashable],
+            jenks_refit_threshold: float = DEFAULT_JENKS_REFIT_THRESHOLD,
+            jenks_window: int = DEFAULT_JENKS_WINDOW
+    ) \
+            -> None:
+        """ Drops the features and updates the statistics and classifications from the removed areas only """
+        index_labels = pandas.Index(index_labels).unique()
+        unknown_labels = index_labels.difference(self.data.index)
+        if len(unknown_labels) > 0:
+            raise ValueError(f'Index labels must be in the data, your unknown labels are {list(unknown_labels)}')
+        if len(index_labels) == 0:
+            return
+        state = self._get_incremental_state()
+        warm_start_jenks = self._get_warm_start_jenks(jenks_refit_threshold, jenks_window)
+        areas = self.get_areas()
+        removed_areas = areas.loc[index_labels]
+        state.remove(removed_areas.to_numpy(), removed_areas.index.to_numpy())
+        warm_start_jenks = self._update_warm_start_jenks(
+            warm_start_jenks,
+            state,
+            removed_values=removed_areas.to_numpy()
+        )
+        updated_breaks = self._get_updated_classification_breaks(state.get_summary_statistics(), warm_start_jenks)
+        self._remove_feature_classifications(index_labels)
+        self._data = self._data.drop(index=index_labels)
+        self._cache['areas'] = areas.drop(index=index_labels)
+        self._cache_geometry_token = create_geometry_token(self._data.geometry)
+        self._set_incrementally_updated_cache(state, warm_start_jenks)
+        self._classify_changed_rows_again(state, updated_breaks)
+
+    @profile_stage()
+    def get_data_for_export(self) -> geopandas.GeoDataFrame:
+        """ Copy of the data with the categorical classifications as plain labels, which every driver can write """
+        data = self.data.copy()
+        for column_name in data.select_dtypes('category').columns:
+            data[column_name] = data[column_name].astype(object)
+        return data
+
+    @profile_stage()
     def calculate_area(self, column_name: str = None) -> None:
         if column_name is None:
             column_name = self.language['area']
-        self.data[column_name] = self.data.area
+        self.data[column_name] = self.get_areas()
+
+
+class CompactAreaStatistics(AreaStatistics):
+    """ Area statistics kept in an area array and code arrays, the data gets no columns """
+
+    def __init__(
+            self,
+            data: geopandas.GeoDataFrame,
+            number_of_natural_breaks: int = 4,
+            number_of_equal_intervals: int = 4,
+            language: str = 'en',
+            jenks_method: str = 'auto',
+            area_dtype: numpy.dtype = numpy.float64
+    ):
+        if numpy.dtype(area_dtype) not in (numpy.float32, numpy.float64):
+            raise ValueError(f'Area dtype must be float32 or float64, your area dtype is {area_dtype}')
+        self.area_dtype = numpy.dtype(area_dtype)
+        super().__init__(data, number_of_natural_breaks, number_of_equal_intervals, language, jenks_method)
+
+    def _calculate_areas(self, geometry: geopandas.GeoSeries) -> pandas.Series:
+        return pandas.Series(calculate_geometry_areas(geometry).astype(self.area_dtype, copy=False),
+                             index=geometry.index)
+
+    @profile_stage()
+    def calculate_area(self, column_name: str = None) -> None:
+        """ The areas are kept in the area array, the area column is only added on export """
+        self.get_areas()
+
+    @profile_stage()
+    def add_morphometry_to_data(self) -> None:
+        """ The metrics are kept in the cached table, their columns are only added on export """
+        self.get_morphometry()
+
+    @profile_stage()
+    def classify_areas_in_batch(
+            self,
+            classifications: dict[str, tuple[list[Union[int, float]], list]],
+            area_field_name: str = None
+    ) \
+            -> None:
+        """ Stores the category codes of every new column name: (breaks, labels) item """
+        areas = self._get_area_values(area_field_name)
+        if area_field_name is None:
+            area_field_name = self.language['area']
+        classifications = self._get_changed_classifications(classifications, area_field_name)
+        for new_column_name, (breaks, labels) in classifications.items():
+            codes, categories = calculate_label_codes(areas, breaks, labels)
+            self._classifications[new_column_name] = {
+                'breaks': list(breaks),
+                'labels': list(labels),
+                'area_field_name': area_field_name,
+                'source': None,
+                'codes': codes,
+                'categories': categories,
+            }
+
+    def _is_classification_present(self, column_name: str) -> bool:
+        return 'codes' in self._classifications.get(column_name, {})
+
+    def _get_classification_codes(self, column_name: str) -> tuple[numpy.ndarray, list[str]]:
+        classification = self._classifications[column_name]
+        return classification['codes'], list(classification['categories'])
+
+    def _restore_classification(
+            self,
+            column_name: str,
+            classification: dict[str, Any],
+            codes: numpy.ndarray,
+            categories: list[str]
+    ) \
+            -> None:
+        self._classifications[column_name] = {**classification, 'codes': codes, 'categories': categories}
+
+    def get_cache_parameters(self) -> dict[str, Any]:
+        return {**super().get_cache_parameters(), 'area_dtype': self.area_dtype.name}
+
+    def get_classification(self, classification_column_name: str) -> pandas.Categorical:
+        """ The classification as a categorical, its codes are shared with the stored code array """
+        classification = self._classifications[classification_column_name]
+        return pandas.Categorical.from_codes(classification['codes'], classification['categories'])
+
+    @profile_stage()
+    def get_classification_area_statistics(
+            self,
+            classification_column_name: str,
+            area_field_name: str = None,
+            sample_area: float = None
+    ) \
+            -> pandas.DataFrame:
+        """ The same table as AreaStatistics.get_classification_area_statistics from two bincounts of the codes """
+        if classification_column_name not in self._classifications:
+            return super().get_classification_area_statistics(classification_column_name, area_field_name, sample_area)
+        classification = self._classifications[classification_column_name]
+        codes = classification['codes']
+        is_classified = codes >= 0
+        number_of_categories = len(classification['categories'])
+        counts = numpy.bincount(codes[is_classified], minlength=number_of_categories)
+        areas = numpy.bincount(
+            codes[is_classified],
+            weights=self._get_area_values(area_field_name)[is_classified].astype(numpy.float64),
+            minlength=number_of_categories
+        )
+        is_observed = counts > 0
+        counts = counts[is_observed]
+        areas = areas[is_observed]
+        data_frame = pandas.DataFrame()
+        data_frame[self.language['classes']] = numpy.asarray(classification['categories'], dtype=object)[is_observed]
+        data_frame[self.language['count']] = counts
+        data_frame[self.language['area']] = areas
+        data_frame[self.language['class_average_area']] = areas / counts
+        data_frame[self.language['area_ratio']] = (areas / areas.sum()) * 100
+        if sample_area is not None:
+            data_frame[self.language['sample_area_ratio']] = (areas / sample_area) * 100
+        return data_frame
+
+    @profile_stage()
+    def get_data_for_export(self) -> geopandas.GeoDataFrame:
+        """ Copy of the data with the area column, the computed morphometry and the classifications as plain labels """
+        data = self.data.copy()
+        if self.language['area'] not in data.columns:
+            data[self.language['area']] = self.get_areas()
+        if 'morphometry' in self._cache:
+            morphometry = self.get_morphometry()
+            data[list(morphometry.columns)] = morphometry
+        for column_name, classification in self._classifications.items():
+            if 'codes' in classification:
+                label_table = numpy.asarray(classification['categories'] + [None], dtype=object)
+                data[column_name] = label_table[classification['codes']]
+        return data
+
+    def _classify_rows_again(self, column_name: str, index_labels: numpy.ndarray, breaks: list[Union[int, float]]) \
+            -> None:
+        classification = self._classifications[column_name]
+        area_field_name = classification['area_field_name']
+        values = None
+        if area_field_name in self._data.columns or area_field_name in self._get_morphometry_column_names():
+            values = self._get_area_values(area_field_name)
+        offset = 0
+        for data, areas in zip(self._get_data_pieces(), [self._cache['areas']] + self._appended_areas):
+            positions = get_label_positions(data.index, index_labels)
+            piece_values = areas.to_numpy()[positions] if values is None else values[offset + positions]
+            codes, _ = calculate_label_codes(piece_values, breaks, classification['labels'])
+            classification['codes'][offset + positions] = codes
+            offset += len(data)
+
+    def _add_feature_classifications(
+            self,
+            features: geopandas.GeoDataFrame,
+            new_areas: pandas.Series,
+            updated_breaks: dict[str, list[Union[int, float]]]
+    ) \
+            -> geopandas.GeoDataFrame:
+        """ Extends the code arrays by the codes of the new features """
+        for column_name, breaks in updated_breaks.items():
+            classification = self._classifications[column_name]
+            if classification['area_field_name'] in features.columns:
+                values = features[classification['area_field_name']].to_numpy(dtype=numpy.float64)
+            elif classification['area_field_name'] == self.language['area']:
+                values = new_areas.to_numpy(dtype=numpy.float64)
+            else:
+                values = numpy.full(len(features), numpy.nan)
+            codes, _ = calculate_label_codes(values, breaks, classification['labels'])
+            classification['codes'] = numpy.concatenate((classification['codes'], codes))
+        return features
+
+    def _remove_feature_classifications(self, index_labels: pandas.Index) -> None:
+        is_kept = ~self.data.index.isin(index_labels)
+        for classification in self._classifications.values():
+            if 'codes' in classification:
+                classification['codes'] = classification['codes'][is_kept]
 
 
 class AreaStatisticsComparisonWithSampleArea(AreaStatistics):
+    """ Statistics compared with the size of the sampled area, optionally overlaid on sample areas """
 
     def __init__(
             self,
             data: geopandas.GeoDataFrame,
-            sample_area_size: float,
+            sample_area_size: float = None,
             number_of_natural_breaks: int = 4,
             number_of_equal_intervals: int = 4,
-            language: str = 'en'
+            language: str = 'en',
+            jenks_method: str = 'auto',
+            sample_areas: geopandas.GeoDataFrame = None,
+            sample_area_column: str = None
     ):
-        super().__init__(data, number_of_natural_breaks, number_of_equal_intervals, language)
+        if (sample_area_size is None) == (sample_areas is None):
+            raise ValueError('Either the sample area size or the sample areas must be given')
+        self.sample_area_table = None
+        self.sample_areas_hash = None
+        if sample_areas is not None:
+            data, self.sample_area_table = overlay_sample_areas(data, sample_areas, sample_area_column, language)
+            self.sample_areas_hash = hash_sample_areas(sample_areas, sample_area_column)
+        super().__init__(data, number_of_natural_breaks, number_of_equal_intervals, language, jenks_method)
+        if self.sample_area_table is not None:
+            sample_area_size = float(self.sample_area_table.loc[self.language['study_area'],
+                                                                 self.language['sample_area_size']])
         self.sample_area_size = sample_area_size
 
+    @profile_stage()
+    def get_bootstrap_confidence_intervals(
+            self,
+            number_of_resamples: int = DEFAULT_NUMBER_OF_RESAMPLES,
+            confidence_level: float = DEFAULT_CONFIDENCE_LEVEL,
+            seed: int = None,
+            include_jenks: bool = True,
+            jenks_method: str = 'histogram',
+            max_workers: int = None
+    ) \
+            -> pandas.DataFrame:
+        """ The experimental area ratio is proportional to the sum, its interval is the scaled interval of the sum """
+        confidence_intervals = super().get_bootstrap_confidence_intervals(
+            number_of_resamples,
+            confidence_level,
+            seed,
+            include_jenks,
+            jenks_method,
+            max_workers
+        )
+        confidence_intervals.loc[self.language['experimental_area_ratio']] = \
+            confidence_intervals.loc[self.language['sum']] / self.sample_area_size * 100
+        return confidence_intervals
+
+    def get_cache_parameters(self) -> dict[str, Any]:
+        return {**super().get_cache_parameters(), 'sample_area_size': self.sample_area_size,
+                'sample_areas': self.sample_areas_hash}
+
+    def get_sample_area_sizes(self) -> dict[Hashable, float]:
+        """ Size of every sample area by name, from the overlay """
+        if self.sample_area_table is None:
+            raise ValueError('Sample area sizes are only known when the sample areas are given as geometries')
+        return self.sample_area_table[self.language['sample_area_size']] \
+            .drop(self.language['study_area']).to_dict()
+
+    def get_sample_area_statistics(self, max_workers: int = None) -> pandas.DataFrame:
+        """ Statistics of every sample area and of the whole study area compared with their sizes """
+        return self.get_grouped_area_statistics(
+            self.language['sub_area_name'],
+            self.get_sample_area_sizes(),
+            max_workers
+        )
+
+    @profile_stage()
     def get_area_statistics(self):
         area_statistics = super().get_area_statistics()
-        area_statistics[self.language['sample_area_size']] = self.sample_area_size
-        area_statistics[self.language['experimental_area_ratio']] = \
-            (area_statistics[self.language['sum']] / self.sample_area_size) * 100
+        add_sample_area_statistics(area_statistics, self.language, self.sample_area_size)
         return area_statistics
@@ -0,0 +1,189 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Union
+
+import numpy
+import pandas
+
+from src.calculate_statistics.jenks import JenksEngine, calculate_breaks_if_possible
+from src.calculate_statistics.summary_statistics import QUARTILES
+
+BOOTSTRAP_STATISTICS = (
+    'sum',
+    'mean',
+    'median',
+    'std',
+    'var',
+    'minimum',
+    'first_quartile',
+    'second_quartile',
+    'third_quartile',
+    'maximum'
+)
+DEFAULT_NUMBER_OF_RESAMPLES = 1000
+DEFAULT_CONFIDENCE_LEVEL = 0.95
+MAXIMUM_BATCH_ELEMENTS = 10000000
+TASKS_PER_WORKER = 4
+
+_worker_values = None
+
+
+def get_quantile_positions(size: int) -> dict[str, tuple[int, int, float]]:
+    """ Lower and upper rank and interpolation fraction of every quartile, as calculate_quantile_from_sorted """
+    quantile_positions = {}
+    for name, quantile in QUARTILES.items():
+        position = quantile * (size - 1)
+        lower_index = int(numpy.floor(position))
+        quantile_positions[name] = (lower_index, min(lower_index + 1, size - 1), position - lower_index)
+    return quantile_positions
+
+
+def calculate_resample_statistics(resamples: numpy.ndarray) -> dict[str, numpy.ndarray]:
+    """ The bootstrap statistics of every row of a resample matrix, the rows are partitioned in place """
+    number_of_resamples, size = resamples.shape
+    quantile_positions = get_quantile_positions(size)
+    ranks = sorted({0, size - 1} | {rank for lower, upper, _ in quantile_positions.values() for rank in (lower, upper)})
+    sums = resamples.sum(axis=1)
+    means = sums / size
+    resamples.partition(ranks, axis=1)
+    statistics = {
+        'sum': sums,
+        'mean': means,
+        'minimum': resamples[:, 0].copy(),
+        'maximum': resamples[:, -1].copy(),
+    }
+    for name, (lower_index, upper_index, fraction) in quantile_positions.items():
+        lower_values = resamples[:, lower_index]
+        statistics[name] = lower_values + (resamples[:, upper_index] - lower_values) * fraction
+    statistics['median'] = statistics['second_quartile']
+    resamples -= means[:, None]
+    numpy.square(resamples, out=resamples)
+    if size > 1:
+        statistics['var'] = resamples.sum(axis=1) / (size - 1)
+    else:
+        statistics['var'] = numpy.full(number_of_resamples, numpy.nan)
+    statistics['std'] = numpy.sqrt(statistics['var'])
+    return statistics
+
+
+def set_worker_values(values: numpy.ndarray) -> None:
+    """ Process pool initializer, the values are sent to every worker once instead of with every task """
+    global _worker_values
+    _worker_values = values
+
+
+def draw_resamples(values: numpy.ndarray, seed_sequences: list[numpy.random.SeedSequence]) -> numpy.ndarray:
+    """ One resample row per seed sequence, so a resample does not depend on how the resamples are batched """
+    return numpy.stack([
+        values[numpy.random.default_rng(seed_sequence).integers(0, len(values), size=len(values))]
+        for seed_sequence in seed_sequences
+    ])
+
+
+def calculate_batch_replicates(
+        seed_sequences: list[numpy.random.SeedSequence],
+        number_of_classes: Union[int, None],
+        jenks_engine: JenksEngine,
+        values: numpy.ndarray = None
+) \
+        -> dict[str, numpy.ndarray]:
+    """ Bootstrap replicates of one batch of resamples drawn from their seed sequences """
+    if values is None:
+        values = _worker_values
+    resamples = draw_resamples(values, seed_sequences)
+    jenks_breaks = None
+    if number_of_classes is not None:
+        jenks_breaks = numpy.array([
+            breaks[1:-1] if breaks else [numpy.nan] * (number_of_classes - 1)
+            for breaks in (calculate_breaks_if_possible(jenks_engine, resample, number_of_classes)
+                           for resample in resamples)
+        ], dtype=numpy.float64).reshape(len(resamples), number_of_classes - 1)
+    batch = calculate_resample_statistics(resamples)
+    if jenks_breaks is not None:
+        batch['jenks'] = jenks_breaks
+    return batch
+
+
+def calculate_bootstrap_replicates(
+        values: numpy.ndarray,
+        number_of_resamples: int = DEFAULT_NUMBER_OF_RESAMPLES,
+        number_of_classes: int = None,
+        jenks_engine: JenksEngine = None,
+        seed: int = None,
+        max_workers: int = None,
+        max_batch_elements: int = MAXIMUM_BATCH_ELEMENTS
+) \
+        -> dict[str, numpy.ndarray]:
+    """ Bootstrap replicates of the summary statistics, every resample has its own seed sequence """
+    if number_of_resamples < 1:
+        raise ValueError(f'Number of resamples must be at least 1, your number is {number_of_resamples}')
+    values = numpy.asarray(values, dtype=numpy.float64)
+    values = values[~numpy.isnan(values)]
+    size = len(values)
+    if size == 0:
+        raise ValueError('Bootstrap needs at least one area')
+    if jenks_engine is None:
+        jenks_engine = JenksEngine()
+    seed_sequences = numpy.random.SeedSequence(seed).spawn(number_of_resamples)
+    batch_size = max(1, max_batch_elements // size)
+    is_parallel = number_of_classes is not None and max_workers != 1
+    if is_parallel:
+        number_of_workers = max_workers or os.cpu_count() or 1
+        batch_size = min(batch_size, max(1, -(-number_of_resamples // (number_of_workers * TASKS_PER_WORKER))))
+    batches = [seed_sequences[start:start + batch_size] for start in range(0, number_of_resamples, batch_size)]
+    if not is_parallel or len(batches) < 2:
+        results = [calculate_batch_replicates(batch, number_of_classes, jenks_engine, values) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=set_worker_values,
+                                 initargs=(values,)) as executor:
+            results = list(executor.map(
+                calculate_batch_replicates,
+                batches,
+                repeat(number_of_classes),
+                repeat(jenks_engine)
+            ))
+    return {name: numpy.concatenate([result[name] for result in results]) for name in results[0]}
+
+
+def calculate_confidence_interval(
+        replicates: numpy.ndarray,
+        confidence_level: float = DEFAULT_CONFIDENCE_LEVEL
+) \
+        -> tuple[Union[float, numpy.ndarray], Union[float, numpy.ndarray], Union[float, numpy.ndarray]]:
+    """ Percentile interval and standard error of the replicates along the first axis, missing replicates skipped """
+    if not 0 < confidence_level < 1:
+        raise ValueError(f'Confidence level must be between 0 and 1, your confidence level is {confidence_level}')
+    alpha = 1 - confidence_level
+    lower, upper = numpy.nanquantile(replicates, [alpha / 2, 1 - alpha / 2], axis=0)
+    return lower, upper, numpy.nanstd(replicates, axis=0, ddof=1)
+
+
+def create_confidence_interval_table(
+        language: dict[str, str],
+        estimates: dict[str, Union[int, float]],
+        replicates: dict[str, numpy.ndarray],
+        jenks_breaks: list[Union[int, float]] = None,
+        confidence_level: float = DEFAULT_CONFIDENCE_LEVEL
+) \
+        -> pandas.DataFrame:
+    """ One row per statistic and per inner Jenks break with the estimate next to its confidence interval """
+    rows = {}
+    for name in BOOTSTRAP_STATISTICS:
+        lower, upper, standard_error = calculate_confidence_interval(replicates[name], confidence_level)
+        rows[language[name]] = [estimates[name], lower, upper, standard_error]
+    if jenks_breaks is not None and 'jenks' in replicates:
+        lower, upper, standard_error = calculate_confidence_interval(replicates['jenks'], confidence_level)
+        for number, jenks_break in enumerate(jenks_breaks):
+            rows[f'{language["jenks"]} {number + 1}'] = \
+                [jenks_break, lower[number], upper[number], standard_error[number]]
+    return pandas.DataFrame.from_dict(
+        rows,
+        orient='index',
+        columns=[
+            language['estimate'],
+            language['lower_confidence_limit'],
+            language['upper_confidence_limit'],
+            language['standard_error']
+        ]
+    )
@@ -0,0 +1,194 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import numpy
+import pandas
+from matplotlib import pyplot
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+from src.utils.math_utils.rounding_utils import round_up, get_scale_of_number
+
+CHART_TYPES = ('diagram', 'pie_chart')
+
+
+def create_axis_ticks(max_count: int, step_base: int, start: int = 0) -> numpy.ndarray:
+    y_axis_ticks = numpy.arange(
+        start,
+        stop=max_count + round_up(step_base, get_scale_of_number(step_base) * -1) + 1,
+        step=int(round_up(step_base, get_scale_of_number(step_base) * -1)))
+    return y_axis_ticks
+
+
+def create_figure(size: tuple, headless: bool = False) -> Figure:
+    """ Headless figures are not registered in pyplot, so they are never shown """
+    if headless:
+        return Figure(figsize=size)
+    return pyplot.figure(figsize=size)
+
+
+def plot_classification_diagram(
+        classification_statistics: pandas.DataFrame,
+        language: dict[str, str],
+        size: tuple = (10, 5),
+        bar_color: str = '#b6d97e',
+        diagram_title: str = None,
+        x_label: str = None,
+        y_label: str = None,
+        y_label_2: str = None,
+        x_ticks: list = None,
+        sample_area_ratio_plot_color: str = 'red',
+        sample_area_ration_plot_marker: str = 'o',
+        sample_area_ratio_plot_line_style: str = 'solid',
+        sample_area_ratio_plot_label: str = None,
+        area_ratio_plot_color: str = 'blue',
+        area_ratio_plot_marker: str = '^',
+        area_ratio_plot_line_style: str = 'dashed',
+        area_ratio_plot_label: str = None,
+        legend_location: str = 'upper right',
+        headless: bool = False
+) \
+        -> Figure:
+    if diagram_title is None:
+        diagram_title = language['area_classification']
+    if sample_area_ratio_plot_label is None:
+        sample_area_ratio_plot_label = language['sample_area_ratio'] + ' (%)'
+    if area_ratio_plot_label is None:
+        area_ratio_plot_label = language['area_ratio'] + ' (%)'
+    if x_label is None:
+        x_label = language['classes']
+    if y_label is None:
+        y_label = language['count']
+    if y_label_2 is None:
+        y_label_2 = language['area_ratio'] + ' (%)'
+    figure = create_figure(size, headless)
+    ax = figure.subplots()
+    ax.bar(
+        classification_statistics[language['classes']],
+        classification_statistics[language['count']],
+        color=bar_color
+    )
+    ax.set_title(diagram_title, y=1.08)
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    if x_ticks is None:
+        x_ticks = numpy.arange(0, len(classification_statistics), 1)
+    ax.set_xticks(x_ticks)
+    ax.set_xticklabels(classification_statistics[language['classes']])
+    max_count = int(classification_statistics[language['count']].max())
+    step_base = int(max_count / 10)
+    y_axis_ticks = create_axis_ticks(max_count, step_base)
+    ax.set_ylim(0, classification_statistics[language['count']].max())
+    ax.set_yticks(y_axis_ticks)
+    ax.set_yticklabels(y_axis_ticks)
+    ax2 = ax.twinx()
+    if language['sample_area_ratio'] in classification_statistics.columns:
+        ax2.plot(
+            classification_statistics[language['classes']],
+            classification_statistics[language['sample_area_ratio']],
+            color=sample_area_ratio_plot_color,
+            linestyle=sample_area_ratio_plot_line_style,
+            marker=sample_area_ration_plot_marker
+        )
+    ax2.plot(
+        classification_statistics[language['classes']],
+        classification_statistics[language['area_ratio']],
+        color=area_ratio_plot_color,
+        linestyle=area_ratio_plot_line_style,
+        marker=area_ratio_plot_marker
+    )
+    ax2.set_ylabel(y_label_2)
+    ax2.set_ylim(0, 100)
+    ax2.set_yticks(numpy.arange(0, 101, 10))
+    ax2.set_yticklabels(numpy.arange(0, 101, 10))
+    legend_elements = [
+        Line2D([0], [0], color=sample_area_ratio_plot_color, linestyle=sample_area_ratio_plot_line_style,
+               marker=sample_area_ration_plot_marker, label=sample_area_ratio_plot_label),
+        Line2D([0], [0], color=area_ratio_plot_color, linestyle=area_ratio_plot_line_style,
+               marker=area_ratio_plot_marker, label=area_ratio_plot_label)
+    ]
+    ax2.legend(handles=legend_elements, loc=legend_location)
+    return figure
+
+
+def plot_classification_area_ratio_pie_chart(
+        classification_statistics: pandas.DataFrame,
+        language: dict[str, str],
+        size: tuple = (10, 5),
+        diagram_title: str = None,
+        headless: bool = False
+) \
+        -> Figure:
+    """Partially based on https://matplotlib.org/3.1.1/gallery/pie_and_polar_charts/pie_features.html"""
+    if diagram_title is None:
+        diagram_title = language['pie_chart_diagram_title']
+    figure = create_figure(size, headless)
+    ax = figure.subplots()
+    patches, texts = ax.pie(
+        classification_statistics[language['area_ratio']],
+        startangle=-40,
+    )
+    bbox_props = dict(boxstyle='square,pad=0.3', fc='w', ec='k', lw=0.72)
+    kw = dict(arrowprops=dict(arrowstyle='-'),
+              bbox=bbox_props, zorder=0, va='center')
+
+    for i, p in enumerate(patches):
+        angle = (p.theta2 - p.theta1) / 2. + p.theta1
+        y = numpy.sin(numpy.deg2rad(angle))
+        x = numpy.cos(numpy.deg2rad(angle))
+        horizontalalignment = {-1: 'right', 1: 'left'}[int(numpy.sign(x))]
+        connectionstyle = f'angle,angleA=0,angleB={angle}'
+        kw['arrowprops'].update({'connectionstyle': connectionstyle})
+        ax.annotate(
+            f'{classification_statistics[language["classes"]][i]}: ' +
+            f'{classification_statistics[language["area_ratio"]][i]:.2f} %',
+            xy=(x, y),
+            xytext=(1.35 * numpy.sign(x), 1.4 * y),
+            horizontalalignment=horizontalalignment, **kw)
+    ax.set_title(diagram_title, y=1.08)
+    return figure
+
+
+def finish_figure(figure: Figure, path: str = None, dpi: int = 300, show: bool = True) -> None:
+    """ Saves the figure if a path is given, then shows it or, when it is not shown, releases it from pyplot """
+    if path is not None:
+        figure.savefig(path, dpi=dpi, bbox_inches='tight')
+    if show:
+        pyplot.show()
+    else:
+        pyplot.close(figure)
+
+
+def render_chart_to_file(
+        chart_type: str,
+        classification_statistics: pandas.DataFrame,
+        language: dict[str, str],
+        path: str,
+        options: dict[str, Any] = None
+) \
+        -> str:
+    """ Renders one chart headlessly to the path, the options are passed to the plot function, dpi to savefig """
+    options = dict(options or {})
+    dpi = options.pop('dpi', 300)
+    if chart_type == 'diagram':
+        figure = plot_classification_diagram(classification_statistics, language, headless=True, **options)
+    elif chart_type == 'pie_chart':
+        figure = plot_classification_area_ratio_pie_chart(classification_statistics, language, headless=True,
+                                                          **options)
+    else:
+        raise ValueError(f'Chart type must be one of {CHART_TYPES}, your chart type is {chart_type}')
+    finish_figure(figure, path, dpi, show=False)
+    return path
+
+
+def render_charts_to_files(
+        charts: list[tuple[str, pandas.DataFrame, dict[str, str], str, dict[str, Any]]],
+        max_workers: int = None
+) \
+        -> list[str]:
+    """ Renders the charts in a process pool, returns the paths in the order of the charts """
+    if max_workers == 1 or len(charts) < 2:
+        return [render_chart_to_file(*chart) for chart in charts]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(render_chart_to_file, *chart) for chart in charts]
+        return [future.result() for future in futures]
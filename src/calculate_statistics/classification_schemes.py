@@ -0,0 +1,197 @@
+from typing import Callable, Union
+
+import numpy
+
+from src.calculate_statistics.jenks import JenksEngine
+from src.calculate_statistics.summary_statistics import calculate_quantile_from_sorted
+
+DEFAULT_MAXIMUM_NUMBER_OF_CLASSES = 10
+HEAD_TAIL_HEAD_RATIO_LIMIT = 0.4
+
+
+def calculate_equal_interval_scheme_breaks(sorted_values: numpy.ndarray, number_of_classes: int) \
+        -> list[Union[int, float]]:
+    interval = (sorted_values[-1] - sorted_values[0]) / number_of_classes
+    return [float(sorted_values[0] + i * interval) for i in range(1, number_of_classes)]
+
+
+def calculate_quantile_breaks(sorted_values: numpy.ndarray, number_of_classes: int) -> list[Union[int, float]]:
+    """ Classes of equal counts, equal areas can make neighbouring breaks equal and leave a class empty """
+    return [calculate_quantile_from_sorted(sorted_values, i / number_of_classes) for i in range(1, number_of_classes)]
+
+
+def calculate_geometric_interval_breaks(sorted_values: numpy.ndarray, number_of_classes: int) \
+        -> list[Union[int, float]]:
+    """ Every class is the previous class multiplied by the same ratio, for right skewed areas """
+    minimum = float(sorted_values[0])
+    if minimum <= 0:
+        raise ValueError(f'Geometric interval needs positive areas, your minimum is {minimum}')
+    ratio = (float(sorted_values[-1]) / minimum) ** (1 / number_of_classes)
+    return [minimum * ratio ** i for i in range(1, number_of_classes)]
+
+
+def calculate_head_tail_breaks(sorted_values: numpy.ndarray, number_of_classes: int) -> list[Union[int, float]]:
+    """ Jiang's head/tail breaks, the number of classes is an upper limit """
+    breaks = []
+    head = sorted_values
+    while len(breaks) < number_of_classes - 1 and len(head) > 1:
+        mean = float(head.mean())
+        new_head = head[numpy.searchsorted(head, mean, side='right'):]
+        if len(new_head) == 0 or len(new_head) / len(head) > HEAD_TAIL_HEAD_RATIO_LIMIT:
+            break
+        breaks.append(mean)
+        head = new_head
+    return breaks
+
+
+def calculate_standard_deviation_breaks(sorted_values: numpy.ndarray, number_of_classes: int) \
+        -> list[Union[int, float]]:
+    """ Classes one standard deviation wide around the mean, breaks outside the areas are left out """
+    mean = float(sorted_values.mean())
+    std = float(sorted_values.std(ddof=1)) if len(sorted_values) > 1 else 0.0
+    breaks = [mean + (i - number_of_classes / 2) * std for i in range(1, number_of_classes)]
+    return [value for value in breaks if sorted_values[0] <= value < sorted_values[-1]]
+
+
+CLASSIFICATION_SCHEMES = {
+    'equal_interval': calculate_equal_interval_scheme_breaks,
+    'quantile': calculate_quantile_breaks,
+    'geometric_interval': calculate_geometric_interval_breaks,
+    'head_tail': calculate_head_tail_breaks,
+    'standard_deviation': calculate_standard_deviation_breaks,
+}
+
+
+def register_classification_scheme(
+        name: str,
+        calculate_breaks: Callable[[numpy.ndarray, int], list[Union[int, float]]]
+) \
+        -> None:
+    """ Adds a scheme, a function of the sorted areas and the number of classes returning the inner breaks """
+    if name == 'jenks':
+        raise ValueError('The jenks scheme is computed by the Jenks engine and cannot be replaced')
+    CLASSIFICATION_SCHEMES[name] = calculate_breaks
+
+
+def get_classification_scheme_names() -> list[str]:
+    return ['jenks'] + list(CLASSIFICATION_SCHEMES)
+
+
+def validate_classification_scheme(scheme: str) -> None:
+    if scheme not in get_classification_scheme_names():
+        raise ValueError(f'Classification scheme must be one of {get_classification_scheme_names()}, your scheme is '
+                         f'{scheme}')
+
+
+def calculate_goodness_of_variance_fit_from_sorted(
+        sorted_values: numpy.ndarray,
+        cumulative_sums: numpy.ndarray,
+        cumulative_sums_of_squares: numpy.ndarray,
+        inner_breaks: list[Union[int, float]]
+) \
+        -> float:
+    """ Goodness of variance fit of the inner breaks from the cumulative sums of the sorted values """
+    if cumulative_sums_of_squares[-1] <= 0:
+        return 1.0
+    edges = numpy.concatenate((
+        [0],
+        numpy.searchsorted(sorted_values, numpy.asarray(inner_breaks, dtype=numpy.float64), side='right'),
+        [len(sorted_values)]
+    ))
+    class_counts = numpy.diff(edges)
+    class_sums = numpy.diff(cumulative_sums[edges])
+    class_sums_of_squares = numpy.diff(cumulative_sums_of_squares[edges])
+    non_empty = class_counts > 0
+    class_deviations = class_sums_of_squares[non_empty] - class_sums[non_empty] ** 2 / class_counts[non_empty]
+    return float(1 - max(class_deviations.sum(), 0) / cumulative_sums_of_squares[-1])
+
+
+class ClassificationEngine:
+    """ Breaks of a scheme for a number of classes or for the fewest classes reaching a target fit """
+
+    def __init__(
+            self,
+            scheme: str = 'jenks',
+            number_of_classes: int = 4,
+            target_goodness_of_variance_fit: float = None,
+            maximum_number_of_classes: int = DEFAULT_MAXIMUM_NUMBER_OF_CLASSES,
+            jenks_engine: JenksEngine = None
+    ):
+        validate_classification_scheme(scheme)
+        if number_of_classes < 2:
+            raise ValueError(f'Number of classes must be at least 2, your number is {number_of_classes}')
+        if target_goodness_of_variance_fit is not None and not 0 < target_goodness_of_variance_fit <= 1:
+            raise ValueError(f'Target goodness of variance fit must be between 0 and 1, your target is '
+                             f'{target_goodness_of_variance_fit}')
+        self.scheme = scheme
+        self.number_of_classes = number_of_classes
+        self.target_goodness_of_variance_fit = target_goodness_of_variance_fit
+        self.maximum_number_of_classes = maximum_number_of_classes
+        self.jenks_engine = JenksEngine() if jenks_engine is None else jenks_engine
+        self.goodness_of_variance_fits = {}
+        self.selected_number_of_classes = None
+
+    def get_parameters(self) -> tuple:
+        return (self.scheme, self.number_of_classes, self.target_goodness_of_variance_fit,
+                self.maximum_number_of_classes, self.jenks_engine.get_parameters())
+
+    def _calculate_breaks_for_number_of_classes(self, sorted_values: numpy.ndarray, number_of_classes: int) \
+            -> list[Union[int, float]]:
+        if self.scheme == 'jenks':
+            return self.jenks_engine.calculate_breaks(sorted_values, number_of_classes)[1:-1]
+        return CLASSIFICATION_SCHEMES[self.scheme](sorted_values, number_of_classes)
+
+    def calculate_breaks_for_all_classes(self, values: numpy.ndarray) -> dict[int, list[Union[int, float]]]:
+        """ Inner breaks of every number of classes, their fits are kept in goodness_of_variance_fits """
+        sorted_values = numpy.sort(numpy.asarray(values, dtype=numpy.float64))
+        sorted_values = sorted_values[~numpy.isnan(sorted_values)]
+        maximum_number_of_classes = min(self.maximum_number_of_classes, len(numpy.unique(sorted_values)))
+        if maximum_number_of_classes < 2:
+            raise ValueError(f'Classification needs at least 2 distinct areas, your areas have '
+                             f'{maximum_number_of_classes}')
+        if self.scheme == 'jenks':
+            breaks_by_number_of_classes = {
+                number_of_classes: breaks[1:-1]
+                for number_of_classes, breaks in self.jenks_engine.calculate_breaks_for_all_classes(
+                    sorted_values,
+                    maximum_number_of_classes
+                ).items()
+            }
+        else:
+            breaks_by_number_of_classes = {
+                number_of_classes: self._calculate_breaks_for_number_of_classes(sorted_values, number_of_classes)
+                for number_of_classes in range(2, maximum_number_of_classes + 1)
+            }
+        centered_values = sorted_values - sorted_values.mean()
+        cumulative_sums = numpy.concatenate(([0.0], numpy.cumsum(centered_values)))
+        cumulative_sums_of_squares = numpy.concatenate(([0.0], numpy.cumsum(centered_values ** 2)))
+        self.goodness_of_variance_fits = {
+            number_of_classes: calculate_goodness_of_variance_fit_from_sorted(
+                sorted_values,
+                cumulative_sums,
+                cumulative_sums_of_squares,
+                breaks
+            )
+            for number_of_classes, breaks in breaks_by_number_of_classes.items()
+        }
+        return breaks_by_number_of_classes
+
+    def select_number_of_classes(self) -> int:
+        """ The smallest number of classes reaching the target fit among the evaluated ones """
+        for number_of_classes, goodness_of_variance_fit in sorted(self.goodness_of_variance_fits.items()):
+            if goodness_of_variance_fit >= self.target_goodness_of_variance_fit:
+                return number_of_classes
+        return max(self.goodness_of_variance_fits)
+
+    def calculate_breaks(self, values: numpy.ndarray) -> list[Union[int, float]]:
+        """ Inner breaks, their number of classes is kept in selected_number_of_classes """
+        if self.target_goodness_of_variance_fit is None:
+            sorted_values = numpy.sort(numpy.asarray(values, dtype=numpy.float64))
+            breaks = list(self._calculate_breaks_for_number_of_classes(
+                sorted_values[~numpy.isnan(sorted_values)],
+                self.number_of_classes
+            ))
+        else:
+            breaks = list(self.calculate_breaks_for_all_classes(values)[self.select_number_of_classes()])
+        self.selected_number_of_classes = len(breaks) + 1
+        return breaks
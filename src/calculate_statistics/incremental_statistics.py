@@ -0,0 +1,222 @@
+import math
+from typing import Union
+
+import numpy
+
+from src.calculate_statistics.jenks import JenksEngine
+from src.calculate_statistics.summary_statistics import QUARTILES, StreamingMoments, calculate_quantile_from_sorted
+
+DEFAULT_JENKS_REFIT_THRESHOLD = 0.01
+DEFAULT_JENKS_WINDOW = 256
+MAXIMUM_JENKS_REFINEMENT_PASSES = 64
+
+
+def find_sorted_positions(
+        sorted_values: numpy.ndarray,
+        sorted_labels: numpy.ndarray,
+        values: numpy.ndarray,
+        labels: numpy.ndarray
+) \
+        -> numpy.ndarray:
+    """ Positions of the value and label pairs in the sorted arrays, the label picks one of several equal values """
+    left_positions = numpy.searchsorted(sorted_values, values, side='left')
+    right_positions = numpy.searchsorted(sorted_values, values, side='right')
+    positions = []
+    for value, label, left, right in zip(values, labels, left_positions, right_positions):
+        matches = numpy.flatnonzero(sorted_labels[left:right] == label)
+        if len(matches) == 0:
+            raise ValueError(f'Only added values can be removed, the value {value} of {label} is unknown')
+        positions.append(left + matches[0])
+    return numpy.asarray(positions, dtype=numpy.int64)
+
+
+class IncrementalAreaState:
+    """ Sorted areas with their index labels and running moments, updated without a new sort """
+
+    def __init__(self, areas: numpy.ndarray, labels: numpy.ndarray):
+        areas = numpy.asarray(areas, dtype=numpy.float64)
+        labels = numpy.asarray(labels)
+        is_missing = numpy.isnan(areas)
+        self.missing_labels = set(labels[is_missing].tolist())
+        order = numpy.argsort(areas[~is_missing], kind='stable')
+        self.sorted_values = areas[~is_missing][order]
+        self.sorted_labels = labels[~is_missing][order]
+        self.moments = StreamingMoments()
+        self.moments.update(self.sorted_values)
+
+    def add(self, areas: numpy.ndarray, labels: numpy.ndarray) -> None:
+        areas = numpy.asarray(areas, dtype=numpy.float64)
+        labels = numpy.asarray(labels)
+        is_missing = numpy.isnan(areas)
+        self.missing_labels.update(labels[is_missing].tolist())
+        order = numpy.argsort(areas[~is_missing], kind='stable')
+        areas = areas[~is_missing][order]
+        labels = labels[~is_missing][order]
+        positions = numpy.searchsorted(self.sorted_values, areas, side='right')
+        self.sorted_values = numpy.insert(self.sorted_values, positions, areas)
+        self.sorted_labels = numpy.insert(self.sorted_labels, positions, labels)
+        self.moments.update(areas)
+
+    def remove(self, areas: numpy.ndarray, labels: numpy.ndarray) -> None:
+        areas = numpy.asarray(areas, dtype=numpy.float64)
+        labels = numpy.asarray(labels)
+        is_missing = numpy.isnan(areas)
+        self.missing_labels.difference_update(labels[is_missing].tolist())
+        areas = areas[~is_missing]
+        positions = find_sorted_positions(self.sorted_values, self.sorted_labels, areas, labels[~is_missing])
+        self.sorted_values = numpy.delete(self.sorted_values, positions)
+        self.sorted_labels = numpy.delete(self.sorted_labels, positions)
+        self.moments.remove(areas)
+
+    def get_labels_between(self, lower_value: float, upper_value: float) -> numpy.ndarray:
+        """ Labels of the areas above the lower value and not above the upper value """
+        return self.sorted_labels[numpy.searchsorted(self.sorted_values, lower_value, side='right'):
+                                  numpy.searchsorted(self.sorted_values, upper_value, side='right')]
+
+    def get_summary_statistics(self) -> dict[str, Union[int, float]]:
+        """ The same statistics as calculate_summary_statistics """
+        size = len(self.sorted_values)
+        variance = self.moments.get_variance()
+        summary_statistics = {
+            'sum': self.moments.sum if size > 0 else 0.0,
+            'count': size + len(self.missing_labels),
+            'mean': self.moments.sum / size if size > 0 else numpy.nan,
+            'std': math.sqrt(variance) if size > 1 else numpy.nan,
+            'var': variance if size > 1 else numpy.nan,
+            'minimum': float(self.sorted_values[0]) if size > 0 else numpy.nan,
+            'maximum': float(self.sorted_values[-1]) if size > 0 else numpy.nan,
+        }
+        for name, quantile in QUARTILES.items():
+            summary_statistics[name] = calculate_quantile_from_sorted(self.sorted_values, quantile)
+        summary_statistics['median'] = summary_statistics['second_quartile']
+        return summary_statistics
+
+
+class WarmStartJenks:
+    """ Jenks breaks refined locally after every change and computed again when their fit drops too much """
+
+    def __init__(
+            self,
+            state: IncrementalAreaState,
+            inner_breaks: list[Union[int, float]],
+            jenks_engine: JenksEngine,
+            refit_threshold: float = DEFAULT_JENKS_REFIT_THRESHOLD,
+            window: int = DEFAULT_JENKS_WINDOW
+    ):
+        self.state = state
+        self.jenks_engine = jenks_engine
+        self.refit_threshold = refit_threshold
+        self.window = window
+        self.number_of_classes = len(inner_breaks) + 1
+        self.full_refits = 0
+        self._set_inner_breaks(inner_breaks)
+
+    def _set_inner_breaks(self, inner_breaks: list[Union[int, float]]) -> None:
+        """ Class statistics from the sorted areas, the shift keeps the sums of squares small """
+        sorted_values = self.state.sorted_values
+        self.inner_breaks = [float(inner_break) for inner_break in inner_breaks]
+        self.shift = float(self.state.moments.mean)
+        self.boundaries = numpy.searchsorted(sorted_values, self.inner_breaks, side='right')
+        shifted_values = sorted_values - self.shift
+        edges = numpy.concatenate(([0], self.boundaries, [len(sorted_values)]))
+        cumulative_sums = numpy.concatenate(([0.0], numpy.cumsum(shifted_values)))
+        cumulative_sums_of_squares = numpy.concatenate(([0.0], numpy.cumsum(shifted_values ** 2)))
+        self.class_counts = numpy.diff(edges).astype(numpy.float64)
+        self.class_sums = numpy.diff(cumulative_sums[edges])
+        self.class_sums_of_squares = numpy.diff(cumulative_sums_of_squares[edges])
+        self.reference_goodness_of_variance_fit = self.get_goodness_of_variance_fit()
+
+    def _update_class_statistics(self, values: numpy.ndarray, sign: int) -> None:
+        values = numpy.asarray(values, dtype=numpy.float64)
+        values = values[~numpy.isnan(values)]
+        classes = numpy.searchsorted(self.inner_breaks, values, side='left')
+        shifted_values = values - self.shift
+        self.class_counts += sign * numpy.bincount(classes, minlength=self.number_of_classes)
+        self.class_sums += sign * numpy.bincount(classes, weights=shifted_values, minlength=self.number_of_classes)
+        self.class_sums_of_squares += sign * numpy.bincount(
+            classes,
+            weights=shifted_values ** 2,
+            minlength=self.number_of_classes
+        )
+
+    def get_breaks(self) -> list[Union[int, float]]:
+        """ Breaks including minimum and maximum, an inner break is the largest area of its class """
+        sorted_values = self.state.sorted_values
+        return [float(sorted_values[0])] + self.inner_breaks + [float(sorted_values[-1])]
+
+    def get_goodness_of_variance_fit(self) -> float:
+        sum_of_squared_deviations = self.state.moments.sum_of_squared_deviations
+        if sum_of_squared_deviations <= 0:
+            return 1.0
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            class_deviations = numpy.where(
+                self.class_counts > 0,
+                self.class_sums_of_squares - self.class_sums ** 2 / self.class_counts,
+                0.0
+            )
+        return float(1 - max(class_deviations.sum(), 0) / sum_of_squared_deviations)
+
+    def _refine_boundary(self, boundary_index: int) -> bool:
+        """ Moves the boundary to its best position within the window, returns whether it moved """
+        sorted_values = self.state.sorted_values
+        lower_class_start = 0 if boundary_index == 0 else self.boundaries[boundary_index - 1]
+        upper_class_end = len(sorted_values) if boundary_index == len(self.boundaries) - 1 \
+            else self.boundaries[boundary_index + 1]
+        boundary = self.boundaries[boundary_index]
+        lowest = max(lower_class_start + 1, boundary - self.window)
+        highest = min(upper_class_end - 1, boundary + self.window)
+        if lowest >= highest:
+            return False
+        shifted_values = sorted_values[lowest:highest] - self.shift
+        cumulative_sums = numpy.concatenate(([0.0], numpy.cumsum(shifted_values)))
+        cumulative_sums_of_squares = numpy.concatenate(([0.0], numpy.cumsum(shifted_values ** 2)))
+        candidates = numpy.arange(lowest, highest + 1)
+        moved_counts = (candidates - boundary).astype(numpy.float64)
+        moved_sums = cumulative_sums - cumulative_sums[boundary - lowest]
+        moved_sums_of_squares = cumulative_sums_of_squares - cumulative_sums_of_squares[boundary - lowest]
+        lower_counts = self.class_counts[boundary_index] + moved_counts
+        lower_sums = self.class_sums[boundary_index] + moved_sums
+        lower_sums_of_squares = self.class_sums_of_squares[boundary_index] + moved_sums_of_squares
+        upper_counts = self.class_counts[boundary_index + 1] - moved_counts
+        upper_sums = self.class_sums[boundary_index + 1] - moved_sums
+        upper_sums_of_squares = self.class_sums_of_squares[boundary_index + 1] - moved_sums_of_squares
+        costs = lower_sums_of_squares - lower_sums ** 2 / lower_counts \
+            + upper_sums_of_squares - upper_sums ** 2 / upper_counts
+        costs = numpy.where(sorted_values[candidates - 1] < sorted_values[candidates], costs, numpy.inf)
+        best = int(numpy.argmin(costs))
+        if candidates[best] == boundary or not costs[best] < costs[boundary - lowest]:
+            return False
+        self.boundaries[boundary_index] = candidates[best]
+        self.inner_breaks[boundary_index] = float(sorted_values[candidates[best] - 1])
+        self.class_counts[boundary_index] = lower_counts[best]
+        self.class_sums[boundary_index] = lower_sums[best]
+        self.class_sums_of_squares[boundary_index] = lower_sums_of_squares[best]
+        self.class_counts[boundary_index + 1] = upper_counts[best]
+        self.class_sums[boundary_index + 1] = upper_sums[best]
+        self.class_sums_of_squares[boundary_index + 1] = upper_sums_of_squares[best]
+        return True
+
+    def refine(self) -> None:
+        for _ in range(MAXIMUM_JENKS_REFINEMENT_PASSES):
+            if not any([self._refine_boundary(boundary_index) for boundary_index in range(len(self.boundaries))]):
+                break
+
+    def refit(self) -> None:
+        self.full_refits += 1
+        breaks = self.jenks_engine.calculate_breaks(self.state.sorted_values, self.number_of_classes)
+        self._set_inner_breaks(breaks[1:-1])
+
+    def update(self, added_values: numpy.ndarray = None, removed_values: numpy.ndarray = None) -> None:
+        """ Call it after the same values have been added to or removed from the state """
+        if added_values is not None:
+            self._update_class_statistics(added_values, 1)
+        if removed_values is not None:
+            self._update_class_statistics(removed_values, -1)
+        if numpy.any(self.class_counts < 1):
+            self.refit()
+            return
+        self.boundaries = numpy.searchsorted(self.state.sorted_values, self.inner_breaks, side='right')
+        self.inner_breaks = [float(self.state.sorted_values[boundary - 1]) for boundary in self.boundaries]
+        self.refine()
+        if self.reference_goodness_of_variance_fit - self.get_goodness_of_variance_fit() > self.refit_threshold:
+            self.refit()
@@ -0,0 +1,262 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Union
+
+import numpy
+
+JENKS_METHODS = ('auto', 'exact', 'histogram', 'sample')
+EXACT_JENKS_MAXIMUM_SIZE = 10000
+DEFAULT_NUMBER_OF_BINS = 1024
+DEFAULT_SAMPLE_SIZE = 10000
+HISTOGRAM_GOODNESS_OF_VARIANCE_FIT_TOLERANCE = 0.001
+SAMPLE_GOODNESS_OF_VARIANCE_FIT_TOLERANCE = 0.01
+
+
+def validate_jenks_method(method: str) -> None:
+    if method not in JENKS_METHODS:
+        raise ValueError(f'Jenks method must be one of {JENKS_METHODS}, your method is {method}')
+
+
+def select_jenks_method(size: int, method: str = 'auto') -> str:
+    """ Exact Fisher-Jenks up to EXACT_JENKS_MAXIMUM_SIZE values and histogram Fisher-Jenks above it """
+    validate_jenks_method(method)
+    if method != 'auto':
+        return method
+    if size <= EXACT_JENKS_MAXIMUM_SIZE:
+        return 'exact'
+    return 'histogram'
+
+
+def calculate_goodness_of_variance_fit(values: numpy.ndarray, breaks: list[Union[int, float]]) -> float:
+    """ Goodness of variance fit of the breaks (including minimum and maximum), 1 is a perfect fit """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    sum_of_squared_deviations = numpy.square(values - values.mean()).sum()
+    if sum_of_squared_deviations == 0:
+        return 1.0
+    classes = numpy.searchsorted(numpy.asarray(breaks[1:-1], dtype=numpy.float64), values, side='left')
+    class_counts = numpy.bincount(classes)
+    class_sums = numpy.bincount(classes, weights=values)
+    class_sums_of_squares = numpy.bincount(classes, weights=values * values)
+    non_empty = class_counts > 0
+    sum_of_squared_class_deviations = (
+            class_sums_of_squares[non_empty] - class_sums[non_empty] ** 2 / class_counts[non_empty]
+    ).sum()
+    return float(1 - max(sum_of_squared_class_deviations, 0) / sum_of_squared_deviations)
+
+
+def calculate_exact_jenks_breaks(values: numpy.ndarray, number_of_classes: int) -> list[Union[int, float]]:
+    import jenkspy
+    return jenkspy.jenks_breaks(numpy.sort(numpy.asarray(values, dtype=numpy.float64)), n_classes=number_of_classes)
+
+
+def calculate_weighted_jenks_breaks_for_all_classes(
+        values: numpy.ndarray,
+        weights: numpy.ndarray,
+        maximum_number_of_classes: int,
+        upper_values: numpy.ndarray = None
+) \
+        -> dict[int, list[Union[int, float]]]:
+    """ Fisher-Jenks breaks of every number of classes up to the maximum from one dynamic program """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    weights = numpy.asarray(weights, dtype=numpy.float64)
+    if upper_values is None:
+        upper_values = values
+    size = len(values)
+    if maximum_number_of_classes < 2 or maximum_number_of_classes > size:
+        raise ValueError(f'Number of classes must be between 2 and {size}, your number is {maximum_number_of_classes}')
+    centered_values = values - numpy.average(values, weights=weights)
+    cumulative_weights = numpy.concatenate(([0.0], numpy.cumsum(weights)))
+    cumulative_sums = numpy.concatenate(([0.0], numpy.cumsum(weights * centered_values)))
+    cumulative_sums_of_squares = numpy.concatenate(([0.0], numpy.cumsum(weights * centered_values ** 2)))
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        class_weights = cumulative_weights[None, :] - cumulative_weights[:, None]
+        class_sums = cumulative_sums[None, :] - cumulative_sums[:, None]
+        class_deviations = cumulative_sums_of_squares[None, :] - cumulative_sums_of_squares[:, None] \
+            - class_sums ** 2 / class_weights
+    class_deviations = numpy.where(numpy.triu(numpy.ones((size + 1, size + 1), dtype=bool), 1),
+                                   numpy.maximum(class_deviations, 0), numpy.inf)
+    cost = class_deviations[0]
+    class_starts = []
+    breaks_by_number_of_classes = {}
+    for number_of_classes in range(2, maximum_number_of_classes + 1):
+        total_cost = cost[:, None] + class_deviations
+        class_starts.append(numpy.argmin(total_cost, axis=0))
+        cost = total_cost[class_starts[-1], numpy.arange(size + 1)]
+        breaks = []
+        end = size
+        for starts in reversed(class_starts):
+            end = starts[end]
+            breaks.append(upper_values[end - 1])
+        breaks_by_number_of_classes[number_of_classes] = \
+            [float(numpy.min(values))] + [float(value) for value in reversed(breaks)] + [float(upper_values[-1])]
+    return breaks_by_number_of_classes
+
+
+def calculate_weighted_jenks_breaks(
+        values: numpy.ndarray,
+        weights: numpy.ndarray,
+        number_of_classes: int,
+        upper_values: numpy.ndarray = None
+) \
+        -> list[Union[int, float]]:
+    """ Fisher-Jenks breaks of sorted, weighted values """
+    return calculate_weighted_jenks_breaks_for_all_classes(
+        values,
+        weights,
+        number_of_classes,
+        upper_values
+    )[number_of_classes]
+
+
+def calculate_histogram_jenks_breaks_for_all_classes(
+        values: numpy.ndarray,
+        maximum_number_of_classes: int,
+        number_of_bins: int = DEFAULT_NUMBER_OF_BINS
+) \
+        -> dict[int, list[Union[int, float]]]:
+    """ Fisher-Jenks on the unique values or, when there are more of them, on bins of the values """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    unique_values, counts = numpy.unique(values, return_counts=True)
+    if len(unique_values) <= number_of_bins:
+        return calculate_weighted_jenks_breaks_for_all_classes(unique_values, counts, maximum_number_of_classes)
+    cumulative_counts = numpy.cumsum(counts)
+    quantile_ranks = numpy.linspace(0, cumulative_counts[-1] - 1, number_of_bins // 2 + 1)
+    bin_edges = numpy.unique(numpy.concatenate((
+        numpy.linspace(unique_values[0], unique_values[-1], number_of_bins - number_of_bins // 2 + 1),
+        unique_values[numpy.searchsorted(cumulative_counts, quantile_ranks, side='right')]
+    )))
+    number_of_bins = len(bin_edges) - 1
+    bins = numpy.clip(numpy.searchsorted(bin_edges, unique_values, side='right') - 1, 0, number_of_bins - 1)
+    bin_counts = numpy.bincount(bins, weights=counts, minlength=number_of_bins)
+    bin_sums = numpy.bincount(bins, weights=unique_values * counts, minlength=number_of_bins)
+    bin_maximums = numpy.full(number_of_bins, -numpy.inf)
+    numpy.maximum.at(bin_maximums, bins, unique_values)
+    non_empty = bin_counts > 0
+    breaks_by_number_of_classes = calculate_weighted_jenks_breaks_for_all_classes(
+        bin_sums[non_empty] / bin_counts[non_empty],
+        bin_counts[non_empty],
+        maximum_number_of_classes,
+        bin_maximums[non_empty]
+    )
+    for breaks in breaks_by_number_of_classes.values():
+        breaks[0] = float(unique_values[0])
+    return breaks_by_number_of_classes
+
+
+def calculate_histogram_jenks_breaks(
+        values: numpy.ndarray,
+        number_of_classes: int,
+        number_of_bins: int = DEFAULT_NUMBER_OF_BINS
+) \
+        -> list[Union[int, float]]:
+    """ Histogram-binned Fisher-Jenks, see calculate_histogram_jenks_breaks_for_all_classes """
+    return calculate_histogram_jenks_breaks_for_all_classes(
+        values,
+        number_of_classes,
+        number_of_bins
+    )[number_of_classes]
+
+
+def calculate_sample_jenks_breaks(
+        values: numpy.ndarray,
+        number_of_classes: int,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        seed: int = None
+) \
+        -> tuple[list[Union[int, float]], float]:
+    """ Exact Fisher-Jenks on a random sample, returns the breaks and the goodness of variance fit error """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    if len(values) <= sample_size:
+        return calculate_exact_jenks_breaks(values, number_of_classes), 0.0
+    sample = numpy.random.default_rng(seed).choice(values, size=sample_size, replace=False)
+    breaks = calculate_exact_jenks_breaks(sample, number_of_classes)
+    sample_goodness_of_variance_fit = calculate_goodness_of_variance_fit(sample, breaks)
+    breaks[0] = float(values.min())
+    breaks[-1] = float(values.max())
+    error = abs(sample_goodness_of_variance_fit - calculate_goodness_of_variance_fit(values, breaks))
+    return breaks, error
+
+
+class JenksEngine:
+
+    def __init__(
+            self,
+            method: str = 'auto',
+            number_of_bins: int = DEFAULT_NUMBER_OF_BINS,
+            sample_size: int = DEFAULT_SAMPLE_SIZE,
+            seed: int = None
+    ):
+        validate_jenks_method(method)
+        self.method = method
+        self.number_of_bins = number_of_bins
+        self.sample_size = sample_size
+        self.seed = seed
+        self.goodness_of_variance_fit_error = 0.0
+
+    def get_parameters(self) -> tuple:
+        return self.method, self.number_of_bins, self.sample_size, self.seed
+
+    def calculate_breaks(self, values: numpy.ndarray, number_of_classes: int) -> list[Union[int, float]]:
+        """ Breaks including the minimum and the maximum """
+        values = numpy.asarray(values, dtype=numpy.float64)
+        method = select_jenks_method(len(values), self.method)
+        self.goodness_of_variance_fit_error = 0.0
+        if method == 'exact':
+            return calculate_exact_jenks_breaks(values, number_of_classes)
+        if method == 'sample':
+            breaks, goodness_of_variance_fit_error = calculate_sample_jenks_breaks(
+                values,
+                number_of_classes,
+                self.sample_size,
+                self.seed
+            )
+            if goodness_of_variance_fit_error <= SAMPLE_GOODNESS_OF_VARIANCE_FIT_TOLERANCE:
+                self.goodness_of_variance_fit_error = goodness_of_variance_fit_error
+                return breaks
+        return calculate_histogram_jenks_breaks(values, number_of_classes, self.number_of_bins)
+
+    def calculate_breaks_for_all_classes(self, values: numpy.ndarray, maximum_number_of_classes: int) \
+            -> dict[int, list[Union[int, float]]]:
+        """ Breaks of every number of classes from 2 up to the maximum """
+        values = numpy.asarray(values, dtype=numpy.float64)
+        if select_jenks_method(len(values), self.method) == 'histogram':
+            self.goodness_of_variance_fit_error = 0.0
+            return calculate_histogram_jenks_breaks_for_all_classes(values, maximum_number_of_classes,
+                                                                    self.number_of_bins)
+        return {
+            number_of_classes: self.calculate_breaks(values, number_of_classes)
+            for number_of_classes in range(2, maximum_number_of_classes + 1)
+        }
+
+
+def calculate_breaks_if_possible(
+        jenks_engine: JenksEngine,
+        values: numpy.ndarray,
+        number_of_classes: int
+) \
+        -> list[Union[int, float]]:
+    """ Empty list when there are fewer distinct values than classes """
+    if len(numpy.unique(values)) < number_of_classes:
+        return []
+    return jenks_engine.calculate_breaks(values, number_of_classes)
+
+
+def calculate_jenks_breaks_in_parallel(
+        list_of_values: list[numpy.ndarray],
+        number_of_classes: int,
+        jenks_engine: JenksEngine = None,
+        max_workers: int = None
+) \
+        -> list[list[Union[int, float]]]:
+    """ Breaks of every value array, computed in a process pool unless max_workers is 1 """
+    if jenks_engine is None:
+        jenks_engine = JenksEngine()
+    if max_workers == 1 or len(list_of_values) < 2:
+        return [calculate_breaks_if_possible(jenks_engine, values, number_of_classes) for values in list_of_values]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(
+            calculate_breaks_if_possible,
+            repeat(jenks_engine),
+            list_of_values,
+            repeat(number_of_classes)
+        ))
@@ -0,0 +1,113 @@
+import hashlib
+
+import geopandas
+import numpy
+import pandas
+import shapely
+
+from src.utils.file_utils.statistics_cache import hash_geometries
+from src.utils.geometry_utils.area_calculation import calculate_geometry_areas
+from src.utils.geometry_utils.geometry_validation import extract_polygons
+import src.utils.languages.languages as languages
+
+
+def get_sample_area_names(sample_areas: geopandas.GeoDataFrame, sample_area_column: str = None) -> numpy.ndarray:
+    """ The values of the sample area column, the index labels without it """
+    if sample_area_column is None:
+        return sample_areas.index.to_numpy()
+    return sample_areas[sample_area_column].to_numpy()
+
+
+def hash_sample_areas(sample_areas: geopandas.GeoDataFrame, sample_area_column: str = None) -> str:
+    """ Hash of the sample area geometries and names, part of the cache parameters of the overlaid statistics """
+    sample_area_hash = hashlib.blake2b(hash_geometries(sample_areas).encode('utf-8'), digest_size=20)
+    sample_area_hash.update(
+        pandas.util.hash_pandas_object(pandas.Series(get_sample_area_names(sample_areas, sample_area_column))
+                                       .astype(str), index=False).to_numpy().tobytes()
+    )
+    return sample_area_hash.hexdigest()
+
+
+def merge_pieces_of_same_sample_area(
+        feature_positions: numpy.ndarray,
+        names: numpy.ndarray,
+        pieces: numpy.ndarray,
+        is_clipped: numpy.ndarray
+) \
+        -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """ A feature crossing two parts of the same sample area becomes one piece, the union of its parts """
+    pairs = pandas.DataFrame({'feature': feature_positions, 'name': names})
+    is_repeated = pairs.duplicated(keep=False).to_numpy()
+    if not is_repeated.any():
+        return feature_positions, names, pieces, is_clipped
+    is_kept = ~pairs.duplicated(keep='first').to_numpy()
+    for _, group in pairs[is_repeated].groupby(['feature', 'name'], sort=False):
+        pieces[group.index[0]] = shapely.union_all(pieces[group.index.to_numpy()])
+        is_clipped[group.index[0]] = True
+    return feature_positions[is_kept], names[is_kept], pieces[is_kept], is_clipped[is_kept]
+
+
+def overlay_sample_areas(
+        data: geopandas.GeoDataFrame,
+        sample_areas: geopandas.GeoDataFrame,
+        sample_area_column: str = None,
+        language: str = 'en'
+) \
+        -> tuple[geopandas.GeoDataFrame, pandas.DataFrame]:
+    """ Clips the features crossing a sample area boundary, returns the pieces and the sample area table """
+    language = languages.get_language(language)
+    if data.crs != sample_areas.crs:
+        raise ValueError(f'Sample areas must have the CRS of the data, your CRS is {sample_areas.crs}')
+    sample_area_names = get_sample_area_names(sample_areas, sample_area_column)
+    sample_geometries = numpy.asarray(sample_areas.geometry.values, dtype=object)
+    feature_geometries = numpy.asarray(data.geometry.values, dtype=object)
+    feature_tree = shapely.STRtree(feature_geometries)
+    sample_positions, feature_positions = feature_tree.query(sample_geometries, predicate='intersects')
+    contained_sample_positions, contained_feature_positions = feature_tree.query(
+        sample_geometries,
+        predicate='contains'
+    )
+    number_of_features = len(feature_geometries)
+    is_crossing = ~numpy.isin(sample_positions * number_of_features + feature_positions,
+                              contained_sample_positions * number_of_features + contained_feature_positions)
+    pieces = feature_geometries[feature_positions]
+    pieces[is_crossing] = extract_polygons(shapely.intersection(pieces[is_crossing],
+                                                                sample_geometries[sample_positions[is_crossing]]))
+    is_kept = pandas.notna(pieces)
+    feature_positions, names, pieces, is_clipped = merge_pieces_of_same_sample_area(
+        feature_positions[is_kept],
+        sample_area_names[sample_positions[is_kept]],
+        pieces[is_kept],
+        is_crossing[is_kept]
+    )
+    order = numpy.argsort(feature_positions, kind='stable')
+    feature_positions, names, pieces, is_clipped = \
+        feature_positions[order], names[order], pieces[order], is_clipped[order]
+
+    assigned_data = data.iloc[feature_positions].copy()
+    if is_clipped.any():
+        geometry_array = assigned_data.geometry.values.copy()
+        geometry_array[numpy.flatnonzero(is_clipped)] = pieces[is_clipped]
+        assigned_data[assigned_data.geometry.name] = geopandas.GeoSeries(
+            geometry_array,
+            index=assigned_data.index,
+            crs=data.crs
+        )
+    assigned_data[language['sub_area_name']] = names
+    assigned_data.insert(0, language['feature'], assigned_data.index)
+    assigned_data.index = pandas.RangeIndex(len(assigned_data))
+
+    sample_area_sizes = pandas.Series(calculate_geometry_areas(sample_areas.geometry), index=sample_area_names) \
+        .groupby(level=0, sort=False).sum()
+    covered_areas = pandas.Series(calculate_geometry_areas(assigned_data.geometry), index=names) \
+        .groupby(level=0, sort=False)
+    sample_area_table = pandas.DataFrame({
+        language['sample_area_size']: sample_area_sizes,
+        language['count']: covered_areas.size().reindex(sample_area_sizes.index, fill_value=0),
+        language['area']: covered_areas.sum().reindex(sample_area_sizes.index, fill_value=0.0),
+    })
+    sample_area_table.loc[language['study_area']] = sample_area_table.sum()
+    sample_area_table[language['count']] = sample_area_table[language['count']].astype(numpy.int64)
+    sample_area_table[language['experimental_area_ratio']] = \
+        sample_area_table[language['area']] / sample_area_table[language['sample_area_size']] * 100
+    return assigned_data, sample_area_table
@@ -0,0 +1,161 @@
+import math
+from typing import Union
+
+import numpy
+import geopandas
+
+from src.calculate_statistics.area_statistics import (
+    is_contains_only_polygons,
+    create_area_statistics_dictionary,
+    add_sample_area_statistics
+)
+from src.calculate_statistics.jenks import calculate_weighted_jenks_breaks
+from src.calculate_statistics.summary_statistics import QUARTILES, StreamingMoments
+from src.utils.file_utils.read_layer import read_layer_in_chunks
+from src.utils.geometry_utils.area_calculation import calculate_geometry_areas
+import src.utils.languages.languages as languages
+
+
+class QuantileSketch:
+    """ Mergeable logarithmic bucket sketch (DDSketch), quantiles are within relative_accuracy """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f'Relative accuracy must be between 0 and 1, your accuracy is {relative_accuracy}')
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.zero_count = 0
+        self.bucket_counts: dict[int, int] = {}
+
+    def get_count(self) -> int:
+        return self.zero_count + sum(self.bucket_counts.values())
+
+    def update(self, values: numpy.ndarray) -> None:
+        values = numpy.asarray(values, dtype=numpy.float64)
+        values = values[~numpy.isnan(values)]
+        if (values < 0).any():
+            raise ValueError('Quantile sketch accepts only non-negative values')
+        positive_values = values[values > 0]
+        self.zero_count += len(values) - len(positive_values)
+        indices, counts = numpy.unique(
+            numpy.ceil(numpy.log(positive_values) / math.log(self.gamma)).astype(numpy.int64),
+            return_counts=True
+        )
+        for index, count in zip(indices.tolist(), counts.tolist()):
+            self.bucket_counts[index] = self.bucket_counts.get(index, 0) + count
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        if other.gamma != self.gamma:
+            raise ValueError('Only sketches with the same relative accuracy can be merged')
+        self.zero_count += other.zero_count
+        for index, count in other.bucket_counts.items():
+            self.bucket_counts[index] = self.bucket_counts.get(index, 0) + count
+
+    def get_buckets(self) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """ Representative values, counts and upper bounds of the non-empty buckets in increasing order """
+        indices = numpy.array(sorted(self.bucket_counts), dtype=numpy.float64)
+        counts = numpy.array([self.bucket_counts[index] for index in sorted(self.bucket_counts)], dtype=numpy.float64)
+        upper_bounds = self.gamma ** indices
+        representatives = 2 * upper_bounds / (self.gamma + 1)
+        if self.zero_count > 0:
+            representatives = numpy.concatenate(([0.0], representatives))
+            counts = numpy.concatenate(([self.zero_count], counts))
+            upper_bounds = numpy.concatenate(([0.0], upper_bounds))
+        return representatives, counts, upper_bounds
+
+    def get_quantile(self, quantile: float) -> float:
+        count = self.get_count()
+        if count == 0:
+            return math.nan
+        rank = round(quantile * (count - 1))
+        representatives, counts, _ = self.get_buckets()
+        return float(representatives[numpy.searchsorted(numpy.cumsum(counts), rank, side='right')])
+
+
+class StreamingAreaStatistics:
+    """ Area statistics of a layer read in chunks, quartiles and Jenks breaks come from a quantile sketch """
+
+    def __init__(
+            self,
+            number_of_natural_breaks: int = 4,
+            number_of_equal_intervals: int = 4,
+            language: str = 'en',
+            relative_accuracy: float = 0.01,
+            sample_area_size: float = None
+    ):
+        self.number_of_natural_breaks = number_of_natural_breaks
+        self.number_of_equal_intervals = number_of_equal_intervals
+        self.language = languages.get_language(language)
+        self.sample_area_size = sample_area_size
+        self.count = 0
+        self.moments = StreamingMoments()
+        self.quantile_sketch = QuantileSketch(relative_accuracy)
+
+    def update(self, data: geopandas.GeoDataFrame) -> None:
+        if len(data) == 0:
+            return
+        if is_contains_only_polygons(data):
+            areas = calculate_geometry_areas(data.geometry)
+            self.count += len(areas)
+            self.moments.update(areas)
+            self.quantile_sketch.update(areas)
+
+    def update_from_file(self, file_name: str, layer: str = None, chunk_size: int = 100000) -> None:
+        for chunk in read_layer_in_chunks(file_name, layer, chunk_size):
+            self.update(chunk)
+
+    def merge(self, other: 'StreamingAreaStatistics') -> None:
+        self.count += other.count
+        self.moments.merge(other.moments)
+        self.quantile_sketch.merge(other.quantile_sketch)
+
+    def get_jenks_breaks(self) -> list[Union[int, float]]:
+        """ Empty list when the areas fall into fewer buckets than classes """
+        representatives, counts, upper_bounds = self.quantile_sketch.get_buckets()
+        if len(representatives) < self.number_of_natural_breaks:
+            return []
+        jenks_breaks = calculate_weighted_jenks_breaks(
+            representatives,
+            counts,
+            self.number_of_natural_breaks,
+            numpy.minimum(upper_bounds, self.moments.maximum)
+        )
+        return jenks_breaks[1:-1]
+
+    def get_area_statistics(self) -> dict[str, int | float | list[int | float]]:
+        minimum = self.moments.minimum
+        maximum = self.moments.maximum
+        summary_statistics = {
+            'sum': self.moments.sum,
+            'count': self.count,
+            'mean': self.moments.mean,
+            'std': math.sqrt(self.moments.get_variance()),
+            'var': self.moments.get_variance(),
+            'minimum': minimum,
+            'maximum': maximum,
+        }
+        for name, quantile in QUARTILES.items():
+            summary_statistics[name] = min(max(self.quantile_sketch.get_quantile(quantile), minimum), maximum)
+        summary_statistics['median'] = summary_statistics['second_quartile']
+        area_statistics = create_area_statistics_dictionary(
+            self.language,
+            summary_statistics,
+            self.get_jenks_breaks(),
+            self.number_of_equal_intervals
+        )
+        if self.sample_area_size is not None:
+            add_sample_area_statistics(area_statistics, self.language, self.sample_area_size)
+        return area_statistics
+
+
+def get_area_statistics_of_layer(
+        file_name: str,
+        layer: str = None,
+        chunk_size: int = 100000,
+        **kwargs
+) \
+        -> dict[str, int | float | list[int | float]]:
+    """ Streams the layer into the same dictionary as AreaStatistics.get_area_statistics """
+    streaming_area_statistics = StreamingAreaStatistics(**kwargs)
+    streaming_area_statistics.update_from_file(file_name, layer, chunk_size)
+    return streaming_area_statistics.get_area_statistics()
@@ -0,0 +1,160 @@
+import math
+from typing import Union
+
+import numpy
+
+QUARTILES = {'first_quartile': 0.25, 'second_quartile': 0.5, 'third_quartile': 0.75}
+
+
+class StreamingMoments:
+    """ Mergeable count, sum, mean, sum of squared deviations, minimum and maximum (Welford, Chan et al.) """
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.mean = 0.0
+        self.sum_of_squared_deviations = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def update(self, values: numpy.ndarray) -> None:
+        values = numpy.asarray(values, dtype=numpy.float64)
+        values = values[~numpy.isnan(values)]
+        if len(values) == 0:
+            return
+        batch = StreamingMoments()
+        batch.count = len(values)
+        batch.sum = float(values.sum())
+        batch.mean = batch.sum / batch.count
+        batch.sum_of_squared_deviations = float(numpy.square(values - batch.mean).sum())
+        batch.minimum = float(values.min())
+        batch.maximum = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: 'StreamingMoments') -> None:
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.sum_of_squared_deviations += \
+            other.sum_of_squared_deviations + delta ** 2 * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.sum += other.sum
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def remove(self, values: numpy.ndarray) -> None:
+        """ Takes back values added before, the minimum and the maximum are kept """
+        values = numpy.asarray(values, dtype=numpy.float64)
+        values = values[~numpy.isnan(values)]
+        if len(values) == 0:
+            return
+        count = self.count - len(values)
+        if count < 0:
+            raise ValueError(f'Only added values can be removed, your {len(values)} values are more than {self.count}')
+        if count == 0:
+            self.__init__()
+            return
+        batch_mean = float(values.mean())
+        mean = (self.mean * self.count - batch_mean * len(values)) / count
+        delta = batch_mean - mean
+        self.sum_of_squared_deviations = max(
+            self.sum_of_squared_deviations - float(numpy.square(values - batch_mean).sum())
+            - delta ** 2 * count * len(values) / self.count,
+            0.0
+        )
+        self.mean = mean
+        self.count = count
+        self.sum -= float(values.sum())
+
+    def get_variance(self) -> float:
+        if self.count < 2:
+            return math.nan
+        return self.sum_of_squared_deviations / (self.count - 1)
+
+
+def calculate_quantile_from_sorted(sorted_values: numpy.ndarray, quantile: float) -> float:
+    """ Linear interpolation between the closest ranks, the same as pandas.Series.quantile """
+    if len(sorted_values) == 0:
+        return numpy.nan
+    position = quantile * (len(sorted_values) - 1)
+    lower_index = int(numpy.floor(position))
+    upper_index = min(lower_index + 1, len(sorted_values) - 1)
+    fraction = position - lower_index
+    return float(sorted_values[lower_index] + (sorted_values[upper_index] - sorted_values[lower_index]) * fraction)
+
+
+def calculate_summary_statistics(values: numpy.ndarray) -> dict[str, Union[int, float]]:
+    """ Summary statistics from one sort and one moment pass, missing values are skipped but counted """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    count = len(values)
+    sorted_values = numpy.sort(values)
+    sorted_values = sorted_values[:len(sorted_values) - numpy.count_nonzero(numpy.isnan(sorted_values))]
+    size = len(sorted_values)
+    total = float(sorted_values.sum())
+    mean = total / size if size > 0 else numpy.nan
+    variance = float(numpy.square(sorted_values - mean).sum() / (size - 1)) if size > 1 else numpy.nan
+    summary_statistics = {
+        'sum': total,
+        'count': count,
+        'mean': mean,
+        'std': float(numpy.sqrt(variance)),
+        'var': variance,
+        'minimum': float(sorted_values[0]) if size > 0 else numpy.nan,
+        'maximum': float(sorted_values[-1]) if size > 0 else numpy.nan,
+    }
+    for name, quantile in QUARTILES.items():
+        summary_statistics[name] = calculate_quantile_from_sorted(sorted_values, quantile)
+    summary_statistics['median'] = summary_statistics['second_quartile']
+    return summary_statistics
+
+
+def calculate_grouped_summary_statistics(
+        values: numpy.ndarray,
+        group_codes: numpy.ndarray,
+        number_of_groups: int
+) \
+        -> tuple[dict[str, numpy.ndarray], list[numpy.ndarray]]:
+    """ Summary statistics of every group code from one sort and one bincount moment pass """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    group_codes = numpy.asarray(group_codes, dtype=numpy.int64)
+    counts = numpy.bincount(group_codes, minlength=number_of_groups)
+    is_valid = ~numpy.isnan(values)
+    values = values[is_valid]
+    group_codes = group_codes[is_valid]
+    order = numpy.lexsort((values, group_codes))
+    sorted_values = values[order]
+    sizes = numpy.bincount(group_codes, minlength=number_of_groups)
+    starts = numpy.concatenate(([0], numpy.cumsum(sizes)[:-1]))
+    padded_values = numpy.append(sorted_values, numpy.nan)
+    first_indices = numpy.where(sizes > 0, starts, len(sorted_values))
+    last_indices = numpy.where(sizes > 0, starts + sizes - 1, len(sorted_values))
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        sums = numpy.bincount(group_codes, weights=values, minlength=number_of_groups)
+        means = sums / sizes
+        sums_of_squared_deviations = numpy.bincount(
+            group_codes,
+            weights=numpy.square(values - means[group_codes]),
+            minlength=number_of_groups
+        )
+        variances = numpy.where(sizes > 1, sums_of_squared_deviations / (sizes - 1), numpy.nan)
+    summary_statistics = {
+        'sum': sums,
+        'count': counts,
+        'mean': means,
+        'std': numpy.sqrt(variances),
+        'var': variances,
+        'minimum': padded_values[first_indices],
+        'maximum': padded_values[last_indices],
+    }
+    for name, quantile in QUARTILES.items():
+        positions = quantile * numpy.maximum(sizes - 1, 0)
+        lower_offsets = numpy.floor(positions)
+        lower_indices = numpy.minimum(first_indices + lower_offsets.astype(numpy.int64), last_indices)
+        upper_indices = numpy.minimum(lower_indices + 1, last_indices)
+        summary_statistics[name] = padded_values[lower_indices] \
+            + (padded_values[upper_indices] - padded_values[lower_indices]) * (positions - lower_offsets)
+    summary_statistics['median'] = summary_statistics['second_quartile']
+    group_values = numpy.split(sorted_values, numpy.cumsum(sizes)[:-1])
+    return summary_statistics, group_values
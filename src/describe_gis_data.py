@@ -0,0 +1,209 @@
+""" Command line entry point running the notebook pipeline headlessly """
+import argparse
+import json
+import os
+import sys
+
+DEFAULT_CONFIG = {
+    'language': 'en',
+    'number_of_natural_breaks': 4,
+    'number_of_equal_intervals': 4,
+    'jenks_method': 'auto',
+    'sample_area_size': None,
+    'additional_classifications': {},
+    'classifications': None,
+    'chart_types': ['diagram', 'pie_chart'],
+    'dpi': 300,
+    'normalize_geometries': False,
+    'explode_multipolygons': False,
+}
+
+
+def read_config(config_file_name: str = None) -> dict:
+    """ DEFAULT_CONFIG updated by the JSON configuration file """
+    config = dict(DEFAULT_CONFIG)
+    if config_file_name is not None:
+        with open(config_file_name, encoding='utf-8') as config_file:
+            config.update(json.load(config_file))
+    return config
+
+
+def create_area_statistics(layer_file_name: str, layer: str, config: dict):
+    import geopandas
+    from src.calculate_statistics.area_statistics import AreaStatistics, AreaStatisticsComparisonWithSampleArea
+
+    data = geopandas.read_file(layer_file_name, layer=layer)
+    if config['normalize_geometries']:
+        from src.utils.geometry_utils.geometry_validation import normalize_geometries
+        data, report = normalize_geometries(data, explode=config['explode_multipolygons'],
+                                            language=config['language'])
+        if len(report) > 0:
+            print(f'{len(report)} geometries were repaired or dropped, see the validate command', file=sys.stderr)
+    parameters = {
+        'number_of_natural_breaks': config['number_of_natural_breaks'],
+        'number_of_equal_intervals': config['number_of_equal_intervals'],
+        'language': config['language'],
+        'jenks_method': config['jenks_method'],
+    }
+    if config['sample_area_size'] is not None:
+        return AreaStatisticsComparisonWithSampleArea(data, config['sample_area_size'], **parameters)
+    return AreaStatistics(data, **parameters)
+
+
+def classify(area_statistics, config: dict) -> None:
+    area_statistics.add_area_classifications_to_data(additional_classifications={
+        column_name: (classification['breaks'], classification['labels'])
+        for column_name, classification in config['additional_classifications'].items()
+    })
+
+
+def run_statistics(arguments: argparse.Namespace, config: dict) -> None:
+    if arguments.streaming:
+        from src.calculate_statistics.streaming_statistics import get_area_statistics_of_layer
+        area_statistics = get_area_statistics_of_layer(
+            arguments.layer_file_name,
+            arguments.layer,
+            arguments.chunk_size,
+            number_of_natural_breaks=config['number_of_natural_breaks'],
+            number_of_equal_intervals=config['number_of_equal_intervals'],
+            language=config['language'],
+            sample_area_size=config['sample_area_size']
+        )
+    else:
+        area_statistics = create_area_statistics(arguments.layer_file_name, arguments.layer, config) \
+            .get_area_statistics()
+    if arguments.output is None:
+        for name, value in area_statistics.items():
+            print(f'{name}: {value}')
+    elif arguments.output.endswith('.csv'):
+        from src.utils.file_utils.write_csv import write_csv_from_dict
+        write_csv_from_dict(area_statistics, arguments.output)
+    elif arguments.output.endswith('.xlsx'):
+        from src.utils.file_utils.write_excel import write_excel_sheet_from_dict
+        write_excel_sheet_from_dict(area_statistics, arguments.output, 'statistics')
+    elif arguments.output.endswith('.parquet'):
+        from src.utils.file_utils.write_parquet import write_parquet_from_dict
+        write_parquet_from_dict(area_statistics, arguments.output)
+    else:
+        raise ValueError(f'Output must be a .csv, .xlsx or .parquet file, your output is {arguments.output}')
+
+
+def run_classification(arguments: argparse.Namespace, config: dict) -> None:
+    area_statistics = create_area_statistics(arguments.layer_file_name, arguments.layer, config)
+    classify(area_statistics, config)
+    if arguments.output.endswith('.gpkg'):
+        area_statistics.get_data_for_export().to_file(arguments.output, layer=arguments.output_layer, driver='GPKG')
+    elif arguments.output.endswith('.parquet'):
+        from src.utils.file_utils.write_parquet import write_geoparquet_from_geodataframe
+        write_geoparquet_from_geodataframe(area_statistics.data, arguments.output)
+    elif arguments.output.endswith('.csv'):
+        area_statistics.data.to_csv(arguments.output, index=False)
+    else:
+        raise ValueError(f'Output must be a .gpkg, .parquet or .csv file, your output is {arguments.output}')
+
+
+def run_plotting(arguments: argparse.Namespace, config: dict) -> None:
+    from src.calculate_statistics.classification_diagrams import render_charts_to_files
+
+    area_statistics = create_area_statistics(arguments.layer_file_name, arguments.layer, config)
+    classify(area_statistics, config)
+    language = area_statistics.language
+    classifications = config['classifications']
+    if classifications is None:
+        classifications = [language['jenks'], language['equal_interval_breaks'], language['quartiles']] \
+            + list(config['additional_classifications'])
+    os.makedirs(arguments.output_folder, exist_ok=True)
+    charts = [
+        area_statistics.create_chart(
+            chart_type,
+            classification,
+            os.path.join(arguments.output_folder, f'{classification}_{chart_type}.png'),
+            sample_area=config['sample_area_size'],
+            dpi=config['dpi']
+        )
+        for classification in classifications
+        for chart_type in config['chart_types']
+    ]
+    for path in render_charts_to_files(charts, arguments.max_workers):
+        print(path)
+
+
+def run_validation(arguments: argparse.Namespace, config: dict) -> None:
+    import geopandas
+    from src.utils.geometry_utils.geometry_validation import normalize_geometries
+
+    data = geopandas.read_file(arguments.layer_file_name, layer=arguments.layer)
+    _, report = normalize_geometries(data, explode=config['explode_multipolygons'], max_workers=arguments.max_workers)
+    if arguments.output is None:
+        print(report.to_string())
+    else:
+        report.to_csv(arguments.output, index_label='feature')
+
+
+def run_batch(arguments: argparse.Namespace, config: dict) -> int:
+    """ Exits with 1 when an entry failed, its error is printed and kept in the summary workbook """
+    from src.batch_runner import read_manifest, run_manifest
+
+    summary_file_name, rows = run_manifest(
+        read_manifest(arguments.manifest_file_name),
+        config,
+        arguments.max_workers,
+        arguments.memory_limit
+    )
+    failed_rows = [row for row in rows if row['status'] == 'failed']
+    for row in failed_rows:
+        print(f'{row["name"]} ({row["language"]}): {row["error"]}', file=sys.stderr)
+    print(summary_file_name)
+    return 1 if failed_rows else 0
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    argument_parser = argparse.ArgumentParser(
+        prog='describe-gis-data',
+        description='Area statistics, classifications and diagrams of a polygon layer'
+    )
+    subparsers = argument_parser.add_subparsers(dest='command', required=True)
+    for command, help_text in (('stats', 'print or write the area statistics'),
+                               ('classify', 'write the classified layer'),
+                               ('plot', 'render the classification diagrams'),
+                               ('validate', 'report the null, empty, non-polygonal and invalid geometries')):
+        subparser = subparsers.add_parser(command, help=help_text)
+        subparser.add_argument('layer_file_name', help='GeoPackage, shapefile or any file geopandas can read')
+        subparser.add_argument('--layer', default=None, help='layer name inside the file')
+        subparser.add_argument('--config', default=None, help='JSON configuration file')
+    stats_parser = subparsers.choices['stats']
+    stats_parser.add_argument('--output', default=None, help='.csv, .xlsx or .parquet file, printed if omitted')
+    stats_parser.add_argument('--streaming', action='store_true', help='read the layer in chunks')
+    stats_parser.add_argument('--chunk-size', type=int, default=100000)
+    classify_parser = subparsers.choices['classify']
+    classify_parser.add_argument('--output', required=True, help='.gpkg, .parquet or .csv file')
+    classify_parser.add_argument('--output-layer', default='classification', help='layer name in the GeoPackage')
+    plot_parser = subparsers.choices['plot']
+    plot_parser.add_argument('--output-folder', required=True)
+    plot_parser.add_argument('--max-workers', type=int, default=None)
+    validate_parser = subparsers.choices['validate']
+    validate_parser.add_argument('--output', default=None, help='.csv report, printed if omitted')
+    validate_parser.add_argument('--max-workers', type=int, default=None)
+    batch_parser = subparsers.add_parser('batch', help='run the pipeline of every layer of a manifest')
+    batch_parser.add_argument('manifest_file_name', help='JSON manifest of the layers, see the readme')
+    batch_parser.add_argument('--config', default=None, help='JSON configuration file of the defaults')
+    batch_parser.add_argument('--max-workers', type=int, default=None)
+    batch_parser.add_argument('--memory-limit', type=float, default=None, help='megabytes per worker process')
+    return argument_parser
+
+
+def main(argv: list[str] = None) -> int:
+    arguments = create_argument_parser().parse_args(argv)
+    config = read_config(arguments.config)
+    commands = {
+        'stats': run_statistics,
+        'classify': run_classification,
+        'plot': run_plotting,
+        'validate': run_validation,
+        'batch': run_batch,
+    }
+    return commands[arguments.command](arguments, config) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import os
+import shutil
 
 
 def create_results_folder(
@@ -26,4 +27,4 @@ def remove_previous_results(
 ) -> None:
     """ Removes the previous results folder and its sub-folders if they exist """
     if os.path.exists(project_folder):
-        os.system('rm -r ' + project_folder)
+        shutil.rmtree(project_folder)
@@ -0,0 +1,175 @@
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+import geopandas
+import pandas
+
+from src.utils.file_utils.create_results_folders import create_results_folder, remove_previous_results
+from src.utils.file_utils.partial_files import remove_partial_files, replace_file_atomically
+from src.utils.file_utils.write_csv import write_csv_from_dict
+from src.utils.file_utils.write_excel import ExcelWorkbookSession
+from src.utils.file_utils.write_parquet import (
+    write_geoparquet_from_geodataframe,
+    write_parquet_from_dataframe,
+    write_parquet_from_dict
+)
+from src.utils.profiling_utils.run_profiler import profile_stage
+
+OUTPUT_KINDS = ('csv', 'excel_sheet', 'gpkg_layer', 'parquet', 'chart')
+OUTPUT_FOLDERS = ('statistics', 'figures', 'gis_data')
+MULTIPLE_OUTPUT_KINDS = ('excel_sheet', 'gpkg_layer')
+
+
+class ResultOutput:
+    """ One declared output of export_results, a CSV, a sheet, a layer, a Parquet file or a chart """
+
+    def __init__(
+            self,
+            kind: str,
+            file_name: str,
+            content: Any,
+            folder: str = 'statistics',
+            name: str = None,
+            options: dict[str, Any] = None
+    ):
+        if kind not in OUTPUT_KINDS:
+            raise ValueError(f'Output kind must be one of {OUTPUT_KINDS}, your kind is {kind}')
+        if folder not in OUTPUT_FOLDERS:
+            raise ValueError(f'Output folder must be one of {OUTPUT_FOLDERS}, your folder is {folder}')
+        if kind in MULTIPLE_OUTPUT_KINDS and name is None:
+            raise ValueError(f'Sheet and layer outputs need a name, your {file_name} output has none')
+        self.kind = kind
+        self.file_name = file_name
+        self.content = content
+        self.folder = folder
+        self.name = name
+        self.options = dict(options or {})
+
+
+def write_csv_output(file_name: str, outputs: list[ResultOutput]) -> None:
+    output = outputs[0]
+    if isinstance(output.content, dict):
+        write_csv_from_dict(output.content, file_name)
+    else:
+        output.content.to_csv(file_name, **output.options)
+
+
+def write_excel_outputs(file_name: str, outputs: list[ResultOutput]) -> None:
+    with ExcelWorkbookSession(file_name) as excel_workbook:
+        for output in outputs:
+            if isinstance(output.content, dict):
+                excel_workbook.write_sheet_from_dict(output.content, output.name)
+            else:
+                excel_workbook.write_sheet_from_dataframe(output.content, output.name)
+
+
+def write_geopackage_outputs(file_name: str, outputs: list[ResultOutput]) -> None:
+    for output in outputs:
+        output.content.to_file(file_name, layer=output.name, driver='GPKG', **output.options)
+
+
+def write_parquet_output(file_name: str, outputs: list[ResultOutput]) -> None:
+    content = outputs[0].content
+    if isinstance(content, dict):
+        write_parquet_from_dict(content, file_name)
+    elif isinstance(content, geopandas.GeoDataFrame):
+        write_geoparquet_from_geodataframe(content, file_name)
+    else:
+        write_parquet_from_dataframe(pandas.DataFrame(content), file_name)
+
+
+def write_chart_output(file_name: str, outputs: list[ResultOutput]) -> None:
+    from src.calculate_statistics.classification_diagrams import render_chart_to_file
+    chart_type, classification_statistics, language, _, options = outputs[0].content
+    render_chart_to_file(chart_type, classification_statistics, language, file_name, {**options,
+                                                                                     **outputs[0].options})
+
+
+OUTPUT_WRITERS = {
+    'csv': write_csv_output,
+    'excel_sheet': write_excel_outputs,
+    'gpkg_layer': write_geopackage_outputs,
+    'parquet': write_parquet_output,
+    'chart': write_chart_output,
+}
+
+
+def write_outputs_atomically(file_name: str, outputs: list[ResultOutput]) -> str:
+    """ Writes the outputs of one file into a partial file that replaces the file only when complete """
+    with replace_file_atomically(file_name) as partial_file_name:
+        OUTPUT_WRITERS[outputs[0].kind](partial_file_name, outputs)
+    return file_name
+
+
+def group_outputs_by_file(
+        outputs: list[ResultOutput],
+        folders: dict[str, str]
+) \
+        -> dict[str, list[ResultOutput]]:
+    """ Outputs of every file name, only sheets of one workbook and layers of one GeoPackage share a file """
+    outputs_by_file = {}
+    for output in outputs:
+        file_name = os.path.join(folders[output.folder], output.file_name)
+        file_outputs = outputs_by_file.setdefault(file_name, [])
+        if file_outputs and (output.kind not in MULTIPLE_OUTPUT_KINDS or file_outputs[0].kind != output.kind):
+            raise ValueError(f'Only sheets of one workbook or layers of one GeoPackage can share a file, '
+                             f'your {file_name} is declared more than once')
+        file_outputs.append(output)
+    return outputs_by_file
+
+
+def submit_file(
+        executors: dict[str, Executor],
+        file_name: str,
+        outputs: list[ResultOutput]
+) \
+        -> Future:
+    """ Charts are rendered in processes, pyplot is not thread-safe; the files are written in threads """
+    executor = executors['process' if outputs[0].kind == 'chart' else 'thread']
+    return executor.submit(write_outputs_atomically, file_name, outputs)
+
+
+@profile_stage()
+def export_results(
+        outputs: list[ResultOutput],
+        results_folder: str,
+        project_folder: str,
+        statistics_folder: str = 'statistics',
+        figures_folder: str = 'figures',
+        gis_data_folder: str = 'gis_data',
+        remove_previous: bool = False,
+        max_workers: int = None
+) \
+        -> list[str]:
+    """ Writes the declared outputs concurrently and atomically, returns the file names """
+    if remove_previous:
+        remove_previous_results(os.path.join(results_folder, project_folder))
+    create_results_folder(results_folder, project_folder, statistics_folder, figures_folder, gis_data_folder)
+    folders = {
+        'statistics': os.path.join(results_folder, project_folder, statistics_folder),
+        'figures': os.path.join(results_folder, project_folder, figures_folder),
+        'gis_data': os.path.join(results_folder, project_folder, gis_data_folder),
+    }
+    for folder in folders.values():
+        remove_partial_files(folder)
+    outputs_by_file = group_outputs_by_file(outputs, folders)
+    if max_workers == 1 or len(outputs_by_file) < 2:
+        return [write_outputs_atomically(file_name, file_outputs)
+                for file_name, file_outputs in outputs_by_file.items()]
+    executor_factories: dict[str, Callable[[], Executor]] = {
+        'thread': lambda: ThreadPoolExecutor(max_workers=max_workers),
+        'process': lambda: ProcessPoolExecutor(max_workers=max_workers),
+    }
+    kinds = {'process' if file_outputs[0].kind == 'chart' else 'thread' for file_outputs in outputs_by_file.values()}
+    executors = {kind: executor_factories[kind]() for kind in kinds}
+    try:
+        futures = [submit_file(executors, file_name, file_outputs)
+                   for file_name, file_outputs in outputs_by_file.items()]
+    finally:
+        for executor in executors.values():
+            executor.shutdown(wait=True)
+    errors = [future.exception() for future in futures if future.exception() is not None]
+    if errors:
+        raise errors[0]
+    return [future.result() for future in futures]
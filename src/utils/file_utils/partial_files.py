@@ -0,0 +1,34 @@
+import glob
+import os
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+PARTIAL_FILE_MARKER = '.partial-'
+
+
+def create_partial_file_name(file_name: str) -> str:
+    """ Hidden file next to the result with the same suffix, the writers pick the file format from the suffix """
+    directory, base_name = os.path.split(file_name)
+    stem, suffix = os.path.splitext(base_name)
+    return os.path.join(directory, f'.{stem}{PARTIAL_FILE_MARKER}{uuid.uuid4().hex}{suffix}')
+
+
+def remove_partial_files(folder: str) -> list[str]:
+    """ Removes the partial files an interrupted writing left in the folder, returns their names """
+    partial_file_names = glob.glob(os.path.join(glob.escape(folder), f'.*{PARTIAL_FILE_MARKER}*'))
+    for partial_file_name in partial_file_names:
+        os.remove(partial_file_name)
+    return partial_file_names
+
+
+@contextmanager
+def replace_file_atomically(file_name: str) -> Iterator[str]:
+    """ Yields a partial file name, the partial file replaces the file only when the block finishes """
+    partial_file_name = create_partial_file_name(file_name)
+    try:
+        yield partial_file_name
+        os.replace(partial_file_name, file_name)
+    finally:
+        if os.path.exists(partial_file_name):
+            os.remove(partial_file_name)
@@ -0,0 +1,24 @@
+import itertools
+from typing import Iterator
+
+import fiona
+import geopandas
+
+
+def read_layer_in_chunks(
+        file_name: str,
+        layer: str = None,
+        chunk_size: int = 100000
+) \
+        -> Iterator[geopandas.GeoDataFrame]:
+    """ Yields the features of the layer as GeoDataFrames of at most chunk_size rows """
+    if chunk_size < 1:
+        raise ValueError(f'Chunk size must be positive, your chunk size is {chunk_size}')
+    with fiona.open(file_name, layer=layer) as source:
+        crs = source.crs_wkt or None
+        features = iter(source)
+        while True:
+            chunk = list(itertools.islice(features, chunk_size))
+            if not chunk:
+                return
+            yield geopandas.GeoDataFrame.from_features(chunk, crs=crs)
@@ -0,0 +1,99 @@
+import glob
+import hashlib
+import json
+import os
+from typing import Any, Union
+
+import geopandas
+import numpy
+import pandas
+import shapely
+
+from src.utils.file_utils.partial_files import replace_file_atomically
+
+DEFAULT_MAXIMUM_CACHE_MEGABYTES = 1024
+FILE_HASH_CHUNK_SIZE = 1024 ** 2
+CACHE_FILE_SUFFIX = '.npz'
+
+
+def hash_file(file_name: str) -> str:
+    """ Hash of the file content, e.g. of the input GeoPackage """
+    file_hash = hashlib.blake2b(digest_size=20)
+    with open(file_name, 'rb') as file:
+        for chunk in iter(lambda: file.read(FILE_HASH_CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def hash_geometries(data: geopandas.GeoDataFrame) -> str:
+    """ Hash of the WKB of the geometries, the CRS and the index, for data that does not come from one file """
+    geometry_hash = hashlib.blake2b(digest_size=20)
+    geometry_hash.update(b''.join(shapely.to_wkb(numpy.asarray(data.geometry.values, dtype=object))))
+    geometry_hash.update(str(data.crs).encode('utf-8'))
+    geometry_hash.update(pandas.util.hash_pandas_object(data.index, index=False).to_numpy().tobytes())
+    return geometry_hash.hexdigest()
+
+
+def get_statistics_cache_folder(results_folder: str, project_folder: str, cache_folder: str = 'cache') -> str:
+    return os.path.join(results_folder, project_folder, cache_folder)
+
+
+class StatisticsCache:
+    """ Content-addressed cache of statistics in .npz files, the least recently used files are evicted """
+
+    def __init__(self, folder: str, max_megabytes: float = DEFAULT_MAXIMUM_CACHE_MEGABYTES):
+        self.folder = folder
+        self.max_megabytes = max_megabytes
+        os.makedirs(folder, exist_ok=True)
+
+    @staticmethod
+    def create_key(data_hash: str, parameters: dict[str, Any]) -> str:
+        key_hash = hashlib.blake2b(data_hash.encode('utf-8'), digest_size=20)
+        key_hash.update(json.dumps(parameters, sort_keys=True, default=str).encode('utf-8'))
+        return key_hash.hexdigest()
+
+    def get_file_name(self, key: str) -> str:
+        return os.path.join(self.folder, key + CACHE_FILE_SUFFIX)
+
+    def load(self, key: str) -> Union[tuple[dict[str, numpy.ndarray], dict[str, Any]], None]:
+        """ The arrays and the metadata of the key, None when it is not cached """
+        file_name = self.get_file_name(key)
+        if not os.path.exists(file_name):
+            return None
+        with numpy.load(file_name, allow_pickle=False) as cache_file:
+            arrays = {name: cache_file[name] for name in cache_file.files if name != 'metadata'}
+            metadata = json.loads(str(cache_file['metadata']))
+        os.utime(file_name)
+        return arrays, metadata
+
+    def save(self, key: str, arrays: dict[str, numpy.ndarray], metadata: dict[str, Any]) -> str:
+        file_name = self.get_file_name(key)
+        with replace_file_atomically(file_name) as partial_file_name:
+            numpy.savez(partial_file_name, metadata=numpy.array(json.dumps(metadata)), **arrays)
+        self.evict(keep=key)
+        return file_name
+
+    def get_size_in_megabytes(self) -> float:
+        return sum(os.path.getsize(file_name) for file_name in self._get_cache_files()) / 1024 ** 2
+
+    def _get_cache_files(self) -> list[str]:
+        return glob.glob(os.path.join(glob.escape(self.folder), '*' + CACHE_FILE_SUFFIX))
+
+    def evict(self, keep: str = None) -> list[str]:
+        """ Removes the least recently used files over max_megabytes except the kept key, returns them """
+        file_names = sorted(self._get_cache_files(), key=os.path.getmtime)
+        size = sum(os.path.getsize(file_name) for file_name in file_names)
+        removed_file_names = []
+        for file_name in file_names:
+            if size <= self.max_megabytes * 1024 ** 2:
+                break
+            if keep is not None and file_name == self.get_file_name(keep):
+                continue
+            size -= os.path.getsize(file_name)
+            os.remove(file_name)
+            removed_file_names.append(file_name)
+        return removed_file_names
+
+    def clear(self) -> None:
+        for file_name in self._get_cache_files():
+            os.remove(file_name)
@@ -1,6 +1,9 @@
 import csv
 
+from src.utils.profiling_utils.run_profiler import profile_stage
 
+
+@profile_stage()
 def write_csv_from_dict(dictionary: dict, file_name: str):
     with open(file_name, 'w') as csv_file:
         csv_writer = csv.writer(csv_file)
@@ -1,6 +1,14 @@
+import numbers
+import os
+import shutil
+
+import openpyxl
 import pandas
 from pathlib import Path
 
+from src.utils.file_utils.partial_files import create_partial_file_name
+from src.utils.profiling_utils.run_profiler import profile_stage
+
 
 def validate_excel_file_name(file_name: str):
     if Path(file_name).suffix != '.xlsx':
@@ -13,27 +21,100 @@ def set_mode_based_on_file_existence(file_name: str) -> str:
     return 'w'
 
 
+def create_unique_sheet_name(sheet_name: str, sheet_names: list[str]) -> str:
+    while sheet_name in sheet_names:
+        sheet_name = sheet_name + '_01'
+    return sheet_name
+
+
 def update_excel_sheet_name_if_exists(file_name: str, sheet_name: str) -> str:
     validate_excel_file_name(file_name)
     if Path(file_name).exists():
         file = pandas.ExcelFile(file_name)
-        sheets = file.sheet_names
-        while sheet_name in sheets:
-            sheet_name = sheet_name + '_01'
+        sheet_name = create_unique_sheet_name(sheet_name, file.sheet_names)
     return sheet_name
 
 
+def convert_to_excel_value(value):
+    """ Keeps the values a cell can hold, missing values become empty cells and everything else a string """
+    if value is None or isinstance(value, (str, bool)):
+        return value
+    if isinstance(value, numbers.Number):
+        return None if pandas.isna(value) else value
+    return str(value)
+
+
+class ExcelWorkbookSession:
+    """ Keeps one workbook open while the sheets are written, a failed session leaves the file as it was """
+
+    def __init__(self, file_name: str, write_only: bool = False):
+        validate_excel_file_name(file_name)
+        self.file_name = file_name
+        self.write_only = write_only
+        self.sheet_names = []
+        self._excel_writer = None
+        self._workbook = None
+        self._partial_file_name = None
+
+    def __enter__(self) -> 'ExcelWorkbookSession':
+        mode = set_mode_based_on_file_existence(self.file_name)
+        self._partial_file_name = create_partial_file_name(self.file_name)
+        if self.write_only:
+            if mode == 'a':
+                raise ValueError(f'Write-only mode can only create a new file, {self.file_name} already exists')
+            self._workbook = openpyxl.Workbook(write_only=True)
+        elif mode == 'a':
+            shutil.copyfile(self.file_name, self._partial_file_name)
+            self._excel_writer = pandas.ExcelWriter(self._partial_file_name, mode=mode)
+            self.sheet_names = list(self._excel_writer.book.sheetnames)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if self._workbook is not None:
+                if exc_type is None:
+                    self._workbook.save(self._partial_file_name)
+                self._workbook.close()
+            elif self._excel_writer is not None:
+                self._excel_writer.close()
+            if exc_type is None and os.path.exists(self._partial_file_name):
+                os.replace(self._partial_file_name, self.file_name)
+        finally:
+            if os.path.exists(self._partial_file_name):
+                os.remove(self._partial_file_name)
+
+    def _add_sheet_name(self, sheet_name: str) -> str:
+        sheet_name = create_unique_sheet_name(sheet_name, self.sheet_names)
+        self.sheet_names.append(sheet_name)
+        return sheet_name
+
+    @profile_stage(rows_argument=1)
+    def write_sheet_from_dataframe(self, dataframe: pandas.DataFrame, sheet_name: str = 'Sheet1') -> str:
+        """ Returns the deduplicated sheet name """
+        sheet_name = self._add_sheet_name(sheet_name)
+        if self._workbook is None:
+            if self._excel_writer is None:
+                self._excel_writer = pandas.ExcelWriter(self._partial_file_name, mode='w')
+            dataframe.to_excel(self._excel_writer, sheet_name=sheet_name)
+            return sheet_name
+        worksheet = self._workbook.create_sheet(sheet_name)
+        worksheet.append([convert_to_excel_value(dataframe.index.name)]
+                         + [convert_to_excel_value(column) for column in dataframe.columns])
+        for row in dataframe.itertuples(name=None):
+            worksheet.append([convert_to_excel_value(value) for value in row])
+        return sheet_name
+
+    def write_sheet_from_dict(self, dictionary: dict, sheet_name: str = 'Sheet1') -> str:
+        return self.write_sheet_from_dataframe(pandas.DataFrame.from_dict(dictionary, orient='index'), sheet_name)
+
+
+@profile_stage()
 def write_excel_sheet_from_dict(dictionary: dict, file_name: str, sheet_name: str = 'Sheet1'):
-    validate_excel_file_name(file_name)
-    mode = set_mode_based_on_file_existence(file_name)
-    sheet_name = update_excel_sheet_name_if_exists(file_name, sheet_name)
-    with pandas.ExcelWriter(file_name, mode=mode) as excel_writer:
-        pandas.DataFrame.from_dict(dictionary, orient='index').to_excel(excel_writer, sheet_name=sheet_name)
+    with ExcelWorkbookSession(file_name) as excel_workbook:
+        excel_workbook.write_sheet_from_dict(dictionary, sheet_name)
 
 
+@profile_stage()
 def write_excel_sheet_from_dataframe(dataframe: pandas.DataFrame, file_name: str, sheet_name: str = 'Sheet1'):
-    validate_excel_file_name(file_name)
-    mode = set_mode_based_on_file_existence(file_name)
-    sheet_name = update_excel_sheet_name_if_exists(file_name, sheet_name)
-    with pandas.ExcelWriter(file_name, mode=mode) as excel_writer:
-        dataframe.to_excel(excel_writer, sheet_name=sheet_name)
+    with ExcelWorkbookSession(file_name) as excel_workbook:
+        excel_workbook.write_sheet_from_dataframe(dataframe, sheet_name)
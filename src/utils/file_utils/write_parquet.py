@@ -0,0 +1,61 @@
+import os
+
+import geopandas
+import pandas
+import pyarrow
+import pyarrow.feather
+import pyarrow.parquet
+
+from src.utils.profiling_utils.run_profiler import profile_stage
+
+
+@profile_stage()
+def write_geoparquet_from_geodataframe(data: geopandas.GeoDataFrame, file_name: str) -> None:
+    """ Categorical classification columns are stored dictionary-encoded """
+    data.to_parquet(file_name, index=False)
+
+
+@profile_stage()
+def write_parquet_from_dataframe(dataframe: pandas.DataFrame, file_name: str) -> None:
+    dataframe.to_parquet(file_name, index=False)
+
+
+@profile_stage()
+def write_arrow_from_dataframe(dataframe: pandas.DataFrame, file_name: str) -> None:
+    """ Arrow IPC (Feather v2) file, Arrow based dashboards can map it without decoding """
+    pyarrow.feather.write_feather(dataframe, file_name)
+
+
+@profile_stage()
+def write_parquet_from_dict(dictionary: dict, file_name: str) -> None:
+    """ One row table with a typed column for every key, lists like the Jenks breaks become list columns """
+    table = pyarrow.Table.from_pylist([{str(key): value for key, value in dictionary.items()}])
+    pyarrow.parquet.write_table(table, file_name)
+
+
+@profile_stage()
+def write_results_to_parquet(
+        results_folder: str,
+        project_folder: str,
+        name: str,
+        data: geopandas.GeoDataFrame = None,
+        area_statistics: dict = None,
+        classification_statistics: dict[str, pandas.DataFrame] = None,
+        statistics_folder: str = 'statistics',
+        gis_data_folder: str = 'gis_data'
+) \
+        -> list[str]:
+    """ Writes the classified data, the area statistics and the classification tables, returns the paths """
+    written_files = []
+    if data is not None:
+        written_files.append(os.path.join(results_folder, project_folder, gis_data_folder, f'{name}.parquet'))
+        write_geoparquet_from_geodataframe(data, written_files[-1])
+    if area_statistics is not None:
+        written_files.append(
+            os.path.join(results_folder, project_folder, statistics_folder, f'{name}_statistics.parquet'))
+        write_parquet_from_dict(area_statistics, written_files[-1])
+    for classification, statistics in (classification_statistics or {}).items():
+        written_files.append(
+            os.path.join(results_folder, project_folder, statistics_folder, f'{name}_{classification}.parquet'))
+        write_parquet_from_dataframe(statistics, written_files[-1])
+    return written_files
@@ -0,0 +1,34 @@
+import numpy
+import geopandas
+import pyproj
+import shapely
+
+
+def calculate_planar_areas(geometries: numpy.ndarray) -> numpy.ndarray:
+    return shapely.area(geometries)
+
+
+def create_equal_area_crs(crs: pyproj.CRS) -> pyproj.CRS:
+    """ Lambert cylindrical equal-area projection on the ellipsoid of the CRS, in metres """
+    geod = crs.get_geod()
+    return pyproj.CRS.from_proj4(f'+proj=cea +lon_0=0 +lat_ts=0 +a={geod.a} +b={geod.b} +units=m +no_defs')
+
+
+def calculate_ellipsoidal_areas(geometries: numpy.ndarray, crs: pyproj.CRS) -> numpy.ndarray:
+    """ Areas in square metres of geographic coordinates, projected in one batch to an equal-area projection """
+    transformer = pyproj.Transformer.from_crs(crs, create_equal_area_crs(crs), always_xy=True)
+    coordinates = shapely.get_coordinates(geometries)
+    projected_x, projected_y = transformer.transform(coordinates[:, 0], coordinates[:, 1])
+    projected_geometries = shapely.set_coordinates(
+        numpy.array(geometries, dtype=object, copy=True),
+        numpy.column_stack((projected_x, projected_y))
+    )
+    return shapely.area(projected_geometries)
+
+
+def calculate_geometry_areas(geometries: geopandas.GeoSeries) -> numpy.ndarray:
+    """ Planar areas in the units of a projected CRS, ellipsoidal areas in square metres for a geographic CRS """
+    geometry_array = numpy.asarray(geometries.values, dtype=object)
+    if geometries.crs is not None and geometries.crs.is_geographic:
+        return calculate_ellipsoidal_areas(geometry_array, geometries.crs)
+    return calculate_planar_areas(geometry_array)
@@ -0,0 +1,137 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import geopandas
+import numpy
+import pandas
+import shapely
+
+import src.utils.languages.languages as languages
+
+POLYGONAL_TYPE_IDS = (shapely.GeometryType.POLYGON, shapely.GeometryType.MULTIPOLYGON)
+MULTIPART_TYPE_IDS = (
+    shapely.GeometryType.MULTIPOINT,
+    shapely.GeometryType.MULTILINESTRING,
+    shapely.GeometryType.MULTIPOLYGON,
+    shapely.GeometryType.GEOMETRYCOLLECTION
+)
+REPORT_COLUMNS = ['geometry_type', 'problem', 'reason', 'action']
+
+
+def is_polygonal(geometries: numpy.ndarray) -> numpy.ndarray:
+    """ Polygons and multipolygons, from the integer type ids without building type names """
+    return numpy.isin(shapely.get_type_id(geometries), POLYGONAL_TYPE_IDS)
+
+
+def extract_polygons(geometries: numpy.ndarray) -> numpy.ndarray:
+    """ The non-empty polygons of every geometry as a polygon or a multipolygon, None without polygons """
+    geometries = numpy.asarray(geometries, dtype=object)
+    parts, indices = shapely.get_parts(geometries, return_index=True)
+    is_multipart = numpy.isin(shapely.get_type_id(parts), MULTIPART_TYPE_IDS)
+    while is_multipart.any():
+        nested_parts, nested_indices = shapely.get_parts(parts[is_multipart], return_index=True)
+        parts = numpy.concatenate((parts[~is_multipart], nested_parts))
+        indices = numpy.concatenate((indices[~is_multipart], indices[is_multipart][nested_indices]))
+        is_multipart = numpy.isin(shapely.get_type_id(parts), MULTIPART_TYPE_IDS)
+    is_kept = (shapely.get_type_id(parts) == shapely.GeometryType.POLYGON) & ~shapely.is_empty(parts)
+    parts = parts[is_kept]
+    indices = indices[is_kept]
+    polygons = numpy.full(len(geometries), None, dtype=object)
+    if len(parts) == 0:
+        return polygons
+    order = numpy.argsort(indices, kind='stable')
+    parts = parts[order]
+    indices = indices[order]
+    shapely.multipolygons(parts, indices=indices, out=polygons)
+    part_counts = numpy.bincount(indices, minlength=len(geometries))
+    is_single = part_counts[indices] == 1
+    polygons[indices[is_single]] = parts[is_single]
+    return polygons
+
+
+def validate_geometries(geometries: numpy.ndarray, repair: bool = True) -> tuple[numpy.ndarray, pandas.DataFrame]:
+    """ Normalized geometries of one chunk, None for the dropped rows, and the report by position """
+    geometries = numpy.asarray(geometries, dtype=object)
+    type_ids = shapely.get_type_id(geometries)
+    normalized = geometries.copy()
+    problems = numpy.full(len(geometries), None, dtype=object)
+    reasons = numpy.full(len(geometries), None, dtype=object)
+    actions = numpy.full(len(geometries), None, dtype=object)
+
+    is_null = type_ids == shapely.GeometryType.MISSING
+    problems[is_null] = 'null'
+    is_empty = ~is_null & shapely.is_empty(geometries)
+    problems[is_empty] = 'empty'
+    is_collection = ~is_null & ~is_empty & (type_ids == shapely.GeometryType.GEOMETRYCOLLECTION)
+    problems[is_collection] = 'geometry collection'
+    is_other_type = ~is_null & ~is_empty & ~is_collection & ~numpy.isin(type_ids, POLYGONAL_TYPE_IDS)
+    problems[is_other_type] = 'not polygonal'
+    normalized[is_null | is_empty | is_other_type] = None
+
+    is_checked = is_collection | (numpy.isin(type_ids, POLYGONAL_TYPE_IDS) & ~is_empty)
+    is_invalid = numpy.zeros(len(geometries), dtype=bool)
+    is_invalid[is_checked] = ~shapely.is_valid(geometries[is_checked])
+    problems[is_invalid & ~is_collection] = 'invalid'
+    reasons[is_invalid] = shapely.is_valid_reason(geometries[is_invalid])
+    if repair:
+        normalized[is_invalid] = shapely.make_valid(geometries[is_invalid])
+    else:
+        normalized[is_invalid] = None
+    normalized[is_collection | is_invalid] = extract_polygons(normalized[is_collection | is_invalid])
+
+    is_reported = pandas.notna(problems)
+    is_dropped = is_reported & pandas.isna(normalized)
+    actions[is_reported] = numpy.where(is_invalid[is_reported], 'repaired', 'extracted polygons')
+    actions[is_dropped] = 'dropped'
+    report = pandas.DataFrame({
+        'geometry_type': [None if type_id < 0 else shapely.GeometryType(type_id).name
+                          for type_id in type_ids[is_reported]],
+        'problem': problems[is_reported],
+        'reason': reasons[is_reported],
+        'action': actions[is_reported],
+    }, index=numpy.flatnonzero(is_reported))
+    return normalized, report
+
+
+def normalize_geometries(
+        data: geopandas.GeoDataFrame,
+        repair: bool = True,
+        explode: bool = False,
+        chunk_size: int = 100000,
+        max_workers: int = None,
+        language: str = 'en'
+) \
+        -> tuple[geopandas.GeoDataFrame, pandas.DataFrame]:
+    """ Drops or repairs the offending rows, exploded parts get a range index and a feature column """
+    if chunk_size < 1:
+        raise ValueError(f'Chunk size must be at least 1, your chunk size is {chunk_size}')
+    geometries = numpy.asarray(data.geometry.values, dtype=object)
+    chunks = [geometries[start:start + chunk_size] for start in range(0, len(geometries), chunk_size)]
+    if max_workers == 1 or len(chunks) < 2:
+        results = [validate_geometries(chunk, repair) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(validate_geometries, chunks, [repair] * len(chunks)))
+    if not results:
+        return data.copy(), pandas.DataFrame(columns=REPORT_COLUMNS)
+    normalized = numpy.concatenate([geometries for geometries, _ in results])
+    report = pandas.concat([
+        chunk_report.set_axis(chunk_report.index + chunk_number * chunk_size)
+        for chunk_number, (_, chunk_report) in enumerate(results)
+    ])
+    reported_positions = report.index.to_numpy(dtype=numpy.int64)
+    report.index = data.index[reported_positions]
+    normalized_data = data.copy()
+    if len(reported_positions) > 0:
+        geometry_array = normalized_data.geometry.values.copy()
+        geometry_array[reported_positions] = normalized[reported_positions]
+        normalized_data[normalized_data.geometry.name] = geopandas.GeoSeries(
+            geometry_array,
+            index=data.index,
+            crs=data.crs
+        )
+        normalized_data = normalized_data[pandas.notna(normalized)]
+    if explode:
+        normalized_data = normalized_data.explode(index_parts=False)
+        normalized_data.insert(0, languages.get_language(language)['feature'], normalized_data.index)
+        normalized_data.index = pandas.RangeIndex(len(normalized_data))
+    return normalized_data, report
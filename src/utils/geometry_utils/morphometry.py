@@ -0,0 +1,99 @@
+import math
+
+import geopandas
+import numpy
+import shapely
+
+MORPHOMETRY_METRICS = ('perimeter', 'polsby_popper', 'elongation', 'nearest_neighbour_distance')
+NEAREST_NEIGHBOUR_SEARCH_ROUNDS = 4
+
+
+def project_geometries_for_lengths(geometries: geopandas.GeoSeries) -> numpy.ndarray:
+    """ Geometries with geographic coordinates are projected into the UTM zone of the layer """
+    if geometries.crs is None or not geometries.crs.is_geographic:
+        return numpy.asarray(geometries.values, dtype=object)
+    return numpy.asarray(geometries.to_crs(geometries.estimate_utm_crs()).values, dtype=object)
+
+
+def calculate_perimeters(geometries: numpy.ndarray) -> numpy.ndarray:
+    """ Length of the exterior and interior rings """
+    return shapely.length(geometries)
+
+
+def calculate_polsby_popper_scores(areas: numpy.ndarray, perimeters: numpy.ndarray) -> numpy.ndarray:
+    """ 4 * pi * area / perimeter^2, 1 for a circle and towards 0 for ragged or thin patches """
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        return numpy.where(perimeters > 0, 4 * math.pi * areas / perimeters ** 2, numpy.nan)
+
+
+def calculate_elongations(geometries: numpy.ndarray) -> numpy.ndarray:
+    """ 1 - width / length of the minimum rotated rectangle, NaN when the rectangle degenerates """
+    rectangles = shapely.oriented_envelope(geometries)
+    elongations = numpy.full(len(geometries), numpy.nan)
+    is_rectangle = ~shapely.is_missing(geometries) & ~shapely.is_empty(geometries) \
+        & (shapely.get_type_id(rectangles) == shapely.GeometryType.POLYGON) \
+        & (shapely.get_num_coordinates(rectangles) == 5) & (shapely.area(rectangles) > 0)
+    corners = shapely.get_coordinates(shapely.get_exterior_ring(rectangles[is_rectangle])).reshape(-1, 5, 2)
+    first_sides = numpy.hypot(*(corners[:, 1] - corners[:, 0]).T)
+    second_sides = numpy.hypot(*(corners[:, 2] - corners[:, 1]).T)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        elongations[is_rectangle] = 1 - numpy.minimum(first_sides, second_sides) \
+            / numpy.maximum(first_sides, second_sides)
+    return elongations
+
+
+def calculate_nearest_neighbour_distances(
+        geometries: numpy.ndarray,
+        number_of_search_rounds: int = NEAREST_NEIGHBOUR_SEARCH_ROUNDS
+) \
+        -> numpy.ndarray:
+    """ Distance to the nearest other geometry from bulk STRtree queries, NaN without neighbours """
+    distances = numpy.full(len(geometries), numpy.nan)
+    if len(geometries) < 2:
+        return distances
+    tree = shapely.STRtree(geometries)
+    minimum_x, minimum_y, maximum_x, maximum_y = shapely.total_bounds(geometries)
+    radius = math.sqrt((maximum_x - minimum_x) * (maximum_y - minimum_y) / len(geometries)) / 2
+    remaining_positions = numpy.flatnonzero(~shapely.is_empty(geometries))
+    for _ in range(number_of_search_rounds):
+        if len(remaining_positions) == 0 or radius <= 0:
+            break
+        input_positions, tree_positions = tree.query(
+            geometries[remaining_positions],
+            predicate='dwithin',
+            distance=radius
+        )
+        input_positions = remaining_positions[input_positions]
+        is_other = input_positions != tree_positions
+        input_positions, tree_positions = input_positions[is_other], tree_positions[is_other]
+        nearest_distances = numpy.full(len(geometries), numpy.inf)
+        numpy.minimum.at(
+            nearest_distances,
+            input_positions,
+            shapely.distance(geometries[input_positions], geometries[tree_positions])
+        )
+        is_found = numpy.isfinite(nearest_distances)
+        distances[is_found] = nearest_distances[is_found]
+        remaining_positions = remaining_positions[~is_found[remaining_positions]]
+        radius *= 2
+    if len(remaining_positions) > 0:
+        (input_positions, _), nearest_distances = tree.query_nearest(
+            geometries[remaining_positions],
+            return_distance=True,
+            exclusive=True,
+            all_matches=False
+        )
+        distances[remaining_positions[input_positions]] = nearest_distances
+    return distances
+
+
+def calculate_morphometry(geometries: geopandas.GeoSeries) -> dict[str, numpy.ndarray]:
+    """ Perimeter, Polsby-Popper compactness, elongation and nearest neighbour distance of every geometry """
+    projected_geometries = project_geometries_for_lengths(geometries)
+    perimeters = calculate_perimeters(projected_geometries)
+    return {
+        'perimeter': perimeters,
+        'polsby_popper': calculate_polsby_popper_scores(shapely.area(projected_geometries), perimeters),
+        'elongation': calculate_elongations(projected_geometries),
+        'nearest_neighbour_distance': calculate_nearest_neighbour_distances(projected_geometries),
+    }
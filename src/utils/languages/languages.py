@@ -5,10 +5,13 @@ languages = {
         'area_classification': 'Area classification',
         'area_ratio': 'Area ratio',
         'areas': 'Areas',
+        'batch_entry': 'Batch entry',
         'class_average_area': 'Average area of class items',
         'classes': 'Classes',
         'classification': 'Classification',
         'count': 'Count',
+        'elapsed_time': 'Elapsed time (s)',
+        'elongation': 'Elongation',
         'equal_interval': 'Equal interval',
         'equal_interval_breaks': 'Equal interval breaks',
         'equal_interval_ludas_diagram_title': 'Equal interval classifiication for the Ludas area',
@@ -22,16 +25,26 @@ languages = {
         'equal_interval_study_area_pie_chart_diagram_title': 'The proportion of areas covered with oleasters according '
                                                              'to each group of equal intervals for the entire study '
                                                              'area',
+        'error': 'Error',
+        'estimate': 'Estimate',
         'estimated_individuals': 'Estimated individuals',
         'estimated_maximum_individuals': 'Estimated maximum individuals',
         'estimated_minimum_individuals': 'Estimated minimum individuals',
         'experimental_area_ratio': 'Experimental area ratio',
+        'failed': 'Failed',
+        'feature': 'Feature',
         'first_quartile': 'First quartile',
+        'geometric_interval': 'Geometric interval',
+        'goodness_of_variance_fit': 'Goodness of variance fit',
+        'head_tail': 'Head/tail breaks',
         'jenks': 'Natural breaks',
+        'language': 'Language',
+        'lower_confidence_limit': 'Lower confidence limit',
         'maximum': 'Maximum',
         'mean': 'Mean',
         'median': 'Median',
         'minimum': 'Minimum',
+        'perimeter': 'Perimeter',
         'pie_chart_diagram_title': 'The proportion of areas according to each group',
         'natural_break_ludas_diagram_title': 'Natural break classification for the Ludas sample area',
         'natural_break_ludas_pie_chart_diagram_title': 'The proportion of areas covered with oleasters according '
@@ -42,7 +55,10 @@ languages = {
         'natural_break_study_area_diagram_title': 'Natural break classification for the entire study area',
         'natural_break_study_area_pie_chart_diagram_title': 'The proportion of areas covered with oleasters according '
                                                             'to each group of natural breaks for the entire study area',
+        'nearest_neighbour_distance': 'Nearest neighbour distance',
+        'number_of_classes': 'Number of classes',
         'oleasters': 'Oleasters',
+        'polsby_popper': 'Polsby-Popper compactness',
         'quantile': 'Quantile',
         'quartile': 'Quartile',
         'quartiles_ludas_diagram_title': 'Quartiles classification for the Ludas sample area',
@@ -58,13 +74,18 @@ languages = {
         'sample_area_ratio': 'Sample area ratio',
         'sample_area_size': 'Sample area size',
         'second_quartile': 'Second quartile',
+        'standard_deviation': 'Standard deviation',
+        'standard_error': 'Standard error',
         'statistics': 'Statistics',
+        'status': 'Status',
         'std': 'Std',
         'study_area': 'Study area',
         'sub_area_name': 'Sub-area name',
         'sub_areas': 'Sub-areas',
+        'succeeded': 'Succeeded',
         'sum': 'Sum',
         'third_quartile': 'Third quartile',
+        'upper_confidence_limit': 'Upper confidence limit',
         'var': 'Variation',
     },
     'hu': {
@@ -73,10 +94,13 @@ languages = {
         'area_classification': 'területi osztályozás',
         'area_ratio': 'területarány',
         'areas': 'területek',
+        'batch_entry': 'kötegelt feladat',
         'class_average_area': 'osztály elemeinek átlagos területe',
         'classes': 'osztályok',
         'classification': 'osztályozás',
         'count': 'darabszám',
+        'elapsed_time': 'eltelt idő (s)',
+        'elongation': 'megnyúltság',
         'equal_interval': 'egyenlő intervallum',
         'equal_interval_breaks': 'egyenlő intervallumok hatarértékei',
         'equal_interval_ludas_diagram_title': 'Egyenlő intervallumok szerinti csoportok a Ludas mintaterületen',
@@ -89,16 +113,26 @@ languages = {
                                                    'területen',
         'equal_interval_study_area_pie_chart_diagram_title': 'Az ezüstfa területarányának megoszlása az egyenlő '
                                                         'intervallumok szerint a teljes vizsgált területen',
+        'error': 'hiba',
+        'estimate': 'becslés',
         'estimated_individuals': 'becsült egyedszámok',
         'estimated_maximum_individuals': 'becsült maximum egyedszám',
         'estimated_minimum_individuals': 'becsült minimum egyedszám',
         'experimental_area_ratio': 'vizsgált terület aránya',
+        'failed': 'sikertelen',
+        'feature': 'objektum',
         'first_quartile': 'első kvartilis',
+        'geometric_interval': 'geometriai intervallum',
+        'goodness_of_variance_fit': 'varianciailleszkedés jósága',
+        'head_tail': 'fej/farok határok',
         'jenks': 'természetes intervallumok',
+        'language': 'nyelv',
+        'lower_confidence_limit': 'alsó konfidenciahatár',
         'maximum': 'maximum',
         'mean': 'átlag',
         'median': 'medián',
         'minimum': 'minimum',
+        'perimeter': 'kerület',
         'pie_chart_diagram_title': 'Az egyes csoportok területarányai',
         'natural_break_ludas_diagram_title': 'Természetes intervallumok szerinti csoportok a Ludas mintaterületen',
         'natural_break_ludas_pie_chart_diagram_title': 'Az ezüstfa területarányának megoszlása a természetes '
@@ -111,7 +145,10 @@ languages = {
                                                   'területen',
         'natural_break_study_area_pie_chart_diagram_title': 'Az ezüstfa területarányának megoszlása a természetes '
                                                             'intervallumok szerint a teljes vizsgált területen',
+        'nearest_neighbour_distance': 'legközelebbi szomszéd távolsága',
+        'number_of_classes': 'osztályok száma',
         'oleasters': 'ezüstfák',
+        'polsby_popper': 'Polsby-Popper kompaktság',
         'quantile': 'kvantilis',
         'quartile': 'kvartilis',
         'quartiles_ludas_diagram_title': 'Kvartilisek szerinti csoportok a Ludas mintaterületen',
@@ -127,13 +164,18 @@ languages = {
         'sample_area_ratio': 'területarány a mintaterülethez viszonyítva',
         'sample_area_size': 'mintaterület nagysága',
         'second_quartile': 'második kvartilis',
+        'standard_deviation': 'szórás szerinti osztály',
+        'standard_error': 'standard hiba',
         'statistics': 'statisztikák',
+        'status': 'állapot',
         'std': 'szórás',
         'study_area': 'vizsgált terület',
         'sub_area_name': 'részterület neve',
         'sub_areas': 'részterületek',
+        'succeeded': 'sikeres',
         'sum': 'összeg',
         'third_quartile': 'harmadik kvartilis',
+        'upper_confidence_limit': 'felső konfidenciahatár',
         'var': 'variancia',
     },
 }
@@ -0,0 +1,164 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Iterator, Union
+
+import pandas
+
+_active_profiler = None
+
+
+def count_rows(value) -> Union[int, None]:
+    """ Rows of a data frame, dictionary or list, the rows of the data of an AreaStatistics object """
+    if hasattr(value, 'data') and hasattr(value.data, '__len__'):
+        return len(value.data)
+    if hasattr(value, '__len__') and not isinstance(value, (str, bytes)):
+        return len(value)
+    return None
+
+
+def profile_stage(name: str = None, rows_argument: int = 0) -> Callable:
+    """ Records the calls of the decorated pipeline stage in the active RunProfiler, rows_argument gives the rows """
+    def decorator(function: Callable) -> Callable:
+        stage_name = function.__qualname__ if name is None else name
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active_profiler is None:
+                return function(*args, **kwargs)
+            rows = count_rows(args[rows_argument]) if len(args) > rows_argument else None
+            with _active_profiler.stage(stage_name, rows):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def stage(name: str, rows: int = None) -> Iterator[None]:
+    """ Records the with block as a stage of the active RunProfiler, without one the block just runs """
+    if _active_profiler is None:
+        yield
+        return
+    with _active_profiler.stage(name, rows):
+        yield
+
+
+class RunProfiler:
+    """ Opt-in wall time, CPU time, row count and traced memory peak of every stage of a pipeline run """
+
+    def __init__(self, track_memory: bool = True):
+        self.track_memory = track_memory
+        self.records = []
+        self._local = threading.local()
+        self._start = None
+        self._started_tracemalloc = False
+
+    def __enter__(self) -> 'RunProfiler':
+        global _active_profiler
+        if _active_profiler is not None:
+            raise ValueError('Only one RunProfiler can be active at a time')
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._start = time.perf_counter()
+        _active_profiler = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        global _active_profiler
+        _active_profiler = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def start(self) -> 'RunProfiler':
+        """ Activates the profiler without a with block, e.g. across the cells of a notebook """
+        return self.__enter__()
+
+    def stop(self) -> None:
+        self.__exit__(None, None, None)
+
+    def _get_stack(self) -> list[dict]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None) -> Iterator[None]:
+        """ Records the with block as a stage, like reading the layer or a spatial join in a notebook """
+        stack = self._get_stack()
+        is_tracing = self.track_memory and tracemalloc.is_tracing()
+        if is_tracing:
+            current_memory, peak_memory = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak_memory)
+            tracemalloc.reset_peak()
+        else:
+            current_memory = 0
+        frame = {'name': name, 'start_memory': current_memory, 'peak': current_memory}
+        stack.append(frame)
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall_seconds = time.perf_counter() - start_wall
+            cpu_seconds = time.process_time() - start_cpu
+            stack.pop()
+            peak_megabytes = None
+            if is_tracing and tracemalloc.is_tracing():
+                frame['peak'] = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                peak_megabytes = (frame['peak'] - frame['start_memory']) / 1024 ** 2
+                if stack:
+                    stack[-1]['peak'] = max(stack[-1]['peak'], frame['peak'])
+            self.records.append({
+                'stage': name,
+                'parent': stack[-1]['name'] if stack else None,
+                'depth': len(stack),
+                'start_seconds': start_wall - self._start,
+                'wall_seconds': wall_seconds,
+                'cpu_seconds': cpu_seconds,
+                'rows': rows,
+                'peak_megabytes': peak_megabytes,
+            })
+
+    def get_summary(self) -> pandas.DataFrame:
+        """ One row per stage with the calls, the summed times, the most rows and the highest peak """
+        columns = ['stage', 'calls', 'wall_seconds', 'cpu_seconds', 'rows', 'peak_megabytes']
+        if not self.records:
+            return pandas.DataFrame(columns=columns)
+        stages = pandas.DataFrame(self.records).groupby('stage', sort=False)
+        summary = pandas.DataFrame({
+            'calls': stages.size(),
+            'wall_seconds': stages['wall_seconds'].sum(),
+            'cpu_seconds': stages['cpu_seconds'].sum(),
+            'rows': stages['rows'].max(),
+            'peak_megabytes': stages['peak_megabytes'].max(),
+        })
+        return summary.sort_values('wall_seconds', ascending=False).reset_index()[columns]
+
+    def write_profile(
+            self,
+            results_folder: str,
+            project_folder: str,
+            name: str,
+            statistics_folder: str = 'statistics'
+    ) \
+            -> list[str]:
+        """ Writes the stages as <name>_profile.json and the summary as <name>_profile_summary.csv """
+        summary = self.get_summary()
+        json_file_name = os.path.join(results_folder, project_folder, statistics_folder, f'{name}_profile.json')
+        summary_file_name = os.path.join(
+            results_folder, project_folder, statistics_folder, f'{name}_profile_summary.csv')
+        with open(json_file_name, 'w', encoding='utf-8') as json_file:
+            json.dump({
+                'track_memory': self.track_memory,
+                'stages': self.records,
+                'summary': json.loads(summary.to_json(orient='records')),
+            }, json_file, indent=2)
+        summary.to_csv(summary_file_name, index=False, float_format='%.4f')
+        return [json_file_name, summary_file_name]
@@ -0,0 +1,29 @@
+import os
+
+import geopandas
+
+from src.batch_runner import run_manifest
+from src.benchmarks.synthetic_polygons import create_synthetic_polygons
+from src.describe_gis_data import DEFAULT_CONFIG
+import src.utils.languages.languages as languages
+
+CLASSIFICATIONS = ('area', 'jenks', 'equal_interval_breaks', 'quartiles')
+
+
+def test_every_language_has_only_its_own_columns(tmp_path):
+    layer_file_name = str(tmp_path / 'layer.gpkg')
+    create_synthetic_polygons(200, seed=1).to_file(layer_file_name, layer='polygons', driver='GPKG')
+    manifest = {
+        'results_folder': str(tmp_path / 'results'),
+        'defaults': {'chart_types': []},
+        'entries': [{'name': 'layer', 'layer_file_name': layer_file_name, 'languages': ['en', 'hu']}],
+    }
+    _, rows = run_manifest(manifest, DEFAULT_CONFIG, max_workers=1)
+    assert [row['status'] for row in rows] == ['succeeded', 'succeeded']
+    for language in ('en', 'hu'):
+        columns = set(geopandas.read_file(os.path.join(
+            manifest['results_folder'], f'layer_{language}', 'gis_data', 'classification.gpkg'
+        )).columns)
+        for other_language in {'en', 'hu'} - {language}:
+            assert not columns & {languages.get_language(other_language)[name] for name in CLASSIFICATIONS}
+        assert {languages.get_language(language)[name] for name in CLASSIFICATIONS} <= columns
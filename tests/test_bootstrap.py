@@ -0,0 +1,62 @@
+import numpy
+import pandas
+import pytest
+
+from src.benchmarks.synthetic_polygons import create_synthetic_areas, create_synthetic_polygons
+from src.calculate_statistics.area_statistics import AreaStatistics
+from src.calculate_statistics.bootstrap import BOOTSTRAP_STATISTICS, calculate_bootstrap_replicates
+from src.calculate_statistics.summary_statistics import calculate_summary_statistics
+
+
+@pytest.fixture(scope='module')
+def values() -> numpy.ndarray:
+    return create_synthetic_areas(500, seed=6)
+
+
+def assert_replicates_equal(replicates: dict[str, numpy.ndarray], expected_replicates: dict[str, numpy.ndarray]):
+    assert replicates.keys() == expected_replicates.keys()
+    for name in replicates:
+        numpy.testing.assert_array_equal(replicates[name], expected_replicates[name])
+
+
+def test_same_seed_gives_the_same_replicates(values):
+    assert_replicates_equal(
+        calculate_bootstrap_replicates(values, 200, 4, seed=1, max_workers=1),
+        calculate_bootstrap_replicates(values, 200, 4, seed=1, max_workers=1)
+    )
+    assert not numpy.array_equal(
+        calculate_bootstrap_replicates(values, 200, seed=1)['mean'],
+        calculate_bootstrap_replicates(values, 200, seed=2)['mean']
+    )
+
+
+def test_replicates_do_not_depend_on_batching_or_workers(values):
+    expected_replicates = calculate_bootstrap_replicates(values, 60, 4, seed=1, max_workers=1)
+    assert_replicates_equal(
+        calculate_bootstrap_replicates(values, 60, 4, seed=1, max_workers=1, max_batch_elements=len(values) * 7),
+        expected_replicates
+    )
+    assert_replicates_equal(calculate_bootstrap_replicates(values, 60, 4, seed=1, max_workers=2), expected_replicates)
+
+
+def test_replicates_are_the_statistics_of_their_resamples(values):
+    replicates = calculate_bootstrap_replicates(values, 5, seed=3, max_batch_elements=len(values) * 2)
+    seed_sequences = numpy.random.SeedSequence(3).spawn(5)
+    for number, seed_sequence in enumerate(seed_sequences):
+        resample = values[numpy.random.default_rng(seed_sequence).integers(0, len(values), size=len(values))]
+        summary_statistics = calculate_summary_statistics(resample)
+        for name in BOOTSTRAP_STATISTICS:
+            assert replicates[name][number] == pytest.approx(summary_statistics[name], rel=1e-9)
+
+
+def test_confidence_intervals_are_reproducible_and_contain_the_estimates():
+    area_statistics = AreaStatistics(create_synthetic_polygons(500, seed=6))
+    confidence_intervals = area_statistics.get_bootstrap_confidence_intervals(200, seed=5, max_workers=1)
+    pandas.testing.assert_frame_equal(
+        confidence_intervals,
+        area_statistics.get_bootstrap_confidence_intervals(200, seed=5, max_workers=1)
+    )
+    language = area_statistics.language
+    for name in ('sum', 'mean', 'median'):
+        estimate, lower, upper, _ = confidence_intervals.loc[language[name]]
+        assert lower <= estimate <= upper
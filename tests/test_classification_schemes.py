@@ -0,0 +1,85 @@
+import numpy
+import pytest
+
+from src.benchmarks.synthetic_polygons import create_synthetic_areas, create_synthetic_polygons
+from src.calculate_statistics.area_statistics import AreaStatistics
+from src.calculate_statistics.classification_schemes import (
+    CLASSIFICATION_SCHEMES,
+    ClassificationEngine,
+    get_classification_scheme_names,
+    register_classification_scheme
+)
+from src.calculate_statistics.jenks import JenksEngine, calculate_goodness_of_variance_fit
+
+
+@pytest.fixture(scope='module')
+def values() -> numpy.ndarray:
+    return create_synthetic_areas(2000, seed=7)
+
+
+def test_equal_interval_and_quantile_breaks(values):
+    sorted_values = numpy.sort(values)
+    assert ClassificationEngine('equal_interval', 4).calculate_breaks(values) == pytest.approx(
+        [sorted_values[0] + (sorted_values[-1] - sorted_values[0]) * i / 4 for i in (1, 2, 3)]
+    )
+    assert ClassificationEngine('quantile', 4).calculate_breaks(values) \
+        == pytest.approx(numpy.quantile(values, [0.25, 0.5, 0.75]).tolist())
+
+
+@pytest.mark.parametrize('scheme', get_classification_scheme_names())
+def test_goodness_of_variance_fits_are_the_fits_of_the_breaks(scheme, values):
+    classification_engine = ClassificationEngine(scheme, maximum_number_of_classes=6,
+                                                 jenks_engine=JenksEngine('exact'))
+    breaks_by_number_of_classes = classification_engine.calculate_breaks_for_all_classes(values)
+    for number_of_classes, breaks in breaks_by_number_of_classes.items():
+        assert numpy.all(numpy.diff(breaks) >= 0)
+        assert classification_engine.goodness_of_variance_fits[number_of_classes] == pytest.approx(
+            calculate_goodness_of_variance_fit(values, [values.min()] + list(breaks) + [values.max()]),
+            abs=1e-9
+        )
+
+
+def test_target_selects_the_fewest_classes_reaching_it(values):
+    classification_engine = ClassificationEngine('jenks', target_goodness_of_variance_fit=0.9,
+                                                 jenks_engine=JenksEngine('exact'))
+    breaks = classification_engine.calculate_breaks(values)
+    selected_number_of_classes = classification_engine.selected_number_of_classes
+    goodness_of_variance_fits = classification_engine.goodness_of_variance_fits
+    assert len(breaks) == selected_number_of_classes - 1
+    assert goodness_of_variance_fits[selected_number_of_classes] >= 0.9
+    assert all(goodness_of_variance_fits[number_of_classes] < 0.9
+               for number_of_classes in range(2, selected_number_of_classes))
+
+
+def test_unreachable_target_selects_the_maximum_number_of_classes(values):
+    classification_engine = ClassificationEngine('equal_interval', target_goodness_of_variance_fit=1.0,
+                                                 maximum_number_of_classes=5)
+    assert len(classification_engine.calculate_breaks(values)) == 4
+    assert classification_engine.selected_number_of_classes == 5
+
+
+def test_jenks_breaks_of_every_number_of_classes_are_the_engine_breaks(values):
+    jenks_engine = JenksEngine('exact')
+    breaks_by_number_of_classes = ClassificationEngine('jenks', maximum_number_of_classes=5,
+                                                       jenks_engine=jenks_engine) \
+        .calculate_breaks_for_all_classes(values)
+    for number_of_classes, breaks in breaks_by_number_of_classes.items():
+        assert breaks == jenks_engine.calculate_breaks(values, number_of_classes)[1:-1]
+
+
+def test_registered_scheme_classifies_the_areas():
+    register_classification_scheme('halves', lambda sorted_values, number_of_classes: [float(sorted_values.mean())])
+    try:
+        area_statistics = AreaStatistics(create_synthetic_polygons(200, seed=7))
+        breaks = area_statistics.classify_areas_by_scheme('halves')
+        assert breaks == [pytest.approx(area_statistics.get_areas().mean())]
+        assert area_statistics.data['halves'].nunique() == 2
+    finally:
+        del CLASSIFICATION_SCHEMES['halves']
+
+
+def test_unknown_scheme_and_jenks_replacement_are_rejected():
+    with pytest.raises(ValueError):
+        ClassificationEngine('unknown')
+    with pytest.raises(ValueError):
+        register_classification_scheme('jenks', lambda sorted_values, number_of_classes: [])
@@ -0,0 +1,52 @@
+import numpy
+import pandas
+import pytest
+
+from src.benchmarks.synthetic_polygons import create_synthetic_polygons
+from src.calculate_statistics.area_statistics import AreaStatistics, CompactAreaStatistics
+
+
+def create_classified_area_statistics(area_statistics_class: type, data) -> AreaStatistics:
+    area_statistics = area_statistics_class(data, jenks_method='exact')
+    area_statistics.calculate_area()
+    area_statistics.add_area_classifications_to_data(additional_classifications={
+        'size': ([50, 500], ['small', 'medium', 'large'])
+    })
+    return area_statistics
+
+
+def test_data_of_the_caller_is_left_untouched():
+    data = create_synthetic_polygons(500, seed=1)
+    expected_data = data.copy()
+    compact_area_statistics = create_classified_area_statistics(CompactAreaStatistics, data)
+    compact_area_statistics.get_morphometry()
+    compact_area_statistics.get_data_for_export()
+    pandas.testing.assert_frame_equal(data, expected_data)
+
+
+def test_outputs_equal_the_outputs_of_area_statistics():
+    data = create_synthetic_polygons(500, seed=1)
+    area_statistics = create_classified_area_statistics(AreaStatistics, data.copy())
+    compact_area_statistics = create_classified_area_statistics(CompactAreaStatistics, data.copy())
+    assert compact_area_statistics.get_area_statistics() == area_statistics.get_area_statistics()
+    language = area_statistics.language
+    for classification in (language['jenks'], language['equal_interval_breaks'], language['quartiles'], 'size'):
+        pandas.testing.assert_frame_equal(
+            compact_area_statistics.get_classification_area_statistics(classification),
+            area_statistics.get_classification_area_statistics(classification),
+            check_dtype=False
+        )
+    pandas.testing.assert_frame_equal(
+        compact_area_statistics.get_data_for_export(),
+        area_statistics.get_data_for_export(),
+        check_like=True
+    )
+
+
+def test_float32_areas_give_float64_sums():
+    data = create_synthetic_polygons(500, seed=1)
+    compact_area_statistics = CompactAreaStatistics(data, area_dtype=numpy.float32)
+    assert compact_area_statistics.get_areas().dtype == numpy.float32
+    language = compact_area_statistics.language
+    assert compact_area_statistics.get_area_statistics()[language['sum']] \
+        == pytest.approx(AreaStatistics(data).get_area_statistics()[language['sum']], rel=1e-6)
@@ -0,0 +1,71 @@
+import glob
+import os
+
+import pandas
+import pytest
+
+from src.benchmarks.synthetic_polygons import create_synthetic_polygons
+from src.utils.file_utils.export_results import ResultOutput, export_results
+from src.utils.file_utils.partial_files import PARTIAL_FILE_MARKER, create_partial_file_name
+
+
+class InterruptedContent:
+    """ Content whose writing fails like an interrupted export """
+
+    def __len__(self) -> int:
+        return 1
+
+    def to_csv(self, *args, **kwargs):
+        raise RuntimeError('interrupted')
+
+    to_excel = to_csv
+    to_file = to_csv
+
+
+def create_outputs(version: int, interrupted_content=None) -> list[ResultOutput]:
+    data = create_synthetic_polygons(50, seed=version)
+    table = pandas.DataFrame({'version': [version] * 3})
+    return [
+        ResultOutput('csv', 'table.csv', table),
+        ResultOutput('excel_sheet', 'tables.xlsx', table, name='first'),
+        ResultOutput('excel_sheet', 'tables.xlsx', interrupted_content or table, name='second'),
+        ResultOutput('gpkg_layer', 'layers.gpkg', data, folder='gis_data', name='first'),
+        ResultOutput('gpkg_layer', 'layers.gpkg', interrupted_content or data, folder='gis_data', name='second'),
+    ]
+
+
+def read_files(file_names: list[str]) -> dict[str, bytes]:
+    files = {}
+    for file_name in file_names:
+        with open(file_name, 'rb') as file:
+            files[file_name] = file.read()
+    return files
+
+
+def find_partial_files(project_folder: str) -> list[str]:
+    return glob.glob(os.path.join(project_folder, '*', f'.*{PARTIAL_FILE_MARKER}*'))
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_interrupted_export_keeps_the_previous_results(tmp_path, max_workers):
+    file_names = export_results(create_outputs(1), str(tmp_path), 'project', max_workers=max_workers)
+    previous_files = read_files(file_names)
+    with pytest.raises(RuntimeError, match='interrupted'):
+        export_results(create_outputs(2, InterruptedContent()), str(tmp_path), 'project', max_workers=max_workers)
+    files = read_files(file_names)
+    for file_name in file_names:
+        if file_name.endswith('.csv'):
+            assert pandas.read_csv(file_name)['version'].tolist() == [2, 2, 2]
+        else:
+            assert files[file_name] == previous_files[file_name]
+    assert find_partial_files(str(tmp_path / 'project')) == []
+
+
+def test_export_removes_the_partial_files_of_an_earlier_export(tmp_path):
+    file_names = export_results(create_outputs(1), str(tmp_path), 'project', max_workers=1)
+    partial_file_name = create_partial_file_name(file_names[0])
+    with open(partial_file_name, 'w') as file:
+        file.write('version\n')
+    export_results(create_outputs(2), str(tmp_path), 'project', max_workers=1)
+    assert find_partial_files(str(tmp_path / 'project')) == []
+    assert pandas.read_csv(file_names[0])['version'].tolist() == [2, 2, 2]
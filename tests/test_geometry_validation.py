@@ -0,0 +1,41 @@
+import geopandas
+import pandas
+import pytest
+import shapely
+
+from src.calculate_statistics.area_statistics import AreaStatistics
+from src.utils.geometry_utils.geometry_validation import normalize_geometries
+
+
+def create_data() -> geopandas.GeoDataFrame:
+    return geopandas.GeoDataFrame({'name': ['single', 'multi', 'invalid']}, geometry=[
+        shapely.box(0, 0, 1, 1),
+        shapely.MultiPolygon([shapely.box(10, 0, 12, 2), shapely.box(20, 0, 23, 3)]),
+        shapely.Polygon([(0, 10), (2, 12), (2, 10), (0, 12)]),
+    ], index=['a', 'b', 'c'], crs=23700)
+
+
+def test_exploded_parts_get_unique_labels_and_keep_their_feature():
+    data = create_data()
+    normalized_data, report = normalize_geometries(data, explode=True)
+    assert normalized_data.index.equals(pandas.RangeIndex(len(normalized_data)))
+    assert normalized_data['Feature'].tolist() == ['a', 'b', 'b', 'c', 'c']
+    assert normalized_data.geom_type.eq('Polygon').all()
+    assert report.index.tolist() == ['c']
+    assert normalized_data.area.sum() == pytest.approx(data.make_valid().area.sum())
+    assert normalize_geometries(data, explode=True, language='hu')[0].columns[0] == 'objektum'
+
+
+def test_one_exploded_part_can_be_removed():
+    normalized_data, _ = normalize_geometries(create_data(), explode=True)
+    area_statistics = AreaStatistics(normalized_data, number_of_natural_breaks=2)
+    area_statistics.get_area_statistics()
+    area_statistics.remove_features([normalized_data.index[normalized_data['Feature'] == 'b'][0]])
+    assert area_statistics.data['Feature'].tolist() == ['a', 'b', 'c', 'c']
+    assert area_statistics.get_areas().sum() == pytest.approx(normalized_data.area.sum() - 4)
+
+
+def test_without_explode_the_labels_are_kept():
+    normalized_data, _ = normalize_geometries(create_data())
+    assert normalized_data.index.tolist() == ['a', 'b', 'c']
+    assert 'Feature' not in normalized_data.columns
@@ -0,0 +1,83 @@
+import numpy
+import pandas
+import pytest
+
+from src.benchmarks.synthetic_polygons import create_synthetic_polygons
+from src.calculate_statistics.area_statistics import AreaStatistics, CompactAreaStatistics, create_classification
+from src.calculate_statistics.incremental_statistics import DEFAULT_JENKS_REFIT_THRESHOLD
+from src.calculate_statistics.jenks import calculate_goodness_of_variance_fit
+
+SUMMARY_STATISTICS = ('count', 'sum', 'mean', 'median', 'std', 'minimum', 'first_quartile', 'third_quartile',
+                      'maximum')
+
+
+def create_updated_area_statistics(area_statistics_class: type) -> tuple[AreaStatistics, pandas.DataFrame]:
+    """ Statistics of the first 2000 features updated by two additions and a removal, and the expected data """
+    data = create_synthetic_polygons(3000, seed=4)
+    area_statistics = area_statistics_class(data.iloc[:2000].copy(), jenks_method='exact')
+    area_statistics.calculate_area()
+    area_statistics.add_area_classifications_to_data()
+    area_statistics.add_features(data.iloc[2000:2600])
+    area_statistics.add_features(data.iloc[2600:])
+    removed_labels = list(range(0, 3000, 7))
+    area_statistics.remove_features(removed_labels)
+    return area_statistics, data.drop(index=removed_labels)
+
+
+@pytest.mark.parametrize('area_statistics_class', [AreaStatistics, CompactAreaStatistics])
+def test_updated_statistics_equal_a_full_recompute(area_statistics_class):
+    area_statistics, expected_data = create_updated_area_statistics(area_statistics_class)
+    recomputed = area_statistics_class(expected_data.copy(), jenks_method='exact')
+    language = area_statistics.language
+    statistics = area_statistics.get_area_statistics()
+    expected_statistics = recomputed.get_area_statistics()
+    for name in SUMMARY_STATISTICS:
+        assert statistics[language[name]] == pytest.approx(expected_statistics[language[name]], rel=1e-9)
+    assert statistics[language['equal_interval_breaks']] \
+        == pytest.approx(expected_statistics[language['equal_interval_breaks']], rel=1e-9)
+    assert area_statistics.data.index.equals(expected_data.index)
+    assert area_statistics.get_areas().to_numpy() == pytest.approx(recomputed.get_areas().to_numpy(), rel=1e-12)
+
+
+@pytest.mark.parametrize('area_statistics_class', [AreaStatistics, CompactAreaStatistics])
+def test_updated_classifications_equal_a_full_recompute(area_statistics_class):
+    area_statistics, expected_data = create_updated_area_statistics(area_statistics_class)
+    recomputed = area_statistics_class(expected_data.copy(), jenks_method='exact')
+    recomputed.calculate_area()
+    recomputed.add_area_classifications_to_data()
+    language = area_statistics.language
+    exported = area_statistics.get_data_for_export()
+    expected = recomputed.get_data_for_export()
+    for classification in ('equal_interval_breaks', 'quartiles'):
+        column_name = language[classification]
+        assert exported[column_name].tolist() == expected.loc[exported.index, column_name].tolist()
+
+
+@pytest.mark.parametrize('area_statistics_class', [AreaStatistics, CompactAreaStatistics])
+def test_updated_jenks_breaks_are_within_the_refit_threshold_of_a_full_recompute(area_statistics_class):
+    area_statistics, expected_data = create_updated_area_statistics(area_statistics_class)
+    recomputed = area_statistics_class(expected_data.copy(), jenks_method='exact')
+    areas = recomputed.get_areas().to_numpy()
+    breaks = area_statistics.get_jenks_breaks()
+    expected_breaks = recomputed.get_jenks_breaks()
+    goodness_of_variance_fit = calculate_goodness_of_variance_fit(areas, [areas.min()] + breaks + [areas.max()])
+    expected_goodness_of_variance_fit = calculate_goodness_of_variance_fit(
+        areas,
+        [areas.min()] + expected_breaks + [areas.max()]
+    )
+    assert goodness_of_variance_fit >= expected_goodness_of_variance_fit - DEFAULT_JENKS_REFIT_THRESHOLD
+    column_name = area_statistics.language['jenks']
+    labels = area_statistics._classifications[column_name]['labels']
+    assert area_statistics.get_data_for_export()[column_name].tolist() \
+        == numpy.asarray(create_classification(areas, breaks, labels)).tolist()
+
+
+def test_added_features_are_in_the_data_once_it_is_read():
+    data = create_synthetic_polygons(300, seed=5)
+    area_statistics = AreaStatistics(data.iloc[:200].copy())
+    area_statistics.get_area_statistics()
+    area_statistics.add_features(data.iloc[200:250])
+    area_statistics.add_features(data.iloc[250:])
+    assert area_statistics.get_area_statistics()[area_statistics.language['count']] == 300
+    assert area_statistics.data.index.equals(data.index)
+    assert area_statistics.get_areas().index.equals(data.index)
@@ -0,0 +1,61 @@
+import jenkspy
+import numpy
+import pytest
+
+from src.calculate_statistics.jenks import (
+    HISTOGRAM_GOODNESS_OF_VARIANCE_FIT_TOLERANCE,
+    SAMPLE_GOODNESS_OF_VARIANCE_FIT_TOLERANCE,
+    JenksEngine,
+    calculate_goodness_of_variance_fit,
+    select_jenks_method
+)
+
+SIZE = 5000
+DISTRIBUTIONS = {
+    'uniform': lambda random_generator: random_generator.uniform(0, 100, SIZE),
+    'lognormal': lambda random_generator: random_generator.lognormal(3, 1, SIZE),
+    'skewed lognormal': lambda random_generator: random_generator.lognormal(3, 2, SIZE),
+    'pareto': lambda random_generator: random_generator.pareto(1.0, SIZE) + 1,
+    'heavy-tailed pareto': lambda random_generator: random_generator.pareto(0.2, SIZE) + 1,
+    'bimodal': lambda random_generator: numpy.concatenate((
+        random_generator.normal(10, 1, SIZE // 2),
+        random_generator.normal(1000, 50, SIZE - SIZE // 2)
+    )),
+}
+
+
+def calculate_goodness_of_variance_fit_loss(values: numpy.ndarray, breaks: list[float], number_of_classes: int) \
+        -> float:
+    exact_breaks = jenkspy.jenks_breaks(values, n_classes=number_of_classes)
+    return calculate_goodness_of_variance_fit(values, exact_breaks) - calculate_goodness_of_variance_fit(values, breaks)
+
+
+@pytest.mark.parametrize('distribution', DISTRIBUTIONS)
+@pytest.mark.parametrize('number_of_classes', [3, 5, 7])
+def test_histogram_breaks_are_within_tolerance_of_exact_breaks(distribution, number_of_classes):
+    values = DISTRIBUTIONS[distribution](numpy.random.default_rng(0))
+    breaks = JenksEngine('histogram', number_of_bins=1024).calculate_breaks(values, number_of_classes)
+    assert len(breaks) == number_of_classes + 1
+    assert calculate_goodness_of_variance_fit_loss(values, breaks, number_of_classes) \
+        <= HISTOGRAM_GOODNESS_OF_VARIANCE_FIT_TOLERANCE
+
+
+@pytest.mark.parametrize('distribution', DISTRIBUTIONS)
+@pytest.mark.parametrize('number_of_classes', [3, 5, 7])
+def test_sample_breaks_are_within_tolerance_of_exact_breaks(distribution, number_of_classes):
+    values = DISTRIBUTIONS[distribution](numpy.random.default_rng(0))
+    jenks_engine = JenksEngine('sample', sample_size=1000, seed=1)
+    breaks = jenks_engine.calculate_breaks(values, number_of_classes)
+    assert jenks_engine.goodness_of_variance_fit_error <= SAMPLE_GOODNESS_OF_VARIANCE_FIT_TOLERANCE
+    assert calculate_goodness_of_variance_fit_loss(values, breaks, number_of_classes) \
+        <= SAMPLE_GOODNESS_OF_VARIANCE_FIT_TOLERANCE
+
+
+def test_small_data_gives_exact_breaks():
+    values = numpy.random.default_rng(0).lognormal(3, 2, 1000)
+    assert JenksEngine().calculate_breaks(values, 4) == jenkspy.jenks_breaks(values, n_classes=4)
+
+
+@pytest.mark.parametrize('size', [10, 10 ** 4, 10 ** 7])
+def test_auto_never_picks_the_sample_method(size):
+    assert select_jenks_method(size) != 'sample'
@@ -0,0 +1,16 @@
+from src.utils.profiling_utils.run_profiler import RunProfiler, stage
+
+
+def test_stages_are_recorded_only_while_the_profiler_is_active():
+    with stage('inactive'):
+        pass
+    run_profiler = RunProfiler(track_memory=False).start()
+    with stage('reading', rows=3):
+        with stage('spatial_join'):
+            pass
+    run_profiler.stop()
+    with stage('stopped'):
+        pass
+    assert [(record['stage'], record['parent'], record['rows']) for record in run_profiler.records] \
+        == [('spatial_join', 'reading', None), ('reading', None, 3)]
+    assert run_profiler.get_summary()['stage'].tolist()[0] == 'reading'
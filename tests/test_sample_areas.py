@@ -0,0 +1,67 @@
+import geopandas
+import pandas
+import pytest
+import shapely
+
+from src.benchmarks.synthetic_polygons import create_synthetic_polygons
+from src.calculate_statistics.area_statistics import AreaStatisticsComparisonWithSampleArea
+from src.calculate_statistics.sample_areas import hash_sample_areas, overlay_sample_areas
+import src.utils.languages.languages as languages
+
+EXTENT = 10000
+
+
+def create_sample_areas() -> geopandas.GeoDataFrame:
+    return geopandas.GeoDataFrame({'name': ['west', 'east', 'centre']}, geometry=[
+        shapely.box(0, 0, EXTENT / 2, EXTENT),
+        shapely.box(EXTENT / 2, 0, EXTENT, EXTENT / 2),
+        shapely.Point(EXTENT / 2, EXTENT / 2).buffer(EXTENT / 8),
+    ], crs=23700)
+
+
+@pytest.fixture
+def data() -> geopandas.GeoDataFrame:
+    return create_synthetic_polygons(3000, seed=3, extent=EXTENT)
+
+
+def test_overlay_equals_the_geopandas_overlay(data):
+    sample_areas = create_sample_areas()
+    language = languages.get_language('en')
+    assigned_data, sample_area_table = overlay_sample_areas(data, sample_areas, 'name')
+    expected_data = geopandas.overlay(data.reset_index(names='feature'), sample_areas, how='intersection')
+    expected_data = expected_data[expected_data.area > 0]
+    pieces = assigned_data.assign(piece_area=assigned_data.area) \
+        .set_index([language['feature'], language['sub_area_name']])['piece_area'].sort_index()
+    expected_pieces = expected_data.assign(piece_area=expected_data.area) \
+        .set_index(['feature', 'name'])['piece_area'].sort_index()
+    pandas.testing.assert_index_equal(pieces.index, expected_pieces.index, check_names=False)
+    assert pieces.to_numpy() == pytest.approx(expected_pieces.to_numpy(), rel=1e-9)
+    expected_table = expected_data.assign(piece_area=expected_data.area).groupby('name')['piece_area'] \
+        .agg(['size', 'sum'])
+    for name, (count, area) in expected_table.iterrows():
+        assert sample_area_table.loc[name, language['count']] == count
+        assert sample_area_table.loc[name, language['area']] == pytest.approx(area, rel=1e-9)
+        assert sample_area_table.loc[name, language['sample_area_size']] \
+            == pytest.approx(sample_areas.set_index('name').area[name], rel=1e-12)
+
+
+def test_overlay_leaves_the_inputs_untouched_and_indexes_the_pieces_uniquely(data):
+    sample_areas = create_sample_areas()
+    expected_data = data.copy()
+    expected_sample_areas = sample_areas.copy()
+    assigned_data, _ = overlay_sample_areas(data, sample_areas, 'name')
+    pandas.testing.assert_frame_equal(data, expected_data)
+    pandas.testing.assert_frame_equal(sample_areas, expected_sample_areas)
+    assert assigned_data.index.equals(pandas.RangeIndex(len(assigned_data)))
+    assert assigned_data[languages.get_language('en')['feature']].isin(data.index).all()
+
+
+def test_other_sample_areas_change_the_cache_parameters(data):
+    sample_areas = create_sample_areas()
+    moved_sample_areas = sample_areas.copy()
+    moved_sample_areas.geometry = moved_sample_areas.translate(100, 0)
+    assert hash_sample_areas(sample_areas, 'name') != hash_sample_areas(moved_sample_areas, 'name')
+    assert AreaStatisticsComparisonWithSampleArea(data, sample_areas=sample_areas, sample_area_column='name') \
+        .get_cache_parameters() \
+        != AreaStatisticsComparisonWithSampleArea(data, sample_areas=moved_sample_areas, sample_area_column='name') \
+        .get_cache_parameters()
@@ -0,0 +1,84 @@
+import os
+
+import numpy
+import pandas
+import pytest
+
+from src.benchmarks.synthetic_polygons import create_synthetic_polygons
+from src.calculate_statistics.area_statistics import AreaStatistics
+from src.utils.file_utils.statistics_cache import StatisticsCache, hash_geometries
+
+
+def create_classified_area_statistics(data, **kwargs) -> AreaStatistics:
+    area_statistics = AreaStatistics(data, jenks_method='exact', **kwargs)
+    area_statistics.calculate_area()
+    area_statistics.add_area_classifications_to_data(additional_classifications={
+        'size': ([50, 500], ['small', 'medium', 'large'])
+    })
+    area_statistics.get_area_statistics()
+    return area_statistics
+
+
+def test_round_trip_restores_the_statistics_without_computing(tmp_path):
+    data = create_synthetic_polygons(500, seed=8)
+    data_hash = hash_geometries(data)
+    cache = StatisticsCache(str(tmp_path))
+    area_statistics = create_classified_area_statistics(data.copy())
+    area_statistics.save_to_cache(cache, data_hash)
+    cached_area_statistics = AreaStatistics(data.copy(), jenks_method='exact')
+    assert cached_area_statistics.load_from_cache(cache, data_hash)
+    assert cached_area_statistics.get_area_statistics() == area_statistics.get_area_statistics()
+    pandas.testing.assert_frame_equal(cached_area_statistics.get_data_for_export(),
+                                      area_statistics.get_data_for_export())
+    language = area_statistics.language
+    for classification in (language['jenks'], language['equal_interval_breaks'], language['quartiles'], 'size'):
+        pandas.testing.assert_frame_equal(
+            cached_area_statistics.get_classification_area_statistics(classification),
+            area_statistics.get_classification_area_statistics(classification)
+        )
+    assert cached_area_statistics.get_cache_info()['misses'] == 0
+
+
+def test_other_data_or_parameters_miss_the_cache(tmp_path):
+    data = create_synthetic_polygons(500, seed=8)
+    cache = StatisticsCache(str(tmp_path))
+    create_classified_area_statistics(data.copy()).save_to_cache(cache, hash_geometries(data))
+    moved_data = data.copy()
+    moved_data.geometry = moved_data.geometry.translate(1, 0)
+    reprojected_data = data.set_crs(3857, allow_override=True)
+    assert len({hash_geometries(data), hash_geometries(moved_data), hash_geometries(reprojected_data)}) == 3
+    assert not AreaStatistics(moved_data, jenks_method='exact').load_from_cache(cache, hash_geometries(moved_data))
+    assert not AreaStatistics(data.copy(), jenks_method='exact', number_of_natural_breaks=5) \
+        .load_from_cache(cache, hash_geometries(data))
+    assert not AreaStatistics(data.copy(), jenks_method='exact', language='hu') \
+        .load_from_cache(cache, hash_geometries(data))
+
+
+def test_cached_rows_must_match_the_data(tmp_path):
+    data = create_synthetic_polygons(500, seed=8)
+    cache = StatisticsCache(str(tmp_path))
+    create_classified_area_statistics(data.copy()).save_to_cache(cache, 'data')
+    with pytest.raises(ValueError):
+        AreaStatistics(data.iloc[:100].copy(), jenks_method='exact').load_from_cache(cache, 'data')
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    cache = StatisticsCache(str(tmp_path))
+    arrays = {'values': numpy.arange(100000, dtype=numpy.float64)}
+    file_names = [cache.save(key, arrays, {'key': key}) for key in ('first', 'second', 'third')]
+    for age, file_name in zip((30, 20, 10), file_names):
+        os.utime(file_name, (0, os.path.getmtime(file_name) - age))
+    loaded_arrays, metadata = cache.load('first')
+    numpy.testing.assert_array_equal(loaded_arrays['values'], arrays['values'])
+    assert metadata == {'key': 'first'}
+    cache.max_megabytes = cache.get_size_in_megabytes() * 0.7
+    assert cache.evict() == [file_names[1]]
+    assert cache.load('second') is None
+    assert cache.load('third') is not None
+
+
+def test_cache_files_hold_no_pickled_objects(tmp_path):
+    cache = StatisticsCache(str(tmp_path))
+    file_name = cache.save('key', {'values': numpy.zeros(3)}, {'breaks': [1.0, 2.0]})
+    with numpy.load(file_name, allow_pickle=False) as cache_file:
+        assert sorted(cache_file.files) == ['metadata', 'values']
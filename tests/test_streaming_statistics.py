@@ -0,0 +1,60 @@
+import geopandas
+import numpy
+import pytest
+import shapely
+
+from src.benchmarks.synthetic_polygons import create_synthetic_polygons
+from src.calculate_statistics.area_statistics import AreaStatistics
+from src.calculate_statistics.streaming_statistics import StreamingAreaStatistics, get_area_statistics_of_layer
+
+RELATIVE_ACCURACY = 0.01
+EXACT_STATISTICS = ('sum', 'count', 'mean', 'std', 'var', 'minimum', 'maximum', 'equal_interval')
+SKETCHED_STATISTICS = ('first_quartile', 'median', 'third_quartile')
+
+
+def test_streamed_layer_has_the_statistics_of_the_layer_in_memory(tmp_path):
+    file_name = str(tmp_path / 'layer.gpkg')
+    create_synthetic_polygons(2000, seed=1).to_file(file_name, driver='GPKG')
+    statistics = get_area_statistics_of_layer(file_name, chunk_size=300, relative_accuracy=RELATIVE_ACCURACY)
+    area_statistics = AreaStatistics(geopandas.read_file(file_name), jenks_method='exact')
+    expected_statistics = area_statistics.get_area_statistics()
+    language = area_statistics.language
+    for name in EXACT_STATISTICS:
+        assert statistics[language[name]] == pytest.approx(expected_statistics[language[name]], rel=1e-9)
+    assert statistics[language['equal_interval_breaks']] \
+        == pytest.approx(expected_statistics[language['equal_interval_breaks']], rel=1e-9)
+    for name in SKETCHED_STATISTICS:
+        assert statistics[language[name]] == pytest.approx(expected_statistics[language[name]],
+                                                           rel=2 * RELATIVE_ACCURACY)
+    assert statistics[language['jenks']] == pytest.approx(expected_statistics[language['jenks']],
+                                                         rel=4 * RELATIVE_ACCURACY)
+
+
+def test_features_with_missing_and_empty_areas_are_counted_like_in_memory():
+    data = create_synthetic_polygons(100, seed=2)
+    data.loc[3, 'geometry'] = shapely.Polygon()
+    with numpy.errstate(invalid='ignore'):
+        data.loc[4, 'geometry'] = shapely.polygons(numpy.array([[0, 0], [1, 0], [numpy.nan, 1], [0, 0]]))
+    streaming_area_statistics = StreamingAreaStatistics()
+    streaming_area_statistics.update(data.iloc[:50])
+    streaming_area_statistics.update(data.iloc[50:])
+    area_statistics = AreaStatistics(data)
+    language = area_statistics.language
+    statistics = streaming_area_statistics.get_area_statistics()
+    expected_statistics = area_statistics.get_area_statistics()
+    assert statistics[language['count']] == expected_statistics[language['count']] == 100
+    assert statistics[language['sum']] == pytest.approx(expected_statistics[language['sum']], rel=1e-9)
+
+
+def test_areas_in_fewer_buckets_than_classes_have_no_jenks_breaks():
+    data = geopandas.GeoDataFrame(
+        geometry=[shapely.box(0, 0, 5, 5 + number * 0.00004) for number in range(50)],
+        crs=23700
+    )
+    streaming_area_statistics = StreamingAreaStatistics()
+    streaming_area_statistics.update(data)
+    statistics = streaming_area_statistics.get_area_statistics()
+    language = streaming_area_statistics.language
+    assert statistics[language['jenks']] == []
+    assert statistics[language['count']] == 50
+    assert len(AreaStatistics(data).get_jenks_breaks()) == 3